@@ -0,0 +1,101 @@
+# Memory benchmark of Entry objects.
+#
+# Usage: python benchmarks/bench_entry_memory.py [number of entries ...]
+#
+# Builds entries from synthetic arXiv metadata and measures the memory they hold
+# with tracemalloc, for the current Entry and for LegacyEntry, which stores the
+# fields the way Entry did before it was made compact (a __dict__ per instance,
+# joined author names, the published date as a string and the plain abstract).
+# Abstracts are made of random words, which compress about as well as real ones.
+
+import gc
+import random
+import string
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from Entry import Entry, arxiv_to_doi, parse_published  # noqa: E402
+
+CATEGORIES = ["cs.CV", "cs.LG", "cs.AI", "cs.CL", "stat.ML", "eess.IV", "math.OC"]
+
+
+class LegacyEntry:
+    def __init__(
+        self, id, title, authors, published, abstract, link, tags, primary_category
+    ):
+        self._id = id
+        self._title = title
+        self._authors = ", ".join(authors)
+        self._published = str(parse_published(published))
+        self._abstract = abstract
+        self._link = link
+        self._tags = tags
+        self._primary_category = primary_category
+        self._doi = arxiv_to_doi(link)
+
+
+def make_fields(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    vocabulary = [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 10)))
+        for _ in range(5000)
+    ]
+    fields = []
+    for i in range(n):
+        link = f"http://arxiv.org/abs/2511.{i:05d}v{rng.randint(1, 3)}"
+        fields.append(
+            dict(
+                id=link,
+                title=" ".join(rng.choices(vocabulary, k=rng.randint(5, 15))).title(),
+                authors=[
+                    f"{rng.choice(vocabulary).title()} {rng.choice(vocabulary).title()}"
+                    for _ in range(rng.randint(1, 8))
+                ],
+                published=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                f"T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z",
+                abstract=" ".join(rng.choices(vocabulary, k=rng.randint(120, 250))),
+                # A separate string object, as a parser produces it
+                link=(link + " ")[:-1],
+                # Separate string objects, as a parser produces them
+                tags=["".join(c) for c in rng.sample(CATEGORIES, rng.randint(1, 3))],
+                primary_category="".join(rng.choice(CATEGORIES)),
+            )
+        )
+    return fields
+
+
+def bytes_per_entry(build, n: int) -> float:
+    """Memory the entries hold once the fields they were built from are gone."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    fields = make_fields(n)
+    entries = [build(f) for f in fields]
+    del fields
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(entries) == n
+    return (after - before) / n
+
+
+def main(sizes):
+    print(f"{'entries':>8} {'legacy B/entry':>15} {'compact B/entry':>16} {'saved':>6}")
+    for n in sizes:
+        legacy = bytes_per_entry(lambda f: LegacyEntry(**f), n)
+        compact = bytes_per_entry(lambda f: Entry.from_fields(**f), n)
+        print(
+            f"{n:>8} {legacy:>15.0f} {compact:>16.0f} {1 - compact / legacy:>6.0%}"
+        )
+
+    # The compact representation must not change what is serialized
+    for f in make_fields(200, seed=1):
+        entry = Entry.from_fields(**f)
+        assert Entry.from_dict(entry.to_dict()).to_dict() == entry.to_dict()
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 50_000])
@@ -0,0 +1,125 @@
+# Benchmark of the fast arXiv parser against the feedparser + Entry(feed) path.
+#
+# Usage: python benchmarks/bench_parser.py [number of entries ...]
+#
+# Large synthetic feeds following the arXiv API schema are generated, parsed by
+# both paths, checked to give identical Entry.to_dict() output and timed.
+
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import feedparser  # noqa: E402
+
+from ArxivParser import parse_feed  # noqa: E402
+from Entry import Entry  # noqa: E402
+
+FEED_HEAD = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <link href="http://arxiv.org/api/query" rel="self" type="application/atom+xml"/>
+  <title type="html">ArXiv Query: search_query=ti:benchmark</title>
+  <id>http://arxiv.org/api/benchmark</id>
+  <updated>2025-11-19T00:00:00-05:00</updated>
+  <opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{n}</opensearch:totalResults>
+  <opensearch:startIndex xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">0</opensearch:startIndex>
+  <opensearch:itemsPerPage xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{n}</opensearch:itemsPerPage>
+"""
+
+FEED_ENTRY = """  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}v{version}</id>
+    <updated>{date}</updated>
+    <published>{date}</published>
+    <title>{title}</title>
+    <summary>  {summary}
+</summary>
+{authors}{doi}    <link href="http://arxiv.org/abs/{arxiv_id}v{version}" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}v{version}" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="{primary}" scheme="http://arxiv.org/schemas/atom"/>
+{categories}  </entry>
+"""
+
+CATEGORIES = ["cs.CV", "cs.LG", "cs.AI", "cs.CL", "stat.ML", "eess.IV", "math.OC"]
+WORDS = (
+    "deep convolutional neural network learning vision transformer segmentation "
+    "robust efficient graph model data &amp; &lt;sub&gt; a of for with via towards"
+).split()
+
+
+def make_feed(n: int, seed: int = 0) -> bytes:
+    rng = random.Random(seed)
+    parts = [FEED_HEAD.format(n=n)]
+    for i in range(n):
+        primary = rng.choice(CATEGORIES)
+        parts.append(
+            FEED_ENTRY.format(
+                arxiv_id=f"2511.{i:05d}",
+                version=rng.randint(1, 3),
+                date=f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                f"T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z",
+                title=" ".join(rng.choices(WORDS, k=10))
+                + "\n  "
+                + " ".join(rng.choices(WORDS, k=4)),
+                summary=" ".join(rng.choices(WORDS, k=150)),
+                authors="".join(
+                    f"    <author>\n      <name>Author{rng.randint(0, 9999)} Name</name>\n    </author>\n"
+                    for _ in range(rng.randint(1, 12))
+                ),
+                doi=(
+                    f'    <arxiv:doi xmlns:arxiv="http://arxiv.org/schemas/atom">10.1000/bench.{i}</arxiv:doi>\n'
+                    if rng.random() < 0.3
+                    else ""
+                ),
+                primary=primary,
+                categories="".join(
+                    f'    <category term="{c}" scheme="http://arxiv.org/schemas/atom"/>\n'
+                    for c in [primary] + rng.sample(CATEGORIES, rng.randint(0, 3))
+                ),
+            )
+        )
+    parts.append("</feed>\n")
+    return "".join(parts).encode()
+
+
+def feedparser_path(data: bytes):
+    return [Entry(item) for item in feedparser.parse(data).entries]
+
+
+def fast_path(data: bytes):
+    return parse_feed(data)[0]
+
+
+def best_of(fn, data: bytes, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(data)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 5000]
+
+    print(f"{'entries':>8} {'MB':>6} {'feedparser':>11} {'fast':>9} {'speedup':>8}")
+    for n in sizes:
+        data = make_feed(n)
+
+        expected = [e.to_dict() for e in feedparser_path(data)]
+        actual = [e.to_dict() for e in fast_path(data)]
+        if expected != actual:
+            sys.exit(f"Output mismatch for {n} entries")
+
+        repeat = 3 if n <= 1000 else 1
+        slow = best_of(feedparser_path, data, repeat)
+        fast = best_of(fast_path, data, repeat)
+        print(
+            f"{n:>8} {len(data) / 1e6:>6.1f} {slow * 1000:>9.0f}ms "
+            f"{fast * 1000:>7.0f}ms {slow / fast:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# Blocking, Qt-free client for the arXiv API, used by the headless `fetch`
+# command. It walks the result pages like ArxivFetcher does, parses them with
+# ArxivParser and spaces requests out with a RateLimiter that can be shared by
+# several threads, so queries can be fetched concurrently while arXiv still sees
+# at most one request every `delay` seconds.
+
+import threading
+import time
+import urllib.error
+import urllib.request
+from typing import Callable, List
+
+from ArxivParser import parse_feed
+from Entry import Entry
+
+
+class FetchError(Exception):
+    """Raised when a page of results cannot be fetched or parsed."""
+
+
+class RateLimiter:
+    def __init__(self, delay: float = 3.0):
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._next_start = float("-inf")
+
+    def wait(self):
+        """Block until the next request may start, and claim that slot."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+
+class ArxivClient:
+    API_URL = "http://export.arxiv.org/api/query"
+    URL_TEMPLATE = (
+        "{api}?{method_name}={parameters}&start={start}&max_results={count}"
+        "&sortBy=submittedDate&sortOrder=descending"
+    )
+    USER_AGENT = "PaperWatch"
+
+    # Attempts per page when the server answers 503 (arXiv does under load),
+    # as long as it does not ask us to wait longer than MAX_RETRY_WAIT seconds
+    MAX_ATTEMPTS = 3
+    MAX_RETRY_WAIT = 60.0
+
+    def __init__(self, limiter: RateLimiter = None, timeout: float = 60.0):
+        self.limiter = limiter or RateLimiter()
+        self.timeout = timeout
+
+    def page_url(self, method_name: str, parameters: str, start: int, count: int) -> str:
+        return self.URL_TEMPLATE.format(
+            api=self.API_URL,
+            method_name=method_name,
+            parameters=parameters,
+            start=start,
+            count=count,
+        )
+
+    def fetch(
+        self,
+        method_name: str,
+        parameters: str,
+        max_results: int,
+        page_size: int,
+        stop_when: Callable[[List[Entry]], bool] = None,
+    ) -> List[Entry]:
+        """
+        Fetch up to `max_results` entries in pages of `page_size`.
+
+        If `stop_when` is given it is called with every parsed page, and no
+        further pages are requested once it returned True.
+        """
+        page_size = max(1, min(page_size, max_results))
+        entries: List[Entry] = []
+        start = 0
+
+        while start < max_results:
+            requested = min(page_size, max_results - start)
+            data = self._get(self.page_url(method_name, parameters, start, requested))
+            try:
+                page, total = parse_feed(data)
+            except Exception as e:
+                raise FetchError(f"Could not parse arXiv response: {e}") from e
+
+            entries.extend(page)
+            start += requested
+
+            # The server tells us how many results exist in total, so we do not
+            # keep asking for pages past the end of the result set.
+            if 0 <= total < max_results:
+                max_results = total
+
+            if len(page) < requested:
+                break
+            if stop_when is not None and stop_when(page):
+                break
+
+        return entries
+
+    def _get(self, url: str) -> bytes:
+        request = urllib.request.Request(url, headers={"User-Agent": self.USER_AGENT})
+        for attempt in range(1, self.MAX_ATTEMPTS + 1):
+            self.limiter.wait()
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return response.read()
+            except urllib.error.HTTPError as e:
+                wait = self._retry_after(e)
+                if (
+                    e.code != 503
+                    or attempt == self.MAX_ATTEMPTS
+                    or wait > self.MAX_RETRY_WAIT
+                ):
+                    raise FetchError(f"{url}: HTTP {e.code} {e.reason}") from e
+                time.sleep(wait)
+            except (urllib.error.URLError, OSError) as e:
+                raise FetchError(f"{url}: {getattr(e, 'reason', e)}") from e
+
+    def _retry_after(self, error: urllib.error.HTTPError) -> float:
+        """Seconds the server asked us to wait, or the rate limit delay."""
+        try:
+            return float(error.headers.get("Retry-After", ""))
+        except ValueError:
+            return self.limiter.delay
@@ -0,0 +1,198 @@
+# Paged fetcher for the arXiv API. Walks the `start=` offset in fixed size pages
+# and emits every page as soon as it arrives so the UI can render incrementally.
+# Replies are parsed by FeedParseWorker on a thread pool, off the GUI thread.
+# Requests go through a shared RequestScheduler, which spaces them out.
+
+import time
+from typing import Callable, List
+
+from PyQt6.QtCore import QObject, QThreadPool, pyqtSignal
+from PyQt6.QtNetwork import QNetworkReply, QNetworkRequest
+from ArxivClient import ArxivClient
+from FeedWorker import FeedParseWorker
+from RequestScheduler import RequestScheduler
+
+
+class ArxivFetcher(QObject):
+    pageFetched = pyqtSignal(list)  # Entry objects, at most `chunk_size` at a time
+    progress = pyqtSignal(int, int)  # (fetched so far, expected total)
+    finished = pyqtSignal(int)  # total number of entries fetched
+    failed = pyqtSignal(str, float)  # (error message, seconds to wait before retrying)
+    cancelled = pyqtSignal()
+
+    API_URL = ArxivClient.API_URL
+    URL_TEMPLATE = ArxivClient.URL_TEMPLATE
+
+    def __init__(self, scheduler: RequestScheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+
+        self._ticket: int = None  # scheduler ticket of the page being fetched
+        self._running = False
+
+        # Bumped on every fetch/cancel so results of stale workers are dropped
+        self._generation = 0
+        self._worker: FeedParseWorker = None
+        self._thread_pool = QThreadPool.globalInstance()
+        self.chunk_size = 50
+
+        # Longest time (ms) a single reply or parsed chunk kept the GUI thread
+        # busy inside this fetcher. Parsing itself never runs on the GUI thread.
+        self.max_main_thread_ms = 0.0
+
+        self._method_name = ""
+        self._parameters = ""
+        self._max_results = 0
+        self._page_size = 0
+        self._start = 0
+        self._fetched = 0
+        self._stop_when: Callable[[List], bool] = None
+        self._stop_reached = False
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def fetch(
+        self,
+        method_name: str,
+        parameters: str,
+        max_results: int,
+        page_size: int,
+        stop_when: Callable[[List], bool] = None,
+    ):
+        """
+        Start fetching `max_results` entries in pages of `page_size`.
+        Any fetch already in progress is cancelled first.
+
+        If `stop_when` is given it is called with every parsed chunk of entries,
+        and no further pages are requested once it returned True.
+        """
+        if self._running:
+            self.cancel()
+
+        self._method_name = method_name
+        self._parameters = parameters
+        self._max_results = max_results
+        self._page_size = max(1, min(page_size, max_results))
+        self._start = 0
+        self._fetched = 0
+        self._stop_when = stop_when
+        self._stop_reached = False
+        self._running = True
+        self._generation += 1
+        self.max_main_thread_ms = 0.0
+
+        self.progress.emit(0, self._max_results)
+        self._request_page()
+
+    def cancel(self):
+        """Abort the current fetch. Pages that already arrived are kept."""
+        if not self._running:
+            return
+
+        self._running = False
+        self._generation += 1
+        self._worker = None
+
+        if self._ticket is not None:
+            self.scheduler.cancel(self._ticket)
+            self._ticket = None
+
+        self.cancelled.emit()
+
+    def page_url(self, start: int, count: int) -> str:
+        return self.URL_TEMPLATE.format(
+            api=self.API_URL,
+            method_name=self._method_name,
+            parameters=self._parameters,
+            start=start,
+            count=count,
+        )
+
+    def _request_page(self):
+        if not self._running:
+            return
+
+        count = min(self._page_size, self._max_results - self._start)
+        self._ticket = self.scheduler.get(
+            self.page_url(self._start, count), self._on_reply
+        )
+
+    def _on_reply(self, reply: QNetworkReply):
+        t0 = time.perf_counter()
+        self._ticket = None
+
+        if reply.error() != QNetworkReply.NetworkError.NoError:
+            self._running = False
+            self.failed.emit(reply.errorString(), self._retry_after(reply))
+            return
+
+        self._worker = FeedParseWorker(
+            self._generation, reply.readAll().data(), self.chunk_size
+        )
+        self._worker.signals.entriesReady.connect(self._on_entries_parsed)
+        self._worker.signals.finished.connect(self._on_page_parsed)
+        self._worker.signals.failed.connect(self._on_parse_failed)
+        self._thread_pool.start(self._worker)
+
+        self._record_main_thread_time(t0)
+
+    def _on_entries_parsed(self, generation: int, entries: list):
+        if generation != self._generation:
+            return
+
+        t0 = time.perf_counter()
+        if self._stop_when is not None and self._stop_when(entries):
+            self._stop_reached = True
+        self.pageFetched.emit(entries)
+        self._record_main_thread_time(t0)
+
+    def _on_page_parsed(self, generation: int, count: int, total: int):
+        if generation != self._generation:
+            return
+
+        self._worker = None
+        requested = min(self._page_size, self._max_results - self._start)
+
+        # The server tells us how many results exist in total, so we do not
+        # keep asking for pages past the end of the result set.
+        if 0 <= total < self._max_results:
+            self._max_results = total
+
+        self._start += requested
+        self._fetched += count
+
+        self.progress.emit(self._fetched, self._max_results)
+
+        if (
+            self._stop_reached
+            or count < requested
+            or self._start >= self._max_results
+        ):
+            self._running = False
+            self.finished.emit(self._fetched)
+            return
+
+        self._request_page()
+
+    def _on_parse_failed(self, generation: int, error: str):
+        if generation != self._generation:
+            return
+
+        self._worker = None
+        self._running = False
+        self.failed.emit(error, 0.0)
+
+    def _retry_after(self, reply: QNetworkReply) -> float:
+        """Seconds the server asked us to wait (Retry-After of a 503), or 0."""
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        if status != 503 or not reply.hasRawHeader(b"Retry-After"):
+            return 0.0
+        try:
+            return float(reply.rawHeader(b"Retry-After").data())
+        except ValueError:
+            return 0.0
+
+    def _record_main_thread_time(self, t0: float):
+        elapsed = (time.perf_counter() - t0) * 1000
+        self.max_main_thread_ms = max(self.max_main_thread_ms, elapsed)
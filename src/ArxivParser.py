@@ -0,0 +1,123 @@
+# Fast parser for arXiv API responses. The arXiv Atom schema is fixed, so instead
+# of going through feedparser's general machinery the entries are streamed with
+# xml.etree.ElementTree.iterparse and turned into Entry objects directly.
+# Anything that does not look like a plain arXiv feed is handed to feedparser.
+
+import io
+import xml.etree.ElementTree as ET
+from typing import Iterator, List, Tuple
+
+from Entry import Entry
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+OPENSEARCH = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+
+class UnexpectedFeedError(Exception):
+    """Raised when a feed uses constructs the fast parser does not handle."""
+
+
+def parse_feed(data: bytes) -> Tuple[List[Entry], int]:
+    """
+    Parse an arXiv API response into Entry objects.
+
+    Returns the entries and the total number of results reported by the server
+    (-1 if the feed does not say). Falls back to feedparser when the fast
+    parser cannot handle the document.
+    """
+    total = [-1]
+    try:
+        entries = list(iter_entries(data, total))
+    except (ET.ParseError, UnexpectedFeedError):
+        return parse_feed_with_feedparser(data)
+    return entries, total[0]
+
+
+def parse_feed_with_feedparser(data: bytes) -> Tuple[List[Entry], int]:
+    """Parse an API response the generic (slow) way through feedparser."""
+    import feedparser
+
+    feed = feedparser.parse(data)
+    total = int(feed.feed.get("opensearch_totalresults", -1))
+    return [Entry(item) for item in feed.entries], total
+
+
+def iter_entries(data: bytes, total: List[int] = None) -> Iterator[Entry]:
+    """
+    Stream Entry objects out of an arXiv Atom document.
+
+    Each <entry> element is discarded once it has been converted, so memory
+    stays flat however large the document is. If `total` is given, its first
+    item is set to opensearch:totalResults when that element is seen.
+    """
+    root = None
+    for event, elem in ET.iterparse(io.BytesIO(data), events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+                if root.tag != ATOM + "feed":
+                    raise UnexpectedFeedError(f"Not an Atom feed: {root.tag}")
+            continue
+
+        if elem.tag == ATOM + "entry":
+            yield _entry_from_element(elem)
+            root.clear()
+        elif elem.tag == OPENSEARCH + "totalResults" and total is not None:
+            total[0] = int(_text(elem))
+
+
+def _entry_from_element(elem: ET.Element) -> Entry:
+    id = title = published = abstract = link = primary_category = ""
+    doi = None
+    authors: List[str] = []
+    tags: List[str] = []
+    seen_tags = set()
+
+    for child in elem:
+        tag = child.tag
+        if tag == ATOM + "id":
+            id = _text(child)
+        elif tag == ATOM + "title":
+            title = _plain_text(child)
+        elif tag == ATOM + "summary":
+            abstract = _plain_text(child)
+        elif tag == ATOM + "published":
+            published = _text(child)
+        elif tag == ATOM + "author":
+            name = child.find(ATOM + "name")
+            if name is None:
+                raise UnexpectedFeedError("Author without a name")
+            authors.append(_text(name))
+        elif tag == ATOM + "link":
+            # feedparser uses the first alternate link as the entry link
+            if not link and child.get("rel", "alternate") == "alternate":
+                link = child.get("href", "")
+        elif tag == ATOM + "category":
+            term = child.get("term")
+            if term is None:
+                raise UnexpectedFeedError("Category without a term")
+            # feedparser drops repeated categories
+            key = (term, child.get("scheme"))
+            if key not in seen_tags:
+                seen_tags.add(key)
+                tags.append(term)
+        elif tag == ARXIV + "primary_category":
+            primary_category = child.get("term", "")
+        elif tag == ARXIV + "doi":
+            doi = _text(child)
+
+    return Entry.from_fields(
+        id, title, authors, published, abstract, link, tags, primary_category, doi
+    )
+
+
+def _text(elem: ET.Element) -> str:
+    return (elem.text or "").strip()
+
+
+def _plain_text(elem: ET.Element) -> str:
+    """Text of a text construct. HTML/XHTML content is left to feedparser."""
+    if elem.get("type", "text") != "text" or len(elem):
+        raise UnexpectedFeedError(f"Unsupported content in {elem.tag}")
+    return _text(elem)
@@ -0,0 +1,62 @@
+# Persistent DOI -> BibTeX cache. BibTeX records of published papers do not
+# change, so once a DOI was resolved through doi.org it is never asked for again,
+# neither for the info view nor for bookmark exports. Stored as one JSON object
+# keyed by the normalized DOI.
+
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Optional
+
+
+def normalize_doi(doi: str) -> str:
+    """
+    Strip resolver prefixes and lower-case a DOI (DOIs are case-insensitive),
+    e.g. https://doi.org/10.48550/arXiv.2510.07692 -> 10.48550/arxiv.2510.07692.
+    """
+    doi = doi.strip()
+    doi = re.sub(r"^(https?://(dx\.)?doi\.org/|doi:)", "", doi, flags=re.IGNORECASE)
+    return doi.lower()
+
+
+class BibtexCache:
+    def __init__(self, json_path: Path):
+        self._path = Path(json_path)
+        self._records: Dict[str, str] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        if not self._path.exists():
+            return
+
+        try:
+            self._records = json.loads(self._path.read_text())
+        except Exception:
+            # Unreadable cache, the DOIs are simply resolved again
+            self._records = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, doi: str) -> bool:
+        return normalize_doi(doi) in self._records
+
+    def get(self, doi: str) -> Optional[str]:
+        return self._records.get(normalize_doi(doi))
+
+    def put(self, doi: str, bibtex: str):
+        """Store a record. It is written to disk by the next save()."""
+        self._records[normalize_doi(doi)] = bibtex
+        self._dirty = True
+
+    def save(self):
+        if not self._dirty:
+            return
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(self._records))
+        os.replace(tmp_path, self._path)
+        self._dirty = False
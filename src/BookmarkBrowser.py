@@ -0,0 +1,226 @@
+# The bookmark page: the bookmarks of one collection or of all of them, painted
+# by the virtualized paper list of the main feed, with a search bar and a sort
+# order. The bookmarks are read when the page is first shown. They go into an
+# EntryStore whose search index is built in chunks while the application is
+# idle, as for the main feed, and into a SortIndex built when a sort order
+# other than the order they were added in is first picked. Both are then kept
+# current as bookmarks change, so searching and sorting 50k bookmarks filter
+# and reorder the rows of the model without touching the cards.
+
+from typing import Dict, List, Optional, Set
+
+from PyQt6.QtCore import QTimer, pyqtSignal
+from PyQt6.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+from BookmarkManager import BookmarkManager
+from Config import AppConfig
+from Entry import Entry
+from EntryStore import EntryStore, TEXT
+from PaperListView import PaperListView
+from SortIndex import SortBy, SortIndex
+
+# Sort orders offered, None is the order the bookmarks were added in
+SORT_ORDERS = (
+    ("Date Added", None),
+    ("Published", SortBy.DATE),
+    ("Title", SortBy.TITLE),
+    ("Author", SortBy.AUTHOR),
+)
+
+
+class BookmarkBrowser(QWidget):
+    backClicked = pyqtSignal()
+    entryClicked = pyqtSignal(object)
+    bookmarkEntryClicked = pyqtSignal(object)
+
+    # Bookmarks added to the search index per pass of the event loop
+    INDEX_CHUNK = 2000
+
+    def __init__(self, config: AppConfig, bookmark_manager: BookmarkManager, parent=None):
+        super().__init__(parent)
+        self.bookmark_manager = bookmark_manager
+        self._store = EntryStore(search_abstracts=config.search.abstracts)
+        self._sort_index: Optional[SortIndex] = None  # built on first use
+        self._by_id: Dict[str, Entry] = {}  # arXiv id -> bookmarked entry
+        self._loaded = False
+        self._collection: Optional[str] = None  # None for all bookmarks
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        bar = QHBoxLayout()
+        self.search_bar = QLineEdit(
+            placeholderText="Search bookmarks... (au:, ti:, cat: for one field)"
+        )
+        bar.addWidget(self.search_bar)
+        self.collection_combo = QComboBox()
+        self.collection_combo.addItem("All Bookmarks", None)
+        for name in bookmark_manager.collections():
+            self.collection_combo.addItem(name, name)
+        self.collection_combo.activated.connect(self._on_collection_activated)
+        bar.addWidget(self.collection_combo)
+        self.sort_combo = QComboBox()
+        for label, sort_by in SORT_ORDERS:
+            self.sort_combo.addItem(label, sort_by)
+        bar.addWidget(self.sort_combo)
+        self.order_combo = QComboBox()
+        self.order_combo.addItem("Descending", False)
+        self.order_combo.addItem("Ascending", True)
+        bar.addWidget(self.order_combo)
+        layout.addLayout(bar)
+
+        self.list_view = PaperListView(config.ui.card, bookmark_manager.is_bookmarked)
+        self.list_view.entryClicked.connect(self.entryClicked)
+        self.list_view.bookmarkEntryClicked.connect(self.bookmarkEntryClicked)
+        layout.addWidget(self.list_view)
+
+        bottom = QHBoxLayout()
+        self.back_btn = QPushButton("Back")
+        self.back_btn.clicked.connect(self.backClicked)
+        bottom.addWidget(self.back_btn)
+        bottom.addStretch()
+        self.count_label = QLabel()
+        bottom.addWidget(self.count_label)
+        layout.addLayout(bottom)
+
+        # Search once typing pauses, not on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(config.search.debounce_ms)
+        self._search_timer.timeout.connect(self._update_visible)
+        self.search_bar.textChanged.connect(self._search_timer.start)
+        self.sort_combo.currentIndexChanged.connect(self._update_order)
+        self.order_combo.currentIndexChanged.connect(self._update_order)
+        # Index bookmarks for the search while the application is idle
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_entries)
+
+        bookmark_manager.listeners.append(self._on_bookmarks_changed)
+        bookmark_manager.collection_listeners.append(self._on_collection_changed)
+
+    def show_collection(self, collection: Optional[str] = None):
+        """List the bookmarks of `collection`, of all if None."""
+        if not self._loaded:
+            self._load()
+        self._collection = collection
+        self.collection_combo.setCurrentIndex(
+            max(self.collection_combo.findData(collection), 0)
+        )
+        # Bookmarks removed on this page stay listed until it is shown again
+        self._update_order()
+
+    def _load(self):
+        entries = self.bookmark_manager.list_all()
+        self._by_id = {entry.arxiv_id: entry for entry in entries}
+        self._store.append(entries)
+        self._index_timer.start()
+        self._loaded = True
+
+    def _index_entries(self):
+        if not self._store.index_pending(self.INDEX_CHUNK):
+            self._index_timer.stop()
+
+    # -----------------------------
+    # Order and filter
+    # -----------------------------
+    def _sorted_entries(self) -> List[Entry]:
+        sort_by = self.sort_combo.currentData()
+        ascending = self.order_combo.currentData()
+        if sort_by is None:
+            entries = self._store.live_entries()
+            return entries if ascending else entries[::-1]
+
+        if self._sort_index is None:
+            self._sort_index = SortIndex()
+            self._sort_index.add(self._store.live_entries())
+        return self._sort_index.sorted(sort_by, ascending)
+
+    def _visible(self) -> Optional[Set[int]]:
+        """id() of the entries passing the collection and the search, None for all."""
+        visible = None
+        if self._collection is not None:
+            visible = {
+                id(entry)
+                for entry in self.bookmark_manager.list_collection(self._collection)
+            }
+        text = self.search_bar.text()
+        self._store.set_text(text)
+        if text.strip():
+            store = self._store
+            matches = {id(store.entries[row]) for row in store.rows((TEXT,))}
+            visible = matches if visible is None else visible & matches
+        return visible
+
+    def _update_order(self):
+        if not self._loaded:
+            return
+        entries = self._sorted_entries()
+        visible = self._visible()
+        self.list_view.set_entries(entries)
+        self.list_view.set_visible(visible)
+        self._show_count(visible)
+
+    def _update_visible(self):
+        if not self._loaded:
+            return
+        visible = self._visible()
+        self.list_view.set_visible(visible)
+        self._show_count(visible)
+
+    def _show_count(self, visible: Optional[Set[int]]):
+        count = self.list_view.paper_model.rowCount()
+        if visible is None:
+            self.count_label.setText(f"{count} bookmarks")
+        else:
+            total = self.bookmark_manager.count()
+            self.count_label.setText(f"{count} of {total} bookmarks")
+
+    def _on_collection_activated(self, index: int):
+        self._collection = self.collection_combo.itemData(index)
+        self._update_visible()
+
+    # -----------------------------
+    # Bookmark changes
+    # -----------------------------
+    def _on_bookmarks_changed(self, added: Set[str], removed: Set[str]):
+        if not self._loaded:
+            return
+
+        gone = [self._by_id.pop(key) for key in removed if key in self._by_id]
+        self._store.remove(gone)
+        if self._sort_index is not None:
+            self._sort_index.remove(gone)
+
+        new = [self.bookmark_manager.get(key) for key in added]
+        new = [entry for entry in new if entry is not None]
+        for entry in new:
+            self._by_id[entry.arxiv_id] = entry
+        self._store.append(new)
+        if new:
+            self._index_timer.start()
+        if self._sort_index is not None:
+            self._sort_index.add(new)
+
+        # The list itself changes when it is shown again, only the cards of
+        # the papers concerned are redrawn
+        self.list_view.refresh_bookmarks(added | removed)
+
+    def _on_collection_changed(self, name: str):
+        index = self.collection_combo.findData(name)
+        exists = name in self.bookmark_manager.collections()
+        if exists and index < 0:
+            self.collection_combo.addItem(name, name)
+        elif not exists and index >= 0:
+            self.collection_combo.removeItem(index)
+            if name == self._collection:
+                self._collection = None
+                self.collection_combo.setCurrentIndex(0)
+                self._update_visible()
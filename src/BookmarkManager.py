@@ -1,68 +1,476 @@
 import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, overload
-from Entry import Entry
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union, overload
+from Entry import Entry, split_arxiv_id
+from EntryRegistry import registry
+from PaperDatabase import DEFAULT_COLLECTION, PaperDatabase
 
 
-class BookmarkManager:
-    def __init__(self, json_path: str):
+class BookmarkStorage(ABC):
+    """Where the bookmarks are kept. Every change is passed on as it happens."""
+
+    @abstractmethod
+    def load(self) -> List[Entry]:
+        """The bookmarked entries, in the order they were added."""
+
+    @abstractmethod
+    def load_collections(self) -> Tuple[List[str], Dict[str, str]]:
+        """
+        The names of the collections in the order they were created, and the
+        collection of every bookmark outside the default one, by arXiv id.
+        """
+
+    @abstractmethod
+    def add(self, entry: Entry, collection: str = DEFAULT_COLLECTION):
+        ...
+
+    @abstractmethod
+    def remove(self, arxiv_id: str):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def move(self, arxiv_id: str, collection: str):
+        ...
+
+    @abstractmethod
+    def create_collection(self, name: str):
+        ...
+
+    @abstractmethod
+    def delete_collection(self, name: str):
+        """Delete a collection, its bookmarks go to the default collection."""
+
+
+class JsonBookmarkStorage(BookmarkStorage):
+    """
+    The bookmarks and collections in a JSON file, the snapshot, and a journal
+    next to it with the changes since, one JSON line per change. A
+    change is appended to the journal. Once the journal is long, a background
+    thread folds it into a new snapshot, which replaces the old one atomically.
+    Loading replays the journal on the snapshot, ignoring a torn last line.
+    """
+
+    # Journal lines after which the journal is folded into the snapshot
+    COMPACT_AFTER = 500
+
+    def __init__(self, json_path: Union[str, Path]):
         self._path = Path(json_path)
-        self._id_index: set[str] = set()
-        self._bookmarks: List[Entry] = []
-        self._load()
+        self._journal_path = self._path.with_name(self._path.name + ".journal")
+        # The journal being folded into the snapshot, replayed before the journal
+        self._compacting_path = self._path.with_name(
+            self._path.name + ".journal.compacting"
+        )
+        self._raw: Dict[str, dict] = {}  # arXiv id -> entry dict, in order
+        # arXiv id -> collection, for bookmarks outside the default collection
+        self._collection_of: Dict[str, str] = {}
+        self._collections: Dict[str, None] = {DEFAULT_COLLECTION: None}  # in order
+        self._journal = None  # the journal file, open for appending
+        self._lines = 0  # changes in the journal
+        self._compaction: Optional[threading.Thread] = None
 
-    # -----------------------------
-    # Persistence
-    # -----------------------------
-    def _load(self):
+    def load(self) -> List[Entry]:
+        self._raw = {}
+        self._collection_of = {}
+        self._collections = {DEFAULT_COLLECTION: None}
+        self._lines = 0
+        self._load_snapshot()
+        self._replay(self._compacting_path)
+        self._lines = self._replay(self._journal_path)
+
+        entries = []
+        for item in self._raw.values():
+            try:
+                entry = Entry.from_dict(item)
+            except Exception:
+                continue
+            if entry is not None:
+                entries.append(entry)
+
+        if self._lines >= self.COMPACT_AFTER or self._compacting_path.exists():
+            self.compact()
+        return entries
+
+    def load_collections(self) -> Tuple[List[str], Dict[str, str]]:
+        return list(self._collections), dict(self._collection_of)
+
+    def add(self, entry: Entry, collection: str = DEFAULT_COLLECTION):
+        record = {"op": "add", "entry": entry.to_dict()}
+        if collection != DEFAULT_COLLECTION:
+            record["collection"] = collection
+        self._append(record)
+
+    def remove(self, arxiv_id: str):
+        self._append({"op": "remove", "id": arxiv_id})
+
+    def clear(self):
+        self._append({"op": "clear"})
+
+    def move(self, arxiv_id: str, collection: str):
+        self._append({"op": "move", "id": arxiv_id, "collection": collection})
+
+    def create_collection(self, name: str):
+        self._append({"op": "create", "collection": name})
+
+    def delete_collection(self, name: str):
+        self._append({"op": "delete", "collection": name})
+
+    def compact(self):
+        """Fold the journal into the snapshot, in a background thread."""
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+
+        # Changes from now on go to a new journal
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self._compacting_path.exists():
+            # A compaction did not finish, its journal is folded in as well
+            if self._journal_path.exists():
+                with open(self._compacting_path, "ab") as f:
+                    f.write(self._journal_path.read_bytes())
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_path.unlink()
+        elif self._journal_path.exists():
+            os.replace(self._journal_path, self._compacting_path)
+        self._lines = 0
+
+        # The entry dicts are never changed, only replaced, so they are shared
+        snapshot = (dict(self._raw), dict(self._collection_of), list(self._collections))
+        self._compaction = threading.Thread(
+            target=self._write_snapshot, args=snapshot, name="bookmark-compaction"
+        )
+        self._compaction.start()
+
+    def wait(self):
+        """Wait for a running compaction to finish."""
+        if self._compaction is not None:
+            self._compaction.join()
+
+    def _apply(self, record: dict):
+        op = record["op"]
+        if op == "add":
+            item = record["entry"]
+            arxiv_id = split_arxiv_id(item["id"])[0]
+            self._raw[arxiv_id] = item
+            self._set_collection(arxiv_id, record.get("collection", DEFAULT_COLLECTION))
+        elif op == "remove":
+            self._raw.pop(record["id"], None)
+            self._collection_of.pop(record["id"], None)
+        elif op == "clear":
+            self._raw = {}
+            self._collection_of = {}
+        elif op == "move":
+            if record["id"] in self._raw:
+                self._set_collection(record["id"], record["collection"])
+        elif op == "create":
+            self._collections[record["collection"]] = None
+        elif op == "delete":
+            name = record["collection"]
+            if name != DEFAULT_COLLECTION:
+                self._collections.pop(name, None)
+                self._collection_of = {
+                    key: value
+                    for key, value in self._collection_of.items()
+                    if value != name
+                }
+
+    def _set_collection(self, arxiv_id: str, collection: str):
+        if collection == DEFAULT_COLLECTION:
+            self._collection_of.pop(arxiv_id, None)
+        else:
+            self._collection_of[arxiv_id] = collection
+            self._collections.setdefault(collection, None)
+
+    def _append(self, record: dict):
+        self._apply(record)
+        if self._journal is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self._journal_path, "ab")
+        self._journal.write(json.dumps(record).encode() + b"\n")
+        self._journal.flush()
+        os.fsync(self._journal.fileno())
+
+        self._lines += 1
+        if self._lines >= self.COMPACT_AFTER:
+            self.compact()
+
+    def _load_snapshot(self):
         if not self._path.exists():
-            self._bookmarks = []
             return
 
         try:
-            raw = json.loads(self._path.read_text())
-            self._bookmarks = [Entry.from_dict(item) for item in raw]
+            text = self._path.read_text()
+        except OSError:
+            return
+        try:
+            raw = json.loads(text)
+            # Older snapshots are a list of the bookmarked entries
+            if isinstance(raw, dict):
+                for name in raw["collections"]:
+                    self._collections[name] = None
+                raw = raw["bookmarks"]
+            for item in raw:
+                item = dict(item)
+                collection = item.pop("collection", DEFAULT_COLLECTION)
+                arxiv_id = split_arxiv_id(item["id"])[0]
+                self._raw[arxiv_id] = item
+                self._set_collection(arxiv_id, collection)
         except Exception:
-            # Don’t silently corrupt data; just reset and move on.
-            self._bookmarks = []
-        self._build_index()
+            # Snapshots are replaced atomically, so this file was not written
+            # by us. It is kept aside instead of being overwritten.
+            os.replace(self._path, self._path.with_name(self._path.name + ".corrupt"))
+            self._raw = {}
+            self._collection_of = {}
+            self._collections = {DEFAULT_COLLECTION: None}
+
+    def _replay(self, path: Path) -> int:
+        """Apply the changes of a journal, returns their number."""
+        if not path.exists():
+            return 0
 
-    def _build_index(self):
-        """Builds indices for fast lookup."""
-        self._id_index = {e.id for e in self._bookmarks}
+        data = path.read_bytes()
+        # Everything after the last newline is a change cut short by a crash
+        end = data.rfind(b"\n") + 1
+        count = 0
+        for line in data[:end].splitlines():
+            try:
+                self._apply(json.loads(line))
+                count += 1
+            except Exception:
+                continue  # a damaged change, the others still count
+        if end < len(data):
+            # New changes are appended on a line of their own
+            with open(path, "r+b") as f:
+                f.truncate(end)
+        return count
 
-    def _save(self):
-        raw = [entry.to_dict() for entry in self._bookmarks]
-        self._path.write_text(json.dumps(raw, indent=2))
+    def _write_snapshot(
+        self, raw: Dict[str, dict], collection_of: Dict[str, str], collections: List[str]
+    ):
+        bookmarks = [
+            dict(item, collection=collection_of[key]) if key in collection_of else item
+            for key, item in raw.items()
+        ]
+        snapshot = {"collections": collections, "bookmarks": bookmarks}
+        tmp_path = self._path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._path)
+        _fsync_dir(self._path.parent)
+        # The snapshot holds the folded journal now
+        self._compacting_path.unlink(missing_ok=True)
+
+
+def _fsync_dir(path: Path):
+    """Make a rename in `path` durable, where the platform supports it."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SqliteBookmarkStorage(BookmarkStorage):
+    """The bookmarks in the PaperDatabase, a row per bookmark."""
+
+    def __init__(self, database: PaperDatabase):
+        self.database = database
+
+    def load(self) -> List[Entry]:
+        return self.database.bookmarks()
+
+    def load_collections(self) -> Tuple[List[str], Dict[str, str]]:
+        return self.database.collections(), self.database.bookmark_collections()
+
+    def add(self, entry: Entry, collection: str = DEFAULT_COLLECTION):
+        self.database.add_bookmark(entry, collection)
+
+    def remove(self, arxiv_id: str):
+        self.database.remove_bookmark(arxiv_id)
+
+    def clear(self):
+        self.database.clear_bookmarks()
+
+    def move(self, arxiv_id: str, collection: str):
+        self.database.move_bookmark(arxiv_id, collection)
+
+    def create_collection(self, name: str):
+        self.database.create_collection(name)
+
+    def delete_collection(self, name: str):
+        self.database.delete_collection(name)
+
+
+class BookmarkManager:
+    """
+    The bookmarks, each in one named collection. Bookmarks are indexed by the
+    arXiv id of the paper, so adding, removing, looking up and moving one
+    between collections take constant time, and so do the counts.
+    """
+
+    def __init__(self, storage: Union[str, Path, BookmarkStorage]):
+        # A path is a bookmarks.json file
+        if not isinstance(storage, BookmarkStorage):
+            storage = JsonBookmarkStorage(storage)
+        self._storage = storage
+        # arXiv id -> entry, in the order the bookmarks were added
+        self._bookmarks: "OrderedDict[str, Entry]" = OrderedDict()
+        # Collection -> its bookmarks, arXiv id -> entry, in the same order
+        self._collections: Dict[str, "OrderedDict[str, Entry]"] = {}
+        self._collection_of: Dict[str, str] = {}  # arXiv id -> collection
+        # Called with the arXiv ids of the papers bookmarked and unbookmarked
+        self.listeners: List[Callable[[Set[str], Set[str]], None]] = []
+        # Called with a collection that was created, deleted or changed in size
+        self.collection_listeners: List[Callable[[str], None]] = []
+        self._load()
+
+    # -----------------------------
+    # Persistence
+    # -----------------------------
+    def _load(self):
+        entries = registry.resolve_all(self._storage.load())
+        names, collection_of = self._storage.load_collections()
+        self._collections = {DEFAULT_COLLECTION: OrderedDict()}
+        for name in names:
+            self._collections.setdefault(name, OrderedDict())
+        for entry in entries:
+            key = entry.arxiv_id
+            name = collection_of.get(key, DEFAULT_COLLECTION)
+            self._bookmarks[key] = entry
+            self._collections.setdefault(name, OrderedDict())[key] = entry
+            self._collection_of[key] = name
 
     # -----------------------------
     # Operations
     # -----------------------------
-    def add(self, entry: Entry):
-        # Avoid duplicates by id (best unique IDs for arXiv items)
-        if any(e.id == entry.id for e in self._bookmarks):
+    def add(self, entry: Entry, collection: str = DEFAULT_COLLECTION):
+        # Avoid duplicates by paper, any version of it counts
+        entry = registry.resolve(entry)
+        key = entry.arxiv_id
+        if key in self._bookmarks:
             return
 
-        self._bookmarks.append(entry)
-        self._build_index()
-        self._save()
+        self.create_collection(collection)
+        self._bookmarks[key] = entry
+        self._collections[collection][key] = entry
+        self._collection_of[key] = collection
+        self._storage.add(entry, collection)
+        self._notify({key}, set())
+        self._notify_collection(collection)
 
     def remove(self, id: str):
-        before = len(self._bookmarks)
-        self._bookmarks = [e for e in self._bookmarks if e.id != id]
+        """Remove the bookmark of a paper, given the id of any of its versions."""
+        key = split_arxiv_id(id)[0]
+        if self._bookmarks.pop(key, None) is None:
+            return
 
-        if len(self._bookmarks) != before:
-            self._save()
-        self._build_index()
+        collection = self._collection_of.pop(key)
+        del self._collections[collection][key]
+        self._storage.remove(key)
+        self._notify(set(), {key})
+        self._notify_collection(collection)
 
     def list_all(self) -> List[Entry]:
-        return list(self._bookmarks)
+        return list(self._bookmarks.values())
 
     def clear(self):
-        self._bookmarks = []
-        self._save()
-        self._id_index.clear()
+        removed = set(self._bookmarks)
+        self._bookmarks.clear()
+        self._collection_of.clear()
+        for bookmarks in self._collections.values():
+            bookmarks.clear()
+        self._storage.clear()
+        if removed:
+            self._notify(set(), removed)
+            for name in self._collections:
+                self._notify_collection(name)
+
+    def get(self, arxiv_id: str) -> Optional[Entry]:
+        """The bookmarked entry of a paper, by its arXiv id without version."""
+        return self._bookmarks.get(arxiv_id)
 
     def is_bookmarked(self, entry: Entry) -> bool:
-        """Check if an entry is already bookmarked by ID."""
-        return entry.id in self._id_index
+        """Check if any version of the entry is already bookmarked."""
+        return entry.arxiv_id in self._bookmarks
+
+    def count(self, collection: Optional[str] = None) -> int:
+        """Number of bookmarks in a collection, or of all if None."""
+        if collection is None:
+            return len(self._bookmarks)
+        return len(self._collections.get(collection, ()))
+
+    # -----------------------------
+    # Collections
+    # -----------------------------
+    def collections(self) -> List[str]:
+        """Names of the collections, the default one first."""
+        return list(self._collections)
+
+    def collection_of(self, entry: Entry) -> Optional[str]:
+        """The collection of a bookmarked paper, None if it is not bookmarked."""
+        return self._collection_of.get(entry.arxiv_id)
+
+    def list_collection(self, collection: str) -> List[Entry]:
+        return list(self._collections.get(collection, {}).values())
+
+    def create_collection(self, name: str):
+        if name in self._collections:
+            return
+        self._collections[name] = OrderedDict()
+        self._storage.create_collection(name)
+        self._notify_collection(name)
+
+    def delete_collection(self, name: str):
+        """Delete a collection, its bookmarks go to the default collection."""
+        if name == DEFAULT_COLLECTION:
+            raise ValueError("The default collection cannot be deleted")
+        bookmarks = self._collections.pop(name, None)
+        if bookmarks is None:
+            return
+
+        default = self._collections[DEFAULT_COLLECTION]
+        for key, entry in bookmarks.items():
+            default[key] = entry
+            self._collection_of[key] = DEFAULT_COLLECTION
+        self._storage.delete_collection(name)
+        self._notify_collection(name)
+        if bookmarks:
+            self._notify_collection(DEFAULT_COLLECTION)
+
+    def move(self, entry: Entry, collection: str):
+        """Put a bookmarked paper into another collection."""
+        key = entry.arxiv_id
+        source = self._collection_of.get(key)
+        if source is None or source == collection:
+            return
+
+        self.create_collection(collection)
+        self._collections[collection][key] = self._collections[source].pop(key)
+        self._collection_of[key] = collection
+        self._storage.move(key, collection)
+        self._notify_collection(source)
+        self._notify_collection(collection)
+
+    def _notify(self, added: Set[str], removed: Set[str]):
+        for listener in self.listeners:
+            listener(added, removed)
+
+    def _notify_collection(self, name: str):
+        for listener in self.collection_listeners:
+            listener(name)
@@ -0,0 +1,411 @@
+# Paints paper cards for the virtualized paper list. Instead of a widget tree per
+# paper, the delegate lays out and paints the card of a row only while the row is
+# on screen, and hit-tests clicks on the title and the buttons itself. A card
+# shows what an EntryCard shows and follows the same CardConfig options.
+
+from typing import Dict, List, Optional, Tuple
+
+from PyQt6.QtCore import QEvent, QPoint, QRect, QSize, Qt, QUrl, pyqtSignal
+from PyQt6.QtGui import QDesktopServices, QFont, QFontMetrics, QPainter, QPalette
+from PyQt6.QtWidgets import (
+    QApplication,
+    QStyle,
+    QStyledItemDelegate,
+    QStyleOptionButton,
+)
+from Config import CardConfig
+from Entry import Entry
+
+# Item data roles of the paper list models
+ENTRY_ROLE = Qt.ItemDataRole.UserRole + 1
+BOOKMARKED_ROLE = Qt.ItemDataRole.UserRole + 2
+NEW_ROLE = Qt.ItemDataRole.UserRole + 3
+
+# Parts of a card that react to clicks
+TITLE = "title"
+BOOKMARK = "bookmark"
+PDF = "pdf"
+WEBPAGE = "webpage"
+
+MARGIN = 10  # between the card and the sides of the list
+PADDING = 10  # inside the card
+SPACING = 6  # between the parts of a card
+PILL_PADDING = QSize(5, 2)  # around the text of tags and the "New" badge
+
+
+class CardLayout:
+    """Geometry of a card, relative to its top left corner."""
+
+    def __init__(self):
+        self.height = 0
+        self.new_badge: Optional[QRect] = None
+        self.title: Optional[QRect] = None
+        self.tags: List[Tuple[QRect, str]] = []
+        self.authors: Optional[QRect] = None
+        self.authors_text = ""
+        self.doi: Optional[QRect] = None
+        self.date: Optional[QRect] = None
+        self.buttons: List[Tuple[str, QRect]] = []  # (part, rect)
+
+
+class CardDelegate(QStyledItemDelegate):
+    entryClicked = pyqtSignal(object)
+    bookmarkClicked = pyqtSignal(object)
+
+    BUTTON_TEXTS = {
+        BOOKMARK: ("Bookmark", "Bookmarked"),
+        PDF: ("PDF",),
+        WEBPAGE: ("Arxiv Page",),
+    }
+
+    def __init__(self, config: CardConfig, parent=None):
+        super().__init__(parent)
+        self.config = config
+        self._build_fonts()
+
+        self._button_sizes: Dict[str, QSize] = {}
+        # (entry id, new) -> card height, for rows _heights_width wide
+        self._heights: Dict[Tuple[str, bool], int] = {}
+        self._heights_width = -1
+
+        self.pressed: Optional[Tuple[int, str]] = None  # (row, part)
+        self.hovered: Optional[Tuple[int, str]] = None  # (row, part)
+
+    def _build_fonts(self):
+        c = self.config
+        base = QApplication.font()
+        self.title_font = QFont(base)
+        self.title_font.setPixelSize(c.font_title)
+        self.title_font.setBold(True)
+        self.authors_font = QFont(base)
+        self.authors_font.setPixelSize(c.font_authors)
+        self.authors_font.setItalic(True)
+        self.meta_font = QFont(base)
+        self.meta_font.setPixelSize(c.font_meta)
+        self.badge_font = QFont(self.meta_font)
+        self.badge_font.setBold(True)
+
+    def config_changed(self):
+        """Lay out all cards again after the CardConfig was edited in place."""
+        self._build_fonts()
+        self._button_sizes.clear()
+        self._heights.clear()
+        view = self.parent()
+        if view is not None:
+            view.doItemsLayout()
+
+    # -----------------------------
+    # Layout
+    # -----------------------------
+    def card_layout(self, width: int, entry: Entry, new: bool) -> CardLayout:
+        """Lay out the card of `entry` for a card `width` pixels wide."""
+        c = self.config
+        layout = CardLayout()
+        inner = width - 2 * PADDING
+        y = PADDING
+
+        if new:
+            layout.new_badge = self._pill(self.badge_font, "New", PADDING, y)
+            y += layout.new_badge.height() + SPACING
+
+        if c.show_title:
+            height = self._text_height(self.title_font, entry.title, inner, c.wrap_title)
+            layout.title = QRect(PADDING, y, inner, height)
+            y += height + SPACING
+
+        if c.show_tags and entry.tags:
+            x = PADDING
+            for tag in entry.tags:
+                pill = self._pill(self.meta_font, tag, x, y)
+                if pill.right() > PADDING + inner:
+                    break
+                layout.tags.append((pill, tag))
+                x = pill.right() + 1 + SPACING
+            if layout.tags:
+                y += layout.tags[0][0].height() + SPACING
+
+        if c.show_authors:
+            authors = list(entry.author_names)
+            if c.authors_truncate and len(authors) > c.authors_truncate:
+                authors = authors[: c.authors_truncate] + ["et al."]
+            layout.authors_text = ", ".join(authors)
+            height = self._text_height(
+                self.authors_font, layout.authors_text, inner, c.wrap_authors
+            )
+            layout.authors = QRect(PADDING, y, inner, height)
+            y += height + SPACING
+
+        if c.show_doi and entry.doi:
+            height = QFontMetrics(self.meta_font).height()
+            layout.doi = QRect(PADDING, y, inner, height)
+            y += height + SPACING
+
+        # Bottom row: the date on the left, the buttons on the right
+        parts = [
+            part
+            for part, shown in (
+                (BOOKMARK, c.show_bookmark_button),
+                (PDF, c.show_pdf_button),
+                (WEBPAGE, c.show_webpage_button),
+            )
+            if shown
+        ]
+        row_height = max(
+            [self._button_size(part).height() for part in parts]
+            + [QFontMetrics(self.meta_font).height() if c.show_date else 0]
+        )
+        if row_height:
+            x = PADDING + inner
+            for part in reversed(parts):
+                size = self._button_size(part)
+                x -= size.width()
+                top = y + (row_height - size.height()) // 2
+                layout.buttons.insert(0, (part, QRect(QPoint(x, top), size)))
+                x -= SPACING
+            if c.show_date:
+                layout.date = QRect(PADDING, y, max(x - PADDING, 0), row_height)
+            y += row_height + SPACING
+
+        layout.height = y - SPACING + PADDING if y > PADDING else 2 * PADDING
+        return layout
+
+    def _text_height(self, font: QFont, text: str, width: int, wrap: bool) -> int:
+        metrics = QFontMetrics(font)
+        if not wrap:
+            return metrics.height()
+        bounds = QRect(0, 0, max(width, 1), 1 << 20)
+        return metrics.boundingRect(bounds, Qt.TextFlag.TextWordWrap, text).height()
+
+    def _pill(self, font: QFont, text: str, x: int, y: int) -> QRect:
+        metrics = QFontMetrics(font)
+        return QRect(
+            x,
+            y,
+            metrics.horizontalAdvance(text) + 2 * PILL_PADDING.width(),
+            metrics.height() + 2 * PILL_PADDING.height(),
+        )
+
+    def _button_size(self, part: str) -> QSize:
+        """Size of a button, wide enough for all of its texts."""
+        size = self._button_sizes.get(part)
+        if size is None:
+            style = QApplication.style()
+            metrics = QFontMetrics(QApplication.font())
+            size = QSize()
+            for text in self.BUTTON_TEXTS[part]:
+                option = QStyleOptionButton()
+                option.text = text
+                option.fontMetrics = metrics
+                hint = style.sizeFromContents(
+                    QStyle.ContentsType.CT_PushButton,
+                    option,
+                    QSize(metrics.horizontalAdvance(text), metrics.height()),
+                )
+                size = size.expandedTo(hint)
+            self._button_sizes[part] = size
+        return size
+
+    @staticmethod
+    def card_rect(option_rect: QRect, height: int) -> QRect:
+        """The card in the rect of its row."""
+        return QRect(
+            option_rect.left() + MARGIN,
+            option_rect.top(),
+            option_rect.width() - 2 * MARGIN,
+            height,
+        )
+
+    def sizeHint(self, option, index) -> QSize:
+        width = self._row_width(option)
+        if width != self._heights_width:
+            self._heights.clear()
+            self._heights_width = width
+
+        entry: Entry = index.data(ENTRY_ROLE)
+        key = (entry.id, bool(index.data(NEW_ROLE)))
+        height = self._heights.get(key)
+        if height is None:
+            height = self.card_layout(width - 2 * MARGIN, entry, key[1]).height
+            self._heights[key] = height
+        return QSize(width, height + self.config.spacing)
+
+    @staticmethod
+    def _row_width(option) -> int:
+        """Width of the rows, the width of the list without scroll bar."""
+        if option.widget is not None:
+            return option.widget.viewport().width()
+        return option.rect.width()
+
+    # -----------------------------
+    # Painting
+    # -----------------------------
+    def paint(self, painter: QPainter, option, index):
+        entry: Entry = index.data(ENTRY_ROLE)
+        bookmarked = bool(index.data(BOOKMARKED_ROLE))
+        row = index.row()
+        card = self.card_rect(option.rect, 0)
+        layout = self.card_layout(card.width(), entry, bool(index.data(NEW_ROLE)))
+        palette: QPalette = option.palette
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.translate(card.topLeft())
+
+        radius = self.config.border_radius
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(palette.color(QPalette.ColorRole.Base))
+        painter.drawRoundedRect(QRect(0, 0, card.width(), layout.height), radius, radius)
+
+        if layout.new_badge is not None:
+            self._draw_pill(
+                painter,
+                layout.new_badge,
+                "New",
+                self.badge_font,
+                palette.color(QPalette.ColorRole.Highlight),
+                palette.color(QPalette.ColorRole.HighlightedText),
+            )
+
+        painter.setPen(palette.color(QPalette.ColorRole.Text))
+        if layout.title is not None:
+            font = QFont(self.title_font)
+            font.setUnderline(self.hovered == (row, TITLE))
+            self._draw_text(
+                painter, layout.title, entry.title, font, self.config.wrap_title
+            )
+
+        for rect, tag in layout.tags:
+            self._draw_pill(
+                painter,
+                rect,
+                tag,
+                self.meta_font,
+                palette.color(QPalette.ColorRole.Mid),
+                palette.color(QPalette.ColorRole.Text),
+            )
+
+        if layout.authors is not None:
+            self._draw_text(
+                painter,
+                layout.authors,
+                layout.authors_text,
+                self.authors_font,
+                self.config.wrap_authors,
+            )
+        if layout.doi is not None:
+            self._draw_text(painter, layout.doi, f"DOI: {entry.doi}", self.meta_font)
+        if layout.date is not None:
+            self._draw_text(
+                painter, layout.date, f"Published: {entry.published}", self.meta_font
+            )
+
+        for part, rect in layout.buttons:
+            self._draw_button(painter, option, row, part, rect, bookmarked)
+
+        painter.restore()
+
+    def _draw_text(
+        self, painter: QPainter, rect: QRect, text: str, font: QFont, wrap=False
+    ):
+        painter.setFont(font)
+        flags = Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter
+        if wrap:
+            painter.drawText(rect, flags | Qt.TextFlag.TextWordWrap, text)
+        else:
+            text = QFontMetrics(font).elidedText(
+                text, Qt.TextElideMode.ElideRight, rect.width()
+            )
+            painter.drawText(rect, flags, text)
+
+    def _draw_pill(self, painter: QPainter, rect: QRect, text, font, background, color):
+        painter.save()
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, 5, 5)
+        painter.setPen(color)
+        painter.setFont(font)
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, text)
+        painter.restore()
+
+    def _draw_button(self, painter, option, row, part, rect, bookmarked):
+        button = QStyleOptionButton()
+        button.rect = rect
+        button.text = self.BUTTON_TEXTS[part][int(part == BOOKMARK and bookmarked)]
+        button.palette = QPalette(option.palette)
+        button.state = QStyle.StateFlag.State_Enabled
+        if self.pressed == (row, part):
+            button.state |= QStyle.StateFlag.State_Sunken
+        else:
+            button.state |= QStyle.StateFlag.State_Raised
+        if self.hovered == (row, part):
+            button.state |= QStyle.StateFlag.State_MouseOver
+
+        if part == BOOKMARK and bookmarked:
+            # Like EntryCard, a bookmarked paper has a highlighted button
+            palette = button.palette
+            palette.setColor(
+                QPalette.ColorRole.Button, palette.color(QPalette.ColorRole.Highlight)
+            )
+            palette.setColor(
+                QPalette.ColorRole.ButtonText,
+                palette.color(QPalette.ColorRole.HighlightedText),
+            )
+
+        painter.save()
+        painter.setFont(QApplication.font())
+        style = option.widget.style() if option.widget else QApplication.style()
+        style.drawControl(
+            QStyle.ControlElement.CE_PushButton, button, painter, option.widget
+        )
+        painter.restore()
+
+    # -----------------------------
+    # Mouse
+    # -----------------------------
+    def hit_test(self, option_rect: QRect, index, pos: QPoint) -> Optional[str]:
+        """The clickable part of the card of `index` at `pos`, or None."""
+        entry: Entry = index.data(ENTRY_ROLE)
+        card = self.card_rect(option_rect, 0)
+        layout = self.card_layout(card.width(), entry, bool(index.data(NEW_ROLE)))
+        pos = pos - card.topLeft()
+
+        if layout.title is not None and layout.title.contains(pos):
+            return TITLE
+        for part, rect in layout.buttons:
+            if rect.contains(pos):
+                return part
+        return None
+
+    def editorEvent(self, event, model, option, index) -> bool:
+        if event.type() not in (
+            QEvent.Type.MouseButtonPress,
+            QEvent.Type.MouseButtonRelease,
+        ):
+            return False
+        if event.button() != Qt.MouseButton.LeftButton:
+            return False
+
+        part = self.hit_test(option.rect, index, event.position().toPoint())
+        target = (index.row(), part) if part else None
+
+        if event.type() == QEvent.Type.MouseButtonPress:
+            self.pressed = target
+        else:
+            pressed, self.pressed = self.pressed, None
+            if target is not None and pressed == target:
+                self._activate(part, index.data(ENTRY_ROLE))
+            target = pressed
+
+        if option.widget is not None:
+            option.widget.viewport().update(option.rect)
+        return target is not None
+
+    def _activate(self, part: str, entry: Entry):
+        if part == TITLE:
+            self.entryClicked.emit(entry)
+        elif part == BOOKMARK:
+            self.bookmarkClicked.emit(entry)
+        elif part == PDF:
+            QDesktopServices.openUrl(QUrl(entry.link.replace("abs", "pdf")))
+        elif part == WEBPAGE:
+            QDesktopServices.openUrl(QUrl(entry.link))
@@ -0,0 +1,282 @@
+# The paper list with a widget per paper: an EntryCard for every displayed entry,
+# in a scroll area. PaperListView shows the same list virtualized. Both offer the
+# methods PaperWatch uses to fill, sort and filter the list, and the same signals.
+#
+# Cards are never rebuilt for a paper that stays in the list: refilling, sorting
+# and filtering move and rebind the existing cards, and cards that leave the list
+# go to a CardPool for the next papers to show.
+#
+# Cards that have to be built are built front to back in slices of the event
+# loop, each within the render budget, so the list repaints and stays responsive
+# while a large result fills in. The first slice fills the screen, whatever the
+# budget. Filling, sorting or changing the list again restarts the render with
+# the new order.
+
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtWidgets import QFrame, QScrollArea, QVBoxLayout, QWidget
+from CardPool import CardPool
+from Config import CardConfig
+from Entry import Entry
+from EntryCard import EntryCard
+
+
+class CardListWidget(QScrollArea):
+    entryClicked = pyqtSignal(object)
+    bookmarkEntryClicked = pyqtSignal(object)
+    # Cards built so far and cards to build, (total, total) when done
+    renderProgress = pyqtSignal(int, int)
+
+    def __init__(
+        self,
+        config: CardConfig,
+        is_bookmarked: Callable[[Entry], bool],
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.config = config
+        self.is_bookmarked = is_bookmarked
+
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
+        self.setFrameStyle(QFrame.Shape.NoFrame)
+        self.setContentsMargins(0, 0, 0, 0)
+        self.setWidgetResizable(True)
+
+        self.pool = CardPool(self._create_card, config.pool_size)
+        self._cards: Dict[str, EntryCard] = {}  # arXiv id -> card in the list
+
+        self.card_layout = QVBoxLayout()
+        self.card_layout.setSpacing(config.spacing)
+        container = QWidget()
+        container.setLayout(self.card_layout)
+        self.setWidget(container)
+
+        self._anchor = None  # (card, its top in the viewport) to keep in place
+        self.verticalScrollBar().rangeChanged.connect(self._restore_anchor)
+        self.verticalScrollBar().actionTriggered.connect(self._on_scroll_action)
+
+        self._visible: Optional[Set[int]] = None  # id() of the shown entries
+        self._new: Set[int] = set()  # id() of entries to build marked as new
+        # The render in progress: the display order, the next entry of it to
+        # look at, and the layout position of its card
+        self._order: List[Entry] = []
+        self._next = 0
+        self._position = 0
+        self._built = 0
+        self._to_build = 0
+        self._render_timer = QTimer(self)
+        self._render_timer.setInterval(0)
+        self._render_timer.timeout.connect(self._render_step)
+
+    def set_entries(self, entries: List[Entry]):
+        """Show `entries`, in this order, in place of the current ones."""
+        self._anchor = None
+        self._visible = None
+        self._new = set()
+        keys = {entry.arxiv_id for entry in entries}
+        for key in [key for key in self._cards if key not in keys]:
+            self.pool.release(self._cards.pop(key))
+
+        self._take_all()
+        for entry in entries:
+            card = self._cards.get(entry.arxiv_id)
+            if card is not None:
+                if card.entry is not entry:
+                    card.setEntry(entry)
+                card.setNew(False)
+                card.setVisible(True)
+                self.card_layout.addWidget(card)
+        self.card_layout.addStretch()
+        self._render(entries)
+
+    def insert_entries(
+        self,
+        entries: List[Entry],
+        new_entries: List[Entry],
+        new: bool = False,
+        visible: Optional[Set[int]] = None,
+    ):
+        """
+        Add cards for `new_entries`. `entries` is the display order with them
+        added. If a filter is set, `visible` is the filter with the new entries
+        that pass it.
+        """
+        if not new_entries:
+            return
+
+        if self.card_layout.count() == 0:
+            self.card_layout.addStretch()
+        if new:
+            self._new.update(id(entry) for entry in new_entries)
+        if visible is not None:
+            self._visible = visible
+        self._render(entries)
+
+    def remove_entries(self, removed: List[Entry]):
+        """Take the cards of entries out of the list, into the pool."""
+        for entry in removed:
+            card = self._cards.pop(entry.arxiv_id, None)
+            if card is not None:
+                self.card_layout.removeWidget(card)
+                self.pool.release(card)
+        if self._order:
+            ids = {id(entry) for entry in removed}
+            self._render([e for e in self._order if id(e) not in ids])
+
+    def update_entries(self, changed: List[Entry]):
+        """Show the current fields of entries that changed."""
+        for entry in changed:
+            card = self._cards.get(entry.arxiv_id)
+            if card is not None:
+                card.setEntry(entry)
+
+    def reorder(self, entries: List[Entry]):
+        """Move the cards into the order of `entries`."""
+        self._take_all()
+        for entry in entries:
+            card = self._cards.get(entry.arxiv_id)
+            if card is not None:
+                self.card_layout.addWidget(card)
+        self.card_layout.addStretch()
+        if self._order:
+            self._render(entries)
+
+    def set_visible(self, visible: Optional[Set[int]]):
+        """Only show the entries whose id() is in `visible`, all if None."""
+        self._anchor = None
+        self._visible = visible
+        for card in self._cards.values():
+            card.setVisible(visible is None or id(card.entry) in visible)
+
+    def refresh_bookmarks(self, arxiv_ids: Optional[Iterable[str]] = None):
+        """Update the bookmark state of the cards of `arxiv_ids`, of all if None."""
+        if arxiv_ids is None:
+            cards = self._cards.values()
+        else:
+            cards = [self._cards[key] for key in arxiv_ids if key in self._cards]
+        for card in cards:
+            card.setBookmarked(self.is_bookmarked(card.entry))
+
+    def keep_scroll_anchor(self):
+        """
+        Keep the card at the top of the view in its place on screen while the
+        list changes. The anchor holds, also while cards settle in their sizes,
+        until the user scrolls or the list is filled or filtered anew.
+        """
+        value = self.verticalScrollBar().value()
+        if value == 0:
+            return  # at the top the view stays at the top, showing new papers
+
+        # The top of the view may be in the spacing between two cards
+        widget = None
+        for y in range(value, value + self.card_layout.spacing() + 2):
+            widget = self.widget().childAt(self.widget().width() // 2, y)
+            while widget is not None and not isinstance(widget, EntryCard):
+                widget = widget.parentWidget()
+            if widget is not None:
+                break
+        if widget is not None:
+            self._anchor = (widget, widget.y() - value)
+            QTimer.singleShot(0, self._restore_anchor)
+
+    def _restore_anchor(self):
+        if self._anchor is None:
+            return
+
+        card, offset = self._anchor
+        if self._cards.get(card.entry.arxiv_id) is not card:
+            self._anchor = None
+            return
+
+        # Place the cards now, it resizes the list and updates the scroll range
+        self.card_layout.activate()
+        bar = self.verticalScrollBar()
+        target = card.y() - offset
+        bar.setValue(target)
+
+    def _on_scroll_action(self, action: int):
+        # The user scrolled, the anchor no longer matters
+        self._anchor = None
+
+    def _render(self, order: List[Entry]):
+        """Build the missing cards of the display order `order`."""
+        self._order = list(order)
+        self._next = 0
+        self._position = 0
+        self._built = 0
+        self._to_build = sum(1 for e in self._order if e.arxiv_id not in self._cards)
+        if not self._to_build:
+            self._finish_render()
+            return
+
+        # Fill the screen at once, the rest follows in slices
+        bar = self.verticalScrollBar()
+        self._render_step(bar.value() + self.viewport().height())
+        if self._order:
+            self._render_timer.start()
+
+    def _render_step(self, fill: int = 0):
+        """
+        Build cards until the render budget is spent, or, with `fill`, until
+        the cards reach `fill` pixels down the list.
+        """
+        budget = self.config.render_budget_ms / 1000
+        deadline = time.perf_counter() + budget
+        spacing = self.card_layout.spacing()
+        height = 0
+        order = self._order
+        while self._next < len(order):
+            entry = order[self._next]
+            self._next += 1
+            card = self._cards.get(entry.arxiv_id)
+            if card is None:
+                card = self._acquire(entry)
+                if id(entry) in self._new:
+                    self._new.discard(id(entry))
+                    card.setNew(True)
+                self.card_layout.insertWidget(self._position, card)
+                self._built += 1
+                if fill and card.isVisibleTo(self):
+                    height += card.sizeHint().height() + spacing
+            elif fill and card.isVisibleTo(self):
+                height += card.height() + spacing
+            self._position += 1
+
+            if fill:
+                if height >= fill:
+                    break
+            elif time.perf_counter() >= deadline:
+                break
+
+        if self._next < len(order):
+            self.renderProgress.emit(self._built, self._to_build)
+        else:
+            self._finish_render()
+
+    def _finish_render(self):
+        self._render_timer.stop()
+        self._order = []
+        self._new = set()
+        self.renderProgress.emit(self._to_build, self._to_build)
+
+    def _acquire(self, entry: Entry) -> EntryCard:
+        card = self.pool.acquire(entry)
+        card.setNew(False)
+        card.setBookmarked(self.is_bookmarked(entry))
+        card.setVisible(self._visible is None or id(entry) in self._visible)
+        self._cards[entry.arxiv_id] = card
+        return card
+
+    def _take_all(self):
+        """Take all items out of the layout, keeping the cards."""
+        for i in reversed(range(self.card_layout.count())):
+            self.card_layout.takeAt(i)
+
+    def _create_card(self, entry: Entry) -> EntryCard:
+        card = EntryCard(entry)
+        card.entryClicked.connect(self.entryClicked)
+        card.bookmarkEntryClicked.connect(self.bookmarkEntryClicked)
+        card.setBookmarked(self.is_bookmarked(entry))
+        return card
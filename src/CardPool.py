@@ -0,0 +1,75 @@
+# Pool of EntryCard widgets, keyed by the arXiv id of their entry. Cards taken
+# out of the paper list are released into the pool instead of being destroyed.
+# Showing a paper again picks up its own card. Another paper recycles a
+# released card by binding its entry to it. Only when the pool is empty is a
+# card built. Released cards beyond the cap are destroyed, least recently
+# released first.
+
+from collections import OrderedDict
+from typing import Callable, Dict
+
+from EntryCard import EntryCard
+from Entry import Entry
+
+
+class CardPool:
+    def __init__(self, create: Callable[[Entry], EntryCard], capacity: int = 200):
+        self._create = create
+        self.capacity = capacity
+        # arXiv id -> released card, least recently released first
+        self._spare: "OrderedDict[str, EntryCard]" = OrderedDict()
+
+        self.created = 0  # cards built
+        self.reused = 0  # cards given back for the paper they showed
+        self.rebound = 0  # cards recycled for another paper
+        self.destroyed = 0  # cards deleted because the pool was full
+
+    def __len__(self) -> int:
+        return len(self._spare)
+
+    def acquire(self, entry: Entry) -> EntryCard:
+        """A card showing `entry`, from the pool if possible."""
+        card = self._spare.pop(entry.arxiv_id, None)
+        if card is not None:
+            self.reused += 1
+            if card.entry is not entry:
+                card.setEntry(entry)
+        elif self._spare:
+            _, card = self._spare.popitem(last=False)
+            self.rebound += 1
+            card.setEntry(entry)
+        else:
+            card = self._create(entry)
+            self.created += 1
+        return card
+
+    def release(self, card: EntryCard):
+        """Keep a card that left the list for later use."""
+        card.hide()
+        key = card.entry.arxiv_id
+        replaced = self._spare.pop(key, None)
+        if replaced is not None and replaced is not card:
+            self._destroy(replaced)
+        self._spare[key] = card
+
+        while len(self._spare) > self.capacity:
+            _, oldest = self._spare.popitem(last=False)
+            self._destroy(oldest)
+
+    def clear(self):
+        while self._spare:
+            _, card = self._spare.popitem()
+            self._destroy(card)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "rebound": self.rebound,
+            "destroyed": self.destroyed,
+            "pooled": len(self._spare),
+        }
+
+    def _destroy(self, card: EntryCard):
+        card.deleteLater()
+        self.destroyed += 1
@@ -1,8 +1,8 @@
 # Use pydantic and toml to create a configuration class that loads settings from a TOML file.
 
-from pydantic import BaseModel, Field, PositiveInt
+from pydantic import BaseModel, Field, PositiveInt, field_validator
 import tomllib
-from typing import Optional
+from typing import Literal, Optional
 
 
 class CardConfig(BaseModel):
@@ -30,6 +30,14 @@ class CardConfig(BaseModel):
     shadow: bool = True
     border_radius: int = 0
 
+    # Paint the cards of the visible papers only, instead of a widget per paper
+    virtualized: bool = True
+    # Cards kept for reuse after they leave the list, without virtualized
+    pool_size: PositiveInt = 200
+    # Milliseconds per pass of the event loop spent building cards, without
+    # virtualized
+    render_budget_ms: PositiveInt = 8
+
 
 # SIDE PANEL CONFIG
 
@@ -64,6 +72,18 @@ class ArxivConfig(BaseModel):
     max_results: PositiveInt = Field(
         50, description="Maximum number of results to fetch from arXiv API per query."
     )
+    page_size: PositiveInt = Field(
+        100, description="Number of results requested from arXiv API per page."
+    )
+    request_delay: float = Field(
+        3.0, description="Seconds to wait between consecutive arXiv API requests."
+    )
+    max_concurrent_requests: PositiveInt = Field(
+        2, description="Maximum number of arXiv API requests in flight at once."
+    )
+    request_timeout: PositiveInt = Field(
+        60, description="Seconds after which a stalled arXiv API request is aborted."
+    )
     subjects: Optional[list[str]] = Field(
         None, description="List of arXiv subject categories to filter papers."
     )
@@ -87,10 +107,125 @@ class ArxivConfig(BaseModel):
     )
 
 
+# SUBSCRIPTIONS CONFIG
+
+
+class SubscriptionConfig(BaseModel):
+    name: str = Field(..., description="Name shown in the side panel.")
+    keywords: Optional[list[str]] = Field(
+        None, description="List of keywords to search for in paper titles."
+    )
+    subjects: Optional[list[str]] = Field(
+        None, description="List of arXiv subject categories to filter papers."
+    )
+    max_results: Optional[PositiveInt] = Field(
+        None, description="Overrides arxiv.max_results for this subscription."
+    )
+    poll_interval: Optional[PositiveInt] = Field(
+        None, description="Overrides polling.interval for this subscription."
+    )
+
+
+# POLLING CONFIG
+
+
+class PollingConfig(BaseModel):
+    enabled: bool = Field(True, description="Fetch subscriptions periodically.")
+    interval: PositiveInt = Field(
+        3600, description="Seconds between two polls of a subscription."
+    )
+    backoff_base: PositiveInt = Field(
+        30, description="Seconds to wait before retrying a failed poll."
+    )
+    backoff_max: PositiveInt = Field(
+        1800, description="Longest wait between retries of a failing poll."
+    )
+    failure_threshold: PositiveInt = Field(
+        5, description="Consecutive failures after which a subscription is paused."
+    )
+    breaker_cooldown: PositiveInt = Field(
+        3600, description="Seconds a failing subscription is paused for."
+    )
+
+
+# RESULT CACHE CONFIG
+
+
+class CacheConfig(BaseModel):
+    enabled: bool = Field(
+        True, description="Keep fetched results on disk and show them on startup."
+    )
+    ttl: PositiveInt = Field(
+        3600, description="Seconds after which cached results are revalidated."
+    )
+    max_size_mb: PositiveInt = Field(
+        50, description="Maximum size of the result cache on disk."
+    )
+
+
+# DOI TO BIBTEX CONFIG
+
+
+class BibtexConfig(BaseModel):
+    max_concurrent_requests: PositiveInt = Field(
+        4, description="Maximum number of DOI lookups in flight per host."
+    )
+    request_delay: float = Field(
+        0.2, description="Seconds to wait between consecutive lookups on a host."
+    )
+    request_timeout: PositiveInt = Field(
+        30, description="Seconds after which a stalled DOI lookup is aborted."
+    )
+
+
+# SEARCH CONFIG
+
+
+class SearchConfig(BaseModel):
+    abstracts: bool = Field(
+        False, description="Also search the abstracts, not only titles and authors."
+    )
+    debounce_ms: int = Field(
+        150, ge=0, description="Milliseconds of typing pause before searching."
+    )
+
+
+# BOOKMARK CONFIG
+
+
+class BookmarkConfig(BaseModel):
+    backend: Literal["sqlite", "json"] = Field(
+        "sqlite", description="Keep bookmarks in the database or in bookmarks.json."
+    )
+    file_path: str = Field(
+        "bookmarks.sqlite",
+        description="Database of bookmarks, read papers and fetch history, "
+        "relative to the application data directory.",
+    )
+
+
 class AppConfig(BaseModel):
     file_path: Optional[str] = None
     arxiv: ArxivConfig = ArxivConfig()
     ui: UIConfig = UIConfig()
+    cache: CacheConfig = CacheConfig()
+    subscriptions: list[SubscriptionConfig] = []
+    polling: PollingConfig = PollingConfig()
+    bibtex: BibtexConfig = BibtexConfig()
+    bookmark: BookmarkConfig = BookmarkConfig()
+    search: SearchConfig = SearchConfig()
+
+    @field_validator("subscriptions")
+    @classmethod
+    def _unique_subscription_names(cls, subscriptions):
+        # Subscriptions are told apart by name, in the side panel and the poller
+        names = [subscription.name for subscription in subscriptions]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(
+                f"subscription names must be unique: {', '.join(duplicates)}"
+            )
+        return subscriptions
 
 
 def load_config(file_path: str) -> ArxivConfig:
@@ -15,11 +15,14 @@ from PyQt6.QtWidgets import (
     QListWidgetItem,
     QInputDialog,
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, pyqtSignal
 from Config import AppConfig, CardConfig, StatusbarConfig
 import tomli_w
 
 class ConfigEditorWidget(QWidget):
+    # The edited config was saved, the new values are in place
+    configChanged = pyqtSignal()
+
     def __init__(self, config: AppConfig):
         super().__init__()
         self.config: AppConfig = config
@@ -118,6 +121,7 @@ class ConfigEditorWidget(QWidget):
             return  # No path provided
 
         updated_config = self.get_config()  # Get updated AppConfig
+        self.configChanged.emit()
         with open(self.config.file_path, "wb") as f:
             print(tomli_w.dumps(updated_config()).encode("utf-8"))
         QMessageBox.information(self, "Saved", "Configuration saved successfully.")
@@ -190,6 +194,10 @@ class ConfigEditorWidget(QWidget):
         self.card_show_pdf = add_checkbox("Show PDF button", c.show_pdf_button)
         self.card_show_web = add_checkbox("Show webpage button", c.show_webpage_button)
 
+        self.card_virtualized = add_checkbox(
+            "Virtualized paper list (after restart)", c.virtualized
+        )
+
         layout.addWidget(QLabel("Border radius"))
         self.card_radius = QSpinBox()
         self.card_radius.setRange(0, 40)
@@ -257,6 +265,7 @@ class ConfigEditorWidget(QWidget):
         card.show_pdf_button = self.card_show_pdf.isChecked()
         card.show_webpage_button = self.card_show_web.isChecked()
         card.border_radius = self.card_radius.value()
+        card.virtualized = self.card_virtualized.isChecked()
 
         # STATUSBAR
         s: StatusbarConfig = c.ui.statusbar
@@ -1,23 +1,221 @@
-from PyQt6.QtCore import QUrl, QObject, pyqtSignal
-from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+# Resolves DOIs to BibTeX through doi.org content negotiation. Lookups are done
+# in batches: requests are scheduled per host with a concurrency cap and a delay
+# between requests. doi.org only redirects to the registration agency serving a
+# record, so the redirects are followed here and each hop waits for the scheduler
+# of the host it goes to. A DOI wanted by several batches is requested only once,
+# and every record is kept in a BibtexCache so it is never requested again. A
+# batch reports progress as DOIs resolve and finishes with the records it got and
+# the errors of the DOIs that failed.
+
+from dataclasses import dataclass, field
+from itertools import count
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+from BibtexCache import BibtexCache, normalize_doi
+from RequestScheduler import RequestScheduler
+
+
+@dataclass
+class BibtexBatchResult:
+    records: Dict[str, str] = field(default_factory=dict)  # DOI -> BibTeX
+    errors: Dict[str, str] = field(default_factory=dict)  # DOI -> error message
+
+
+class _Batch:
+    def __init__(self, id: int, dois: Iterable[str]):
+        self.id = id
+        # Normalized DOI -> DOIs as given, results are reported under the latter
+        self.dois: Dict[str, List[str]] = {}
+        for doi in dois:
+            if doi:
+                self.dois.setdefault(normalize_doi(doi), []).append(doi)
+        self.remaining = set(self.dois)
+        self.result = BibtexBatchResult()
 
 
 class DOI2Bib(QObject):
-    bibtex_fetched = pyqtSignal(str)
-    def __init__(self):
-        super().__init__()
-        self.nam = QNetworkAccessManager()
-        self.nam.finished.connect(self.handle_response)
-
-    def fetch(self, doi: str):
-        url = QUrl(f"https://doi.org/{doi}")
-        request = QNetworkRequest(url)
-        request.setRawHeader(b"Accept", b"application/x-bibtex")
-        self.nam.get(request)
-
-    def handle_response(self, reply) -> str:
-        """Handle the network reply and return the BibTeX string."""
-        if reply.error() != QNetworkReply.NetworkError.NoError:
-            print("Error:", reply.errorString())
-            return ""
-        self.bibtex_fetched.emit(reply.readAll().data().decode())
+    resolved = pyqtSignal(str, str)  # (normalized DOI, BibTeX)
+    failed = pyqtSignal(str, str)  # (normalized DOI, error message)
+    progress = pyqtSignal(int, int, int)  # (batch, DOIs done, DOIs in batch)
+    batchFinished = pyqtSignal(int, object)  # (batch, BibtexBatchResult)
+    cacheError = pyqtSignal(str)  # the BibTeX cache could not be saved
+
+    RESOLVER = "https://doi.org/"
+    HEADERS = {b"Accept": b"application/x-bibtex; charset=utf-8"}
+
+    # Write the cache every so many new records while a large batch runs
+    SAVE_EVERY = 25
+    # Redirects followed per DOI before the lookup is given up
+    MAX_REDIRECTS = 5
+
+    def __init__(
+        self,
+        cache: BibtexCache,
+        nam: QNetworkAccessManager = None,
+        max_concurrent: int = 4,
+        delay: float = 0.2,
+        timeout: float = 30.0,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.cache = cache
+        self.nam = nam or QNetworkAccessManager(self)
+        self.max_concurrent = max_concurrent
+        self.delay = delay
+        self.timeout = timeout
+
+        self._schedulers: Dict[str, RequestScheduler] = {}  # host -> scheduler
+        self._batch_ids = count(1)
+        self._batches: Dict[int, _Batch] = {}
+        # Normalized DOI -> (scheduler, ticket) of its running request
+        self._requests: Dict[str, Tuple[RequestScheduler, int]] = {}
+        self._unsaved = 0
+
+    def fetch(self, doi: str) -> int:
+        """Resolve a single DOI, see resolve()."""
+        return self.resolve([doi])
+
+    def resolve(self, dois: Iterable[str]) -> int:
+        """
+        Resolve DOIs to BibTeX. Returns the id of the batch, which is passed
+        along with its progress and batchFinished signals. Signals are only
+        emitted after this returns, even for DOIs that are in the cache.
+        """
+        batch = _Batch(next(self._batch_ids), dois)
+        self._batches[batch.id] = batch
+        QTimer.singleShot(0, lambda: self._start(batch.id))
+        return batch.id
+
+    def cancel(self, batch_id: int):
+        """Forget a batch. Requests no other batch is waiting for are aborted."""
+        batch = self._batches.pop(batch_id, None)
+        if batch is None:
+            return
+
+        for key in batch.remaining:
+            if key in self._requests and not self._is_wanted(key):
+                scheduler, ticket = self._requests.pop(key)
+                scheduler.cancel(ticket)
+
+    def pending_count(self) -> int:
+        return len(self._requests)
+
+    def _start(self, batch_id: int):
+        batch = self._batches.get(batch_id)
+        if batch is None:
+            return
+
+        for key in list(batch.dois):
+            bibtex = self.cache.get(key)
+            if bibtex is not None:
+                self._deliver(batch, key, bibtex, None)
+            elif key not in self._requests:
+                self._request(key)
+
+        self._finish_if_done(batch)
+
+    def _request(self, key: str, url: str = None, redirects: int = 0):
+        url = url or self.RESOLVER + key
+        scheduler = self._scheduler(urlsplit(url).hostname)
+        ticket = scheduler.get(
+            url,
+            lambda reply, key=key: self._on_reply(key, reply, redirects),
+            self.HEADERS,
+            follow_redirects=False,
+        )
+        self._requests[key] = (scheduler, ticket)
+
+    def _scheduler(self, host: str) -> RequestScheduler:
+        """Each host gets its own concurrency cap and delay between requests."""
+        if host not in self._schedulers:
+            self._schedulers[host] = RequestScheduler(
+                max_concurrent=self.max_concurrent,
+                delay=self.delay,
+                timeout=self.timeout,
+                nam=self.nam,
+                parent=self,
+            )
+        return self._schedulers[host]
+
+    def _on_reply(self, key: str, reply: QNetworkReply, redirects: int):
+        self._requests.pop(key, None)
+
+        bibtex, error = None, None
+        status = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        if status in (301, 302, 303, 307, 308):
+            error = self._redirect(key, reply, redirects)
+            if error is None:
+                return  # the lookup goes on at the redirect target
+        elif reply.error() != QNetworkReply.NetworkError.NoError:
+            error = reply.errorString()
+        else:
+            text = reply.readAll().data().decode("utf-8", errors="replace").strip()
+            if text.startswith("@"):
+                bibtex = text + "\n"
+                self.cache.put(key, bibtex)
+                self._unsaved += 1
+            else:
+                error = "doi.org has no BibTeX record for this DOI"
+
+        if self._unsaved >= self.SAVE_EVERY:
+            self._save_cache()
+
+        for batch in list(self._batches.values()):
+            if key in batch.remaining:
+                self._deliver(batch, key, bibtex, error)
+                self._finish_if_done(batch)
+
+    def _redirect(
+        self, key: str, reply: QNetworkReply, redirects: int
+    ) -> Optional[str]:
+        """Request the redirect target of `reply`, or return why it is not followed."""
+        location = reply.rawHeader(b"Location").data().decode("latin-1")
+        url = urljoin(reply.url().toString(), location.strip())
+        scheme = urlsplit(url).scheme
+        if redirects >= self.MAX_REDIRECTS:
+            return "Too many redirects"
+        # Like Qt's default policy, never from HTTPS down to plain HTTP
+        if scheme not in ("http", "https") or (
+            scheme == "http" and reply.url().scheme() == "https"
+        ):
+            return f"Redirect to {url} not followed"
+        self._request(key, url, redirects + 1)
+        return None
+
+    def _deliver(self, batch: _Batch, key: str, bibtex: str, error: str):
+        batch.remaining.discard(key)
+        for doi in batch.dois[key]:
+            if bibtex is not None:
+                batch.result.records[doi] = bibtex
+            else:
+                batch.result.errors[doi] = error
+
+        if bibtex is not None:
+            self.resolved.emit(key, bibtex)
+        else:
+            self.failed.emit(key, error)
+
+        total = len(batch.dois)
+        self.progress.emit(batch.id, total - len(batch.remaining), total)
+
+    def _finish_if_done(self, batch: _Batch):
+        if batch.remaining or self._batches.get(batch.id) is not batch:
+            return
+
+        del self._batches[batch.id]
+        self._save_cache()
+        self.batchFinished.emit(batch.id, batch.result)
+
+    def _is_wanted(self, key: str) -> bool:
+        return any(key in batch.remaining for batch in self._batches.values())
+
+    def _save_cache(self):
+        try:
+            self.cache.save()
+        except OSError as e:
+            # Not being able to cache only costs requests later on
+            self.cacheError.emit(str(e))
+        self._unsaved = 0
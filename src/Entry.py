@@ -1,10 +1,18 @@
 # Entry class that has info about title, authors, published date, summary, link, and primary category, abstract etc.
 
-import feedparser
-from typing import List
+from typing import TYPE_CHECKING, List, Optional, Tuple
+import calendar
 import re
+import sys
+import time
+import zlib
 from datetime import datetime
 
+if TYPE_CHECKING:
+    # Only needed for annotations, so the headless fetch command does not pay
+    # for importing feedparser
+    import feedparser
+
 def arxiv_to_doi(url: str) -> str:
     """Convert an arXiv abstract URL to a DOI link."""
     # match the identifier including version
@@ -16,32 +24,168 @@ def arxiv_to_doi(url: str) -> str:
     return doi
 
 
+def arxiv_to_doi_or_none(url: str) -> Optional[str]:
+    """Like arxiv_to_doi, but None for URLs that are not arXiv abstract links."""
+    try:
+        return arxiv_to_doi(url)
+    except ValueError:
+        return None
+
+
+def split_arxiv_id(url: str) -> Tuple[str, int]:
+    """
+    Split an arXiv abstract URL into the bare identifier and the version,
+    e.g. http://arxiv.org/abs/2510.07692v2 -> ("2510.07692", 2). Old style
+    identifiers like hep-th/9901001 are kept with their archive prefix.
+    """
+    m = re.search(r"arxiv\.org/abs/(.+?)(?:v([0-9]+))?$", url)
+    if not m:
+        return url, 0
+    return m.group(1), int(m.group(2) or 0)
+
+
+def parse_published(value: str) -> datetime:
+    """
+    Parse a published timestamp, either as sent by arXiv
+    (2025-11-18T19:16:21Z) or as stored by Entry.to_dict (2025-11-18 19:16:21).
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+    except ValueError:
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
+
+
+def published_timestamp(value: str) -> int:
+    """
+    Parse a published timestamp like parse_published, into seconds since the
+    epoch (UTC). Avoids strptime, which is slow for hundreds of thousands of
+    entries.
+    """
+    if (
+        len(value) < 19
+        or value[4] != "-"
+        or value[7] != "-"
+        or value[10] not in "T "
+        or value[13] != ":"
+        or value[16] != ":"
+    ):
+        return calendar.timegm(parse_published(value).timetuple())
+    return calendar.timegm(
+        (
+            int(value[0:4]),
+            int(value[5:7]),
+            int(value[8:10]),
+            int(value[11:13]),
+            int(value[14:16]),
+            int(value[17:19]),
+        )
+    )
+
+
 class Entry:
+    # Archives hold hundreds of thousands of entries, so an Entry is kept
+    # compact: no per-instance __dict__, the timestamp as an int, interned
+    # categories and the abstract compressed until it is shown. Link and DOI
+    # are only stored when they differ from what the id implies.
+    __slots__ = (
+        "_id",
+        "_title",
+        "_authors",
+        "_published",
+        "_abstract",
+        "_link",
+        "_tags",
+        "_primary_category",
+        "_doi",
+        "_sort_keys",
+        "__weakref__",  # for the EntryRegistry
+    )
+
+    # Abstracts shorter than this are stored as they are
+    COMPRESS_ABSTRACT_MIN = 200
+
     def __init__(
         self,
-        feed: feedparser.FeedParserDict,
+        feed: "feedparser.FeedParserDict",
     ):
-        self._id: str = feed.get("id", "")
-        self._title: str = feed.get("title", "")
-        self._authors: str = ", ".join(
-            author["name"] for author in feed.get("authors", [])
+        self._set_fields(
+            id=feed.get("id", ""),
+            title=feed.get("title", ""),
+            authors=[author["name"] for author in feed.get("authors", [])],
+            published=feed.get("published", ""),
+            abstract=feed.get("summary", ""),
+            link=feed.get("link", ""),
+            tags=[tag["term"] for tag in feed.get("tags", [])],
+            primary_category=(
+                feed.get("arxiv_primary_category", {}).get("term", "")
+                if "arxiv_primary_category" in feed
+                else ""
+            ),
+            doi=feed.get("arxiv_doi"),
         )
-        self._published: str = str(datetime.strptime(feed.get("published", ""), "%Y-%m-%dT%H:%M:%SZ"))
-        self._abstract: str = feed.get("summary", "")
-        self._link: str = feed.get("link", "")
-
-        self._tags: List[str] = [tag["term"] for tag in feed.get("tags", [])]
-        self._primary_category: str = (
-            feed.get("arxiv_primary_category", {}).get("term", "")
-            if "arxiv_primary_category" in feed
-            else ""
+
+    @classmethod
+    def from_fields(
+        cls,
+        id: str,
+        title: str,
+        authors: List[str],
+        published: str,
+        abstract: str,
+        link: str,
+        tags: List[str],
+        primary_category: str,
+        doi: Optional[str] = None,
+    ) -> "Entry":
+        """
+        Build an Entry from already extracted fields, without going through a
+        FeedParserDict. A `doi` of None means the feed had no DOI element.
+        """
+        entry = cls.__new__(cls)
+        entry._set_fields(
+            id, title, authors, published, abstract, link, tags, primary_category, doi
         )
+        return entry
+
+    def _set_fields(
+        self,
+        id: str,
+        title: str,
+        authors: List[str],
+        published: str,
+        abstract: str,
+        link: str,
+        tags: List[str],
+        primary_category: str,
+        doi: Optional[str],
+    ):
+        self._id: str = id
+        self._title: str = title
+        self._authors: Tuple[str, ...] = tuple(authors)
+        self._published: int = published_timestamp(published)
+
+        self._abstract = abstract  # str, or zlib compressed UTF-8 bytes
+        if len(abstract) >= self.COMPRESS_ABSTRACT_MIN:
+            self._abstract = zlib.compress(abstract.encode(), 1)
+
+        # The alternate link of an arXiv entry is its id
+        self._link: Optional[str] = None if link == id else link
+
+        self._tags: Tuple[str, ...] = tuple(sys.intern(tag) for tag in tags)
+        self._primary_category: str = sys.intern(primary_category)
 
-        # Handle DOI
-        self._doi: str = feed.get("arxiv_doi", arxiv_to_doi(self._link))
+        # Handle DOI, falling back to the arXiv DOI of the paper, which is only
+        # worked out when asked for
+        self._sort_keys: Tuple[str, str] = None  # worked out when first sorted
+
+        self._doi: Optional[str] = doi
+        if doi is None:
+            arxiv_to_doi(self.link)  # raises for links that are not arXiv's
+        elif doi == arxiv_to_doi_or_none(self.link):
+            self._doi = None
 
     def __repr__(self) -> str:
-        return f"Entry(title={self._title}, authors={self._authors}, published={self._published}, link={self._link}, primary_category={self._primary_category}, tags={self._tags})"
+        return f"Entry(title={self.title}, authors={self.authors}, published={self.published}, link={self.link}, primary_category={self.primary_category}, tags={self.tags})"
 
     # Getter only for all members as properties
 
@@ -49,12 +193,24 @@ class Entry:
     def id(self) -> str:
         return self._id
 
+    @property
+    def arxiv_id(self) -> str:
+        """The identifier without version, e.g. 2510.07692."""
+        return split_arxiv_id(self._id)[0]
+
+    @property
+    def version(self) -> int:
+        """The version of the paper, 0 if the id does not say."""
+        return split_arxiv_id(self._id)[1]
+
     @property
     def doi(self) -> str:
+        if self._doi is None:
+            return arxiv_to_doi(self.link)
         return self._doi
 
     @property
-    def tags(self) -> str:
+    def tags(self) -> Tuple[str, ...]:
         return self._tags
 
     @property
@@ -63,24 +219,62 @@ class Entry:
 
     @property
     def authors(self) -> str:
+        return ", ".join(self._authors)
+
+    @property
+    def author_names(self) -> Tuple[str, ...]:
         return self._authors
 
     @property
     def published(self) -> str:
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(self._published))
+
+    @property
+    def published_timestamp(self) -> int:
+        """Seconds since the epoch (UTC)."""
         return self._published
 
     @property
     def abstract(self) -> str:
+        if isinstance(self._abstract, bytes):
+            return zlib.decompress(self._abstract).decode()
         return self._abstract
 
     @property
     def link(self) -> str:
-        return self._link
+        return self._id if self._link is None else self._link
 
     @property
     def primary_category(self) -> str:
         return self._primary_category
 
+    def _update_from(self, other: "Entry"):
+        """Take over the fields of another version of the same paper."""
+        for slot in self.__slots__:
+            if slot != "__weakref__":
+                setattr(self, slot, getattr(other, slot))
+
+    # ------------------------
+    # SORT KEYS
+    # ------------------------
+    # Normalized once and kept, so sorting by another field or order never
+    # recomputes them. The date key is the published timestamp.
+
+    def _compute_sort_keys(self) -> Tuple[str, str]:
+        title = re.sub(r"^\W+", "", " ".join(self._title.split())).casefold()
+        author = self._authors[0].casefold() if self._authors else ""
+        self._sort_keys = (title, author)
+        return self._sort_keys
+
+    @property
+    def title_key(self) -> str:
+        return (self._sort_keys or self._compute_sort_keys())[0]
+
+    @property
+    def author_key(self) -> str:
+        """The first author's name."""
+        return (self._sort_keys or self._compute_sort_keys())[1]
+
     # ------------------------
     # JSON SERIALIZATION
     # ------------------------
@@ -92,11 +286,34 @@ class Entry:
             "published": self.published,
             "abstract": self.abstract,
             "link": self.link,
-            "tags": self.tags,
+            "tags": list(self.tags),
             "primary_category": self.primary_category,
             "doi": self.doi,
         }
 
+    def to_bibtex(self) -> str:
+        """
+        Build a BibTeX @misc record from the arXiv metadata, without asking
+        doi.org for one.
+        """
+        arxiv_id, _ = split_arxiv_id(self.link or self.id)
+        # Titles may contain LaTeX, so only the characters it treats
+        # specially outside of math are escaped
+        title = re.sub(r"(?<!\\)([&%#])", r"\\\1", " ".join(self.title.split()))
+        doi = re.sub(r"^https?://(dx\.)?doi\.org/", "", self.doi)
+        fields = [
+            ("title", "{" + title + "}"),
+            ("author", " and ".join(self.authors.split(", "))),
+            ("year", self.published[:4]),
+            ("eprint", arxiv_id),
+            ("archivePrefix", "arXiv"),
+            ("primaryClass", self.primary_category),
+            ("doi", doi),
+            ("url", self.link),
+        ]
+        body = ",\n".join(f"  {key} = {{{value}}}" for key, value in fields if value)
+        return f"@misc{{{arxiv_id.replace('/', '_')},\n{body}\n}}\n"
+
     @classmethod
     def from_dict(cls, data: dict) -> "Entry":
         """
@@ -106,19 +323,19 @@ class Entry:
         if type(data) is not dict:
             return None
 
-        feed = {
-            "id": data.get("id", ""),
-            "title": data.get("title", ""),
-            "authors": [
-                {"name": name.strip()}
+        return cls.from_fields(
+            id=data.get("id", ""),
+            title=data.get("title", ""),
+            authors=[
+                name.strip()
                 for name in data.get("authors", "").split(",")
                 if name.strip()
             ],
-            "published": data.get("published", ""),
-            "summary": data.get("abstract", ""),
-            "link": data.get("link", ""),
-            "tags": [{"term": c} for c in data.get("tags", [])],
-            "primary_category": {"term": data.get("primary_category", "")},
-            "doi": data.get("doi", ""),
-        }
-        return cls(feed)
+            published=data.get("published", ""),
+            abstract=data.get("abstract", ""),
+            link=data.get("link", ""),
+            # Older files stored the tags under "categories"
+            tags=list(data.get("tags", data.get("categories", []))),
+            primary_category=data.get("primary_category", ""),
+            doi=data.get("doi"),
+        )
@@ -6,11 +6,13 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QGraphicsDropShadowEffect,
     QFrame,
+    QSizePolicy,
 )
-from PyQt6.QtGui import QDesktopServices, QPalette, QColor
+from PyQt6.QtGui import QDesktopServices
 from PyQt6.QtCore import QUrl, pyqtSignal, Qt
 from typing import Optional, List
 from Entry import Entry
+import Theme
 
 
 class Label(QLabel):
@@ -62,18 +64,9 @@ class EntryCard(QWidget):
 
         self.entry = entry
 
+        # Styled by the application stylesheet of Theme, by object name
         card_frame = QFrame(self)
-        palette = card_frame.palette()
-        border_color = palette.color(QPalette.ColorRole.Accent).name()
-
-        # padding: 10px;  /* space inside the border */
-        # border: 1px solid {border_color};
-        card_frame.setStyleSheet(f"""
-            QFrame {{
-                border-radius: {self.config.ui.card.border_radius}px;
-                background: palette(base); /* keeps theme correct */
-            }}
-        """)
+        card_frame.setObjectName(Theme.CARD)
 
         #
         # Outer layout (for this widget)
@@ -88,117 +81,132 @@ class EntryCard(QWidget):
         layout = QVBoxLayout(card_frame)
         layout.setSpacing(6)
 
+        #
+        # Badge for papers that arrived since the last fetch
+        #
+        self.new_label = QLabel("New")
+        self.new_label.setObjectName(Theme.NEW_BADGE)
+        self.new_label.setSizePolicy(QSizePolicy.Policy.Maximum, QSizePolicy.Policy.Maximum)
+        self.new_label.setVisible(False)
+        layout.addWidget(self.new_label)
+
         #
         # Title
         #
-        title_label = ActionText(entry.title)
-        title_label.setWordWrap(True)
-        title_label.setStyleSheet("font-size: 18px; font-weight: bold;")
-        title_label.clicked.connect(lambda: self.entryClicked.emit(entry))
-        title_label.setVisible(self.config.ui.card.show_title)
-        layout.addWidget(title_label)
+        self.title_label = ActionText("")
+        self.title_label.setWordWrap(True)
+        self.title_label.setObjectName(Theme.CARD_TITLE)
+        self.title_label.clicked.connect(lambda: self.entryClicked.emit(self.entry))
+        self.title_label.setVisible(self.config.ui.card.show_title)
+        layout.addWidget(self.title_label)
 
         #
         # Tags
         #
+        self.tag_layout = QHBoxLayout()
+        self.tag_layout.addStretch()
+        self.tag_labels: List[Label] = []
         if self.config.ui.card.show_tags:
-            tag_layout = QHBoxLayout()
-            tag_background = palette.color(QPalette.ColorRole.Mid).name()
-            for tag in entry.tags:
-                tag_lbl = Label(tag)
-                tag_lbl.setStyleSheet(f"""
-                    background-color: {tag_background};
-                    border-radius: 5px;
-                    padding: 2px 5px;
-                    font-size: 12px;
-                """)
-                tag_layout.addWidget(tag_lbl)
-            tag_layout.addStretch()
-            layout.addLayout(tag_layout)
+            layout.addLayout(self.tag_layout)
 
         #
         # Authors
         #
-        authors = entry.authors.split(", ")
-        if len(authors) > self.config.ui.card.authors_truncate:
-            authors = authors[: self.config.ui.card.authors_truncate] + ["et al."]
-        authors_label = Label(", ".join(authors))
-        authors_label.setStyleSheet("font-size: 13px; font-style: oblique;")
-        authors_label.setVisible(self.config.ui.card.show_authors)
-        layout.addWidget(authors_label)
+        self.authors_label = Label("")
+        self.authors_label.setObjectName(Theme.CARD_AUTHORS)
+        self.authors_label.setVisible(self.config.ui.card.show_authors)
+        layout.addWidget(self.authors_label)
 
         #
         # DOI
         #
-        doi_label = Label(f"DOI: {entry.doi}")
-        doi_label.setStyleSheet("font-size: 12px")
-        doi_label.setVisible(self.config.ui.card.show_doi)
-        layout.addWidget(doi_label)
+        self.doi_label = Label("")
+        self.doi_label.setObjectName(Theme.CARD_META)
+        self.doi_label.setVisible(self.config.ui.card.show_doi)
+        layout.addWidget(self.doi_label)
 
         #
         # Bottom row
         #
         row = QHBoxLayout()
 
-        date_label = Label(f"Published: {entry.published}")
-        date_label.setStyleSheet("font-size: 12px")
-        date_label.setVisible(self.config.ui.card.show_date)
-        row.addWidget(date_label)
+        self.date_label = Label("")
+        self.date_label.setObjectName(Theme.CARD_META)
+        self.date_label.setVisible(self.config.ui.card.show_date)
+        row.addWidget(self.date_label)
 
         row.addStretch()
 
         if self.config.ui.card.show_bookmark_button:
             self.bookmark_btn = QPushButton("Bookmark")
+            self.bookmark_btn.setObjectName(Theme.BOOKMARK_BUTTON)
+            self.bookmark_btn.setProperty(Theme.BOOKMARKED, False)
             self.bookmark_btn.clicked.connect(self._on_bookmark_clicked)
             row.addWidget(self.bookmark_btn)
 
         if self.config.ui.card.show_pdf_button:
             pdf_btn = QPushButton("PDF")
             pdf_btn.clicked.connect(
-                lambda: QDesktopServices.openUrl(QUrl(entry.link.replace("abs", "pdf")))
+                lambda: QDesktopServices.openUrl(
+                    QUrl(self.entry.link.replace("abs", "pdf"))
+                )
             )
             row.addWidget(pdf_btn)
 
         if self.config.ui.card.show_webpage_button:
             web_btn = QPushButton("Arxiv Page")
-            web_btn.clicked.connect(lambda: QDesktopServices.openUrl(QUrl(entry.link)))
+            web_btn.clicked.connect(
+                lambda: QDesktopServices.openUrl(QUrl(self.entry.link))
+            )
             row.addWidget(web_btn)
 
         layout.setContentsMargins(10, 10, 10, 10)
         layout.addLayout(row)
 
-    def setBookmarked(self, bookmarked: bool):
-        self.bookmarked = bookmarked
+        self.setEntry(entry)
 
-        palette = self.bookmark_btn.palette()
-
-        if bookmarked:
-            self.bookmark_btn.setText("Bookmarked")
-
-            # Use the system/theme highlight color
-            bg = palette.color(QPalette.ColorRole.Highlight).name()
-            text = palette.color(QPalette.ColorRole.HighlightedText).name()
+    def setEntry(self, entry: Entry):
+        """Show another entry, reusing the widgets of the card."""
+        self.entry = entry
+        self.title_label.setText(entry.title)
 
-            self.bookmark_btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {bg};
-                    color: {text};
-                }}
-            """)
+        if self.config.ui.card.show_tags:
+            self._set_tags(entry.tags)
+
+        authors = list(entry.author_names)
+        truncate = self.config.ui.card.authors_truncate
+        if truncate and len(authors) > truncate:
+            authors = authors[:truncate] + ["et al."]
+        self.authors_label.setText(", ".join(authors))
+
+        self.doi_label.setText(f"DOI: {entry.doi}")
+        self.date_label.setText(f"Published: {entry.published}")
+
+    def _set_tags(self, tags):
+        """Show `tags`, adding tag labels if there are not enough of them."""
+        while len(self.tag_labels) < len(tags):
+            tag_lbl = Label("")
+            tag_lbl.setObjectName(Theme.TAG)
+            # Before the stretch
+            self.tag_layout.insertWidget(len(self.tag_labels), tag_lbl)
+            self.tag_labels.append(tag_lbl)
+
+        for i, tag_lbl in enumerate(self.tag_labels):
+            if i < len(tags):
+                tag_lbl.setText(tags[i])
+            tag_lbl.setVisible(i < len(tags))
 
-        else:
-            self.bookmark_btn.setText("Bookmark")
-            # Default style palette
+    def setBookmarked(self, bookmarked: bool):
+        self.bookmarked = bookmarked
+        if not self.config.ui.card.show_bookmark_button:
+            return
 
-            bg = self.style().standardPalette().color(QPalette.ColorRole.Base).name()
-            text = self.style().standardPalette().color(QPalette.ColorRole.Text).name()
+        self.bookmark_btn.setText("Bookmarked" if bookmarked else "Bookmark")
+        Theme.set_state(self.bookmark_btn, Theme.BOOKMARKED, bookmarked)
 
-            self.bookmark_btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {bg};
-                    color: {text};
-                }}
-                """)
+    def setNew(self, new: bool):
+        """Mark the card as a paper that arrived since the last fetch."""
+        self.new_label.setVisible(new)
 
     def entry(self) -> Entry:
         return self.entry
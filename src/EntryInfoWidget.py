@@ -7,20 +7,27 @@ from PyQt6.QtWidgets import (
     QTextEdit,
     QPushButton,
     QHBoxLayout,
+    QComboBox,
 )
+from typing import List, Optional
 from PyQt6.QtCore import pyqtSignal, Qt, QUrl
-from PyQt6.QtGui import QFont, QDesktopServices, QPalette
+from PyQt6.QtGui import QFont, QDesktopServices
 from Entry import Entry
 from LineEdit import LineEdit
 from DOI2Bib import DOI2Bib
+from BibtexCache import normalize_doi
+import Theme
 
 class EntryInfoWidget(QWidget):
     backClicked = pyqtSignal()
     bookmarkClicked = pyqtSignal(Entry)
+    collectionChanged = pyqtSignal(Entry, str)  # the entry moved to a collection
 
-    def __init__(self):
+    def __init__(self, doi2bib: DOI2Bib):
         super().__init__()
 
+        self.entry: Entry = None
+
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
 
@@ -52,12 +59,7 @@ class EntryInfoWidget(QWidget):
         # Remove the ugly frame
         self.abstract_text.setFrameStyle(0)
 
-        # Optional: subtle background and padding
-        self.abstract_text.setStyleSheet("""
-            QTextEdit {
-                border-radius: 6px;
-            }
-        """)
+        self.abstract_text.setObjectName(Theme.ABSTRACT)
 
 
 
@@ -73,8 +75,10 @@ class EntryInfoWidget(QWidget):
         self.doi2bib_btn.clicked.connect(self._on_doi2bib_clicked)
         self.doi_bibtex_text_edit = QTextEdit()
 
-        self.doi_fetcher = DOI2Bib()
-        self.doi_fetcher.bibtex_fetched.connect(self._handle_bibtex_response)
+        # Shared with the rest of the application, which owns the cache
+        self.doi_fetcher = doi2bib
+        self.doi_fetcher.resolved.connect(self._handle_bibtex_response)
+        self.doi_fetcher.failed.connect(self._handle_bibtex_error)
 
         self.doi_widget.hide()
         self.doi_bibtex_text_edit.hide()
@@ -103,9 +107,17 @@ class EntryInfoWidget(QWidget):
         # Add pdf button and website button
 
         self.bookmark_btn = QPushButton("Bookmark")
+        self.bookmark_btn.setObjectName(Theme.BOOKMARK_BUTTON)
+        self.bookmark_btn.setProperty(Theme.BOOKMARKED, False)
         self.bookmark_btn.clicked.connect(self.on_bookmark_clicked)
         self.btn_layout.addWidget(self.bookmark_btn)
 
+        # The collection of the bookmark, shown while the entry is bookmarked
+        self.collection_combo = QComboBox()
+        self.collection_combo.activated.connect(self._on_collection_activated)
+        self.collection_combo.hide()
+        self.btn_layout.addWidget(self.collection_combo)
+
         self.pdf_btn = QPushButton("PDF")
         self.pdf_btn.clicked.connect(self.on_pdf_open_clicked)
         self.btn_layout.addWidget(self.pdf_btn)
@@ -147,40 +159,43 @@ class EntryInfoWidget(QWidget):
 
     def setBookmarked(self, bookmarked: bool):
         self.bookmarked = bookmarked
-
-        palette = self.bookmark_btn.palette()
-
-        if bookmarked:
-            self.bookmark_btn.setText("Bookmarked")
-
-            # Use the system/theme highlight color
-            bg = palette.color(QPalette.ColorRole.Highlight).name()
-            text = palette.color(QPalette.ColorRole.HighlightedText).name()
-
-            self.bookmark_btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {bg};
-                    color: {text};
-                }}
-            """)
-
-        else:
-            self.bookmark_btn.setText("Bookmark")
-            # Default style palette
-
-            bg = self.style().standardPalette().color(QPalette.ColorRole.Base).name()
-            text = self.style().standardPalette().color(QPalette.ColorRole.Text).name()
-
-            self.bookmark_btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {bg};
-                    color: {text};
-                }}
-                """)
+        self.bookmark_btn.setText("Bookmarked" if bookmarked else "Bookmark")
+        Theme.set_state(self.bookmark_btn, Theme.BOOKMARKED, bookmarked)
+
+    def setCollection(self, collections: List[str], current: Optional[str]):
+        """Show the collection of the bookmark, None if not bookmarked."""
+        if current is None:
+            self.collection_combo.hide()
+            return
+        combo = self.collection_combo
+        if [combo.itemText(i) for i in range(combo.count())] != collections:
+            combo.clear()
+            combo.addItems(collections)
+        combo.setCurrentText(current)
+        combo.show()
+
+    def _on_collection_activated(self, index: int):
+        self.collectionChanged.emit(self.entry, self.collection_combo.itemText(index))
 
     def _on_doi2bib_clicked(self):
         self.doi_fetcher.fetch(self.entry.doi)
 
-    def _handle_bibtex_response(self, bibtex):
+    def _is_current_doi(self, doi: str) -> bool:
+        # The resolver also reports lookups of other widgets and of exports
+        return (
+            self.entry is not None
+            and self.entry.doi != ""
+            and normalize_doi(self.entry.doi) == doi
+        )
+
+    def _handle_bibtex_response(self, doi: str, bibtex: str):
+        if not self._is_current_doi(doi):
+            return
         self.doi_bibtex_text_edit.setText(bibtex)
         self.doi_bibtex_text_edit.show()
+
+    def _handle_bibtex_error(self, doi: str, error: str):
+        if not self._is_current_doi(doi):
+            return
+        self.doi_bibtex_text_edit.setText(f"Could not fetch BibTeX: {error}")
+        self.doi_bibtex_text_edit.show()
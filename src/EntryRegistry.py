@@ -0,0 +1,57 @@
+# Registry of canonical Entry objects, one per paper. Query results, the result
+# cache and the bookmarks all resolve their entries through it, so a paper that
+# several subscriptions return, or that arrives again as a new version, is one
+# object everywhere. The registry tracks the latest version: when a newer one
+# arrives the canonical object takes over its fields in place, so every list
+# holding the paper shows the update.
+#
+# Entries are held weakly, papers nothing refers to any more are dropped.
+
+import weakref
+from typing import Callable, Iterable, List, Optional
+
+from Entry import Entry
+
+
+class EntryRegistry:
+    def __init__(self):
+        self._entries: "weakref.WeakValueDictionary[str, Entry]" = (
+            weakref.WeakValueDictionary()
+        )
+        # Called with every entry that took over the fields of a newer version
+        self.listeners: List[Callable[[Entry], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, arxiv_id: str) -> Optional[Entry]:
+        return self._entries.get(arxiv_id)
+
+    def resolve(self, entry: Entry) -> Entry:
+        """Return the canonical object of the paper, registering `entry` if new."""
+        key = entry.arxiv_id
+        canonical = self._entries.get(key)
+        if canonical is None:
+            self._entries[key] = entry
+            return entry
+
+        if canonical is not entry and entry.version > canonical.version:
+            canonical._update_from(entry)
+            for listener in self.listeners:
+                listener(canonical)
+        return canonical
+
+    def resolve_all(self, entries: Iterable[Entry]) -> List[Entry]:
+        """Resolve entries, dropping repeated papers, in the given order."""
+        seen = set()
+        result = []
+        for entry in entries:
+            canonical = self.resolve(entry)
+            if id(canonical) not in seen:
+                seen.add(id(canonical))
+                result.append(canonical)
+        return result
+
+
+# The registry of the application
+registry = EntryRegistry()
@@ -0,0 +1,257 @@
+# Column store of the loaded entries, for filtering without touching every Entry
+# or card. Each entry is a row; the store keeps its id, published timestamp,
+# primary category code and whether it has a DOI in flat arrays. The text filter
+# looks queries up in a SearchIndex, which is built over new rows in chunks, in
+# idle time, or at the latest when a query needs them.
+#
+# Filters (subjects, DOI, date range, text) are evaluated as whole-column mask
+# operations, with NumPy if it is installed and with bytearrays otherwise. The
+# mask of every filter is cached along with its parameters and extended for new
+# rows only, so changing one filter does not recompute the others. Removing an
+# entry only clears its row in the `alive` column, which every query ANDs in.
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Entry import Entry
+from SearchIndex import SearchIndex
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+SUBJECTS = "subjects"
+DOI = "doi"
+DATE = "date"
+TEXT = "text"
+FILTERS = (SUBJECTS, DOI, DATE, TEXT)
+
+
+class EntryStore:
+    def __init__(self, search_abstracts: bool = False):
+        self.search_abstracts = search_abstracts
+        self._filters: Dict[str, object] = {name: None for name in FILTERS}
+        self.clear()
+
+    def clear(self):
+        """Remove all rows. The filters stay set."""
+        self.entries: List[Entry] = []
+        self.ids: List[str] = []
+        self.dates = array("q")  # published, seconds since the epoch
+        self.categories = array("H")  # code of the primary category
+        self.has_doi = bytearray()  # 1 if the entry has a DOI
+        self.alive = bytearray()  # 0 if the entry was removed
+        self._row_of: Dict[int, int] = {}  # id() of a live entry -> its row
+        self._removed = 0
+        self.category_names: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self._index = SearchIndex(self.search_abstracts)
+
+        # Filter name -> (parameters, mask over the first len(mask) rows)
+        self._masks: Dict[str, Tuple[object, object]] = {}
+        # Combination of filter names -> (parameters, row count, matching rows)
+        self._combined: Dict[frozenset, Tuple[tuple, int, List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, entry: Entry) -> bool:
+        return id(entry) in self._row_of
+
+    def live_entries(self) -> List[Entry]:
+        """The entries that were not removed, in row order."""
+        if not self._removed:
+            return list(self.entries)
+        return [entry for entry, alive in zip(self.entries, self.alive) if alive]
+
+    def append(self, entries: Iterable[Entry]) -> range:
+        """Add entries as new rows. Returns the range of their row numbers."""
+        entries = list(entries)
+        first_row = len(self.entries)
+        for entry in entries:
+            self._row_of[id(entry)] = len(self.entries)
+            self.alive.append(1)
+            self.entries.append(entry)
+            self.ids.append(entry.id)
+            self.dates.append(entry.published_timestamp)
+            self.categories.append(self._category_code(entry.primary_category))
+            self.has_doi.append(1 if entry.doi else 0)
+        return range(first_row, len(self.entries))
+
+    def remove(self, entries: Iterable[Entry]):
+        """Remove entries. Their rows stay, out of every query."""
+        for entry in entries:
+            row = self._row_of.pop(id(entry), None)
+            if row is not None:
+                self.alive[row] = 0
+                self._removed += 1
+
+    def index_pending(self, limit: Optional[int] = None) -> bool:
+        """
+        Add rows not in the search index yet to it, at most `limit` of them.
+        Returns True if rows remain to be indexed.
+        """
+        start = self._index.size
+        end = len(self) if limit is None else min(len(self), start + limit)
+        self._index.add(self.entries[start:end])
+        return end < len(self)
+
+    def _category_code(self, category: str) -> int:
+        code = self._category_codes.get(category)
+        if code is None:
+            code = len(self.category_names)
+            self.category_names.append(category)
+            self._category_codes[category] = code
+        return code
+
+    # -----------------------------
+    # Filters
+    # -----------------------------
+    def set_subjects(self, subjects: Optional[Iterable[str]]):
+        """Only keep entries whose primary category is one of `subjects`."""
+        self._filters[SUBJECTS] = frozenset(subjects) if subjects else None
+
+    def set_doi_only(self, doi_only: bool):
+        self._filters[DOI] = True if doi_only else None
+
+    def set_date_range(self, start: Optional[int] = None, end: Optional[int] = None):
+        """Only keep entries published in [start, end), in epoch seconds."""
+        if start is None and end is None:
+            self._filters[DATE] = None
+        else:
+            self._filters[DATE] = (start, end)
+
+    def set_text(self, text: str):
+        """Only keep entries matching the search query `text`, see SearchIndex."""
+        self._filters[TEXT] = " ".join(text.split()) or None
+
+    def rows(self, filters: Iterable[str] = FILTERS) -> List[int]:
+        """Rows matching all active filters among `filters`, in row order."""
+        names = frozenset(
+            name for name in filters if self._filters[name] is not None
+        )
+        params = tuple(sorted((name, repr(self._filters[name])) for name in names))
+        params += (self._removed,)
+
+        cached = self._combined.get(names)
+        if cached is not None and cached[0] == params and cached[1] == len(self):
+            return cached[2]
+
+        masks = [self._mask(name) for name in names]
+        if self._removed:
+            masks.append(self._alive_mask())
+        if not masks:
+            rows = list(range(len(self)))
+        else:
+            rows = self._mask_rows(self._and(masks))
+        self._combined[names] = (params, len(self), rows)
+        return rows
+
+    def matching(self, filters: Iterable[str] = FILTERS) -> List[Entry]:
+        return [self.entries[row] for row in self.rows(filters)]
+
+    # -----------------------------
+    # Masks
+    # -----------------------------
+    def _mask(self, name: str):
+        """The mask of an active filter over all rows, from cache if possible."""
+        params = self._filters[name]
+        cached = self._masks.get(name)
+        if cached is not None and cached[0] == params:
+            mask = cached[1]
+            if len(mask) < len(self):
+                mask = self._concat(mask, self._compute(name, len(mask), len(self)))
+        else:
+            mask = self._compute(name, 0, len(self))
+        self._masks[name] = (params, mask)
+        return mask
+
+    def _alive_mask(self):
+        if np is not None:
+            return self._column(self.alive, 0, len(self)).astype(bool)
+        return bytes(self.alive)
+
+    def _compute(self, name: str, start: int, end: int):
+        """Evaluate a filter over rows [start, end)."""
+        params = self._filters[name]
+
+        if name == SUBJECTS:
+            codes = [
+                self._category_codes[s] for s in params if s in self._category_codes
+            ]
+            if np is not None:
+                return np.isin(self._column(self.categories, start, end), codes)
+            codes = set(codes)
+            return bytearray(c in codes for c in self.categories[start:end])
+
+        if name == DOI:
+            if np is not None:
+                return self._column(self.has_doi, start, end).astype(bool)
+            return self.has_doi[start:end]
+
+        if name == DATE:
+            low, high = params
+            if np is not None:
+                dates = self._column(self.dates, start, end)
+                mask = np.ones(end - start, dtype=bool)
+                if low is not None:
+                    mask &= dates >= low
+                if high is not None:
+                    mask &= dates < high
+                return mask
+            low = float("-inf") if low is None else low
+            high = float("inf") if high is None else high
+            return bytearray(low <= d < high for d in self.dates[start:end])
+
+        if name == TEXT:
+            self.index_pending()
+            rows = self._index.search(params)
+            if np is not None:
+                mask = np.zeros(end - start, dtype=bool)
+                hits = np.fromiter(rows, dtype=np.int64, count=len(rows))
+                hits = hits[(hits >= start) & (hits < end)]
+                mask[hits - start] = True
+                return mask
+            mask = bytearray(end - start)
+            for row in rows:
+                if start <= row < end:
+                    mask[row - start] = 1
+            return mask
+
+        raise ValueError(f"Unknown filter: {name}")
+
+    @staticmethod
+    def _column(column, start: int, end: int):
+        """Rows [start, end) of a column as a NumPy array."""
+        # Slicing copies, so the column itself is never exported as a buffer
+        # and can still grow
+        dtype = {"q": np.int64, "H": np.uint16}.get(
+            getattr(column, "typecode", None), np.uint8
+        )
+        return np.frombuffer(column[start:end], dtype=dtype)
+
+    @staticmethod
+    def _concat(a, b):
+        if np is not None:
+            return np.concatenate((a, b))
+        return a + b
+
+    @staticmethod
+    def _and(masks: list):
+        if np is not None:
+            return np.logical_and.reduce(masks)
+        # Every byte is 0 or 1, so a bitwise AND of the masks as one large
+        # integer each is a bytewise AND, done in C
+        result = masks[0]
+        for mask in masks[1:]:
+            result = (
+                int.from_bytes(result, "little") & int.from_bytes(mask, "little")
+            ).to_bytes(len(mask), "little")
+        return result
+
+    @staticmethod
+    def _mask_rows(mask) -> List[int]:
+        if np is not None:
+            return np.flatnonzero(mask).tolist()
+        return [row for row, match in enumerate(mask) if match]
@@ -0,0 +1,40 @@
+# Background parsing of arXiv API replies. Raw Atom bytes are turned into Entry
+# objects on a QThreadPool thread so that the GUI thread never parses XML.
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+from ArxivParser import parse_feed
+
+
+class FeedParseSignals(QObject):
+    entriesReady = pyqtSignal(int, list)  # (generation, chunk of Entry objects)
+    finished = pyqtSignal(int, int, int)  # (generation, entries parsed, total results)
+    failed = pyqtSignal(int, str)  # (generation, error message)
+
+
+class FeedParseWorker(QRunnable):
+    """
+    Parse one API reply and build its Entry objects in a worker thread.
+
+    Entries are handed back in chunks of at most `chunk_size`, so a single slot
+    invocation on the GUI thread only ever has a bounded number of entries to
+    display, however large the reply is.
+    """
+
+    def __init__(self, generation: int, data: bytes, chunk_size: int = 50):
+        super().__init__()
+        self.generation = generation
+        self.data = data
+        self.chunk_size = max(1, chunk_size)
+        self.signals = FeedParseSignals()
+
+    def run(self):
+        try:
+            entries, total = parse_feed(self.data)
+
+            for i in range(0, len(entries), self.chunk_size):
+                chunk = entries[i : i + self.chunk_size]
+                self.signals.entriesReady.emit(self.generation, chunk)
+
+            self.signals.finished.emit(self.generation, len(entries), total)
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
@@ -0,0 +1,215 @@
+# Registry of the arXiv fetches in flight. Fetches of the same query are
+# coalesced: whoever asks for a query that is already being fetched waits for
+# that fetch instead of starting another one, and is first given the pages that
+# arrived so far. A fetch nobody waits for any more is aborted. Every fetch gets
+# a generation number and signals of a fetch that is no longer registered under
+# its key are dropped, so a slow superseded reply can never overwrite a newer one.
+
+from itertools import count
+from typing import Callable, Dict, Hashable, List, Tuple
+
+from PyQt6.QtCore import QObject, pyqtSignal
+from ArxivFetcher import ArxivFetcher
+from Entry import Entry
+from EntryRegistry import registry
+from RequestScheduler import RequestScheduler
+from ResultCache import ResultCache
+
+
+class InFlightFetch:
+    def __init__(self, key: Tuple, generation: int, fetcher: ArxivFetcher):
+        self.key = key
+        self.generation = generation
+        self.fetcher = fetcher
+        self.waiters: List[Hashable] = []
+        self.entries: List[Entry] = []  # pages received so far, for late joiners
+        self.seen = set()  # arXiv ids in `entries`
+        self.progress = (0, 0)
+
+
+class FetchRegistry(QObject):
+    # Same as the ArxivFetcher signals, with the waiter they are meant for first
+    pageFetched = pyqtSignal(object, list)
+    progress = pyqtSignal(object, int, int)
+    finished = pyqtSignal(object, int)
+    failed = pyqtSignal(object, str, float)
+    cancelled = pyqtSignal(object)
+
+    def __init__(self, scheduler: RequestScheduler, parent=None):
+        super().__init__(parent)
+        self.scheduler = scheduler
+        self._generations = count(1)
+        self._fetches: Dict[Tuple, InFlightFetch] = {}  # key -> fetch
+        self._waiting: Dict[Hashable, InFlightFetch] = {}  # waiter -> fetch
+
+        # Number of fetch() calls that joined a fetch already in flight
+        self.coalesced = 0
+
+    @staticmethod
+    def key(
+        method_name: str,
+        parameters: str,
+        max_results: int,
+        page_size: int,
+        stop_key=None,
+    ) -> Tuple:
+        """
+        Fetches with equal keys return the same entries. `stop_key` identifies
+        the `stop_when` condition, fetches that stop at different points differ.
+        """
+        return (
+            method_name,
+            ResultCache.normalize_query(parameters),
+            max_results,
+            page_size,
+            stop_key,
+        )
+
+    def fetch(
+        self,
+        waiter: Hashable,
+        method_name: str,
+        parameters: str,
+        max_results: int,
+        page_size: int,
+        stop_when: Callable[[List[Entry]], bool] = None,
+        stop_key=None,
+    ) -> bool:
+        """
+        Fetch a query on behalf of `waiter`, which is passed along with every
+        signal. A different fetch the waiter was waiting for is given up.
+
+        Returns True if the query was already in flight and the waiter joined
+        it. Pages that arrived before are emitted for the waiter right away.
+        """
+        key = self.key(method_name, parameters, max_results, page_size, stop_key)
+
+        current = self._waiting.get(waiter)
+        if current is not None:
+            if current.key == key:
+                return True
+            self.cancel(waiter)
+
+        inflight = self._fetches.get(key)
+        if inflight is not None:
+            self.coalesced += 1
+            inflight.waiters.append(waiter)
+            self._waiting[waiter] = inflight
+            if inflight.entries:
+                self.pageFetched.emit(waiter, list(inflight.entries))
+            self.progress.emit(waiter, *inflight.progress)
+            return True
+
+        inflight = self._start(key)
+        inflight.waiters.append(waiter)
+        self._waiting[waiter] = inflight
+        inflight.fetcher.fetch(
+            method_name, parameters, max_results, page_size, stop_when=stop_when
+        )
+        return False
+
+    def cancel(self, waiter: Hashable):
+        """
+        Stop waiting for the fetch of `waiter`, keeping the pages it got. The
+        fetch is aborted if nobody else waits for it.
+        """
+        inflight = self._waiting.pop(waiter, None)
+        if inflight is None:
+            return
+
+        inflight.waiters.remove(waiter)
+        if not inflight.waiters:
+            inflight.fetcher.cancel()
+            self._retire(inflight)
+        self.cancelled.emit(waiter)
+
+    def is_fetching(self, waiter: Hashable) -> bool:
+        return waiter in self._waiting
+
+    def in_flight_count(self) -> int:
+        return len(self._fetches)
+
+    def _start(self, key: Tuple) -> InFlightFetch:
+        generation = next(self._generations)
+        fetcher = ArxivFetcher(self.scheduler, self)
+        inflight = InFlightFetch(key, generation, fetcher)
+        self._fetches[key] = inflight
+
+        fetcher.pageFetched.connect(
+            lambda entries, g=generation: self._on_page(key, g, entries)
+        )
+        fetcher.progress.connect(
+            lambda fetched, total, g=generation: self._on_progress(
+                key, g, fetched, total
+            )
+        )
+        fetcher.finished.connect(
+            lambda fetched, g=generation: self._on_finished(key, g, fetched)
+        )
+        fetcher.failed.connect(
+            lambda error, retry_after, g=generation: self._on_failed(
+                key, g, error, retry_after
+            )
+        )
+        return inflight
+
+    def _current(self, key: Tuple, generation: int) -> InFlightFetch:
+        """The fetch registered under `key` if it is of `generation`, else None."""
+        inflight = self._fetches.get(key)
+        if inflight is None or inflight.generation != generation:
+            return None
+        return inflight
+
+    def _retire(self, inflight: InFlightFetch):
+        """Unregister a fetch. Whatever it still emits is dropped."""
+        if self._fetches.get(inflight.key) is inflight:
+            del self._fetches[inflight.key]
+        for waiter in inflight.waiters:
+            self._waiting.pop(waiter, None)
+        inflight.fetcher.deleteLater()
+
+    def _on_page(self, key: Tuple, generation: int, entries: list):
+        inflight = self._current(key, generation)
+        if inflight is None:
+            return
+
+        # Everyone gets the canonical entries. Papers an earlier page had already
+        # returned, because new submissions shifted the pages, are dropped.
+        entries = [
+            entry
+            for entry in registry.resolve_all(entries)
+            if entry.arxiv_id not in inflight.seen
+        ]
+        inflight.seen.update(entry.arxiv_id for entry in entries)
+        inflight.entries.extend(entries)
+        for waiter in list(inflight.waiters):
+            self.pageFetched.emit(waiter, entries)
+
+    def _on_progress(self, key: Tuple, generation: int, fetched: int, total: int):
+        inflight = self._current(key, generation)
+        if inflight is None:
+            return
+
+        inflight.progress = (fetched, total)
+        for waiter in list(inflight.waiters):
+            self.progress.emit(waiter, fetched, total)
+
+    def _on_finished(self, key: Tuple, generation: int, fetched: int):
+        inflight = self._current(key, generation)
+        if inflight is None:
+            return
+
+        waiters = list(inflight.waiters)
+        self._retire(inflight)
+        for waiter in waiters:
+            self.finished.emit(waiter, fetched)
+
+    def _on_failed(self, key: Tuple, generation: int, error: str, retry_after: float):
+        inflight = self._current(key, generation)
+        if inflight is None:
+            return
+
+        waiters = list(inflight.waiters)
+        self._retire(inflight)
+        for waiter in waiters:
+            self.failed.emit(waiter, error, retry_after)
@@ -0,0 +1,349 @@
+# SQLite database of what PaperWatch keeps about papers: the entries of the
+# bookmarked papers, the bookmarks in the order they were added and the
+# collection each is in, when a paper was first seen and when it was read, and
+# which papers every query returned.
+# The database runs in WAL mode, so a bookmark click is a single-row insert or
+# delete committed without rewriting anything else.
+
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from Entry import Entry
+
+SCHEMA_VERSION = 2
+
+# The collection of bookmarks not put in any other
+DEFAULT_COLLECTION = "Unsorted"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    arxiv_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    published TEXT NOT NULL,
+    data TEXT NOT NULL  -- Entry.to_dict() as JSON
+);
+CREATE INDEX IF NOT EXISTS entries_published ON entries(published);
+
+CREATE TABLE IF NOT EXISTS bookmarks (
+    arxiv_id TEXT PRIMARY KEY REFERENCES entries(arxiv_id),
+    position INTEGER NOT NULL,
+    added_at REAL NOT NULL,
+    collection TEXT NOT NULL DEFAULT 'Unsorted'
+);
+CREATE UNIQUE INDEX IF NOT EXISTS bookmarks_position ON bookmarks(position);
+CREATE INDEX IF NOT EXISTS bookmarks_collection ON bookmarks(collection, position);
+
+CREATE TABLE IF NOT EXISTS collections (
+    name TEXT PRIMARY KEY,
+    position INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS seen (
+    arxiv_id TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL,
+    read_at REAL  -- NULL until the paper is opened
+);
+
+CREATE TABLE IF NOT EXISTS history (
+    query TEXT NOT NULL,
+    arxiv_id TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (query, arxiv_id)
+);
+CREATE INDEX IF NOT EXISTS history_fetched ON history(query, fetched_at);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class PaperDatabase:
+    def __init__(self, path: Path):
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        # Transactions are explicit, `with self._db` commits or rolls back
+        self._db = sqlite3.connect(self._path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode a crash may lose the last commits, never corrupt the file
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        version = self._db.execute("PRAGMA user_version").fetchone()[0]
+        with self._db:
+            # executescript commits first, so a migration cut short may have
+            # added the column without updating the version
+            if version == 1 and "collection" not in self._columns("bookmarks"):
+                # Bookmarks of version 1 are all in the default collection
+                self._db.execute(
+                    "ALTER TABLE bookmarks ADD COLUMN "
+                    "collection TEXT NOT NULL DEFAULT 'Unsorted'"
+                )
+            self._db.executescript(SCHEMA)
+            self._db.execute(
+                "INSERT OR IGNORE INTO collections (name, position) VALUES (?, 0)",
+                (DEFAULT_COLLECTION,),
+            )
+            self._db.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self._db.close()
+
+    def _columns(self, table: str) -> List[str]:
+        return [row[1] for row in self._db.execute(f"PRAGMA table_info({table})")]
+
+    # -----------------------------
+    # Entries
+    # -----------------------------
+    def put_entries(self, entries: Iterable[Entry]):
+        """Store entries, keeping the newest version of every paper."""
+        with self._db:
+            self._put_entries(entries)
+
+    def _put_entries(self, entries: Iterable[Entry]):
+        self._db.executemany(
+            """
+            INSERT INTO entries (arxiv_id, version, published, data)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (arxiv_id) DO UPDATE SET
+                version = excluded.version,
+                published = excluded.published,
+                data = excluded.data
+            WHERE excluded.version >= entries.version
+            """,
+            (
+                (e.arxiv_id, e.version, e.published, json.dumps(e.to_dict()))
+                for e in entries
+            ),
+        )
+
+    def get_entry(self, arxiv_id: str) -> Optional[Entry]:
+        row = self._db.execute(
+            "SELECT data FROM entries WHERE arxiv_id = ?", (arxiv_id,)
+        ).fetchone()
+        return None if row is None else Entry.from_dict(json.loads(row[0]))
+
+    # -----------------------------
+    # Bookmarks
+    # -----------------------------
+    def add_bookmark(self, entry: Entry, collection: str = DEFAULT_COLLECTION) -> bool:
+        """Bookmark a paper after the others. False if it already was."""
+        with self._db:
+            self._put_entries((entry,))
+            return self._insert_bookmark(entry, collection)
+
+    def _insert_bookmark(self, entry: Entry, collection: str = DEFAULT_COLLECTION) -> bool:
+        cursor = self._db.execute(
+            """
+            INSERT OR IGNORE INTO bookmarks (arxiv_id, position, added_at, collection)
+            VALUES (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM bookmarks), ?, ?)
+            """,
+            (entry.arxiv_id, time.time(), collection),
+        )
+        return cursor.rowcount > 0
+
+    def move_bookmark(self, arxiv_id: str, collection: str):
+        with self._db:
+            self._db.execute(
+                "UPDATE bookmarks SET collection = ? WHERE arxiv_id = ?",
+                (collection, arxiv_id),
+            )
+
+    def remove_bookmark(self, arxiv_id: str) -> bool:
+        """Remove the bookmark of a paper. False if there was none."""
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM bookmarks WHERE arxiv_id = ?", (arxiv_id,)
+            )
+        return cursor.rowcount > 0
+
+    def clear_bookmarks(self):
+        with self._db:
+            self._db.execute("DELETE FROM bookmarks")
+
+    def bookmark_count(self, collection: Optional[str] = None) -> int:
+        if collection is None:
+            return self._db.execute("SELECT COUNT(*) FROM bookmarks").fetchone()[0]
+        return self._db.execute(
+            "SELECT COUNT(*) FROM bookmarks WHERE collection = ?", (collection,)
+        ).fetchone()[0]
+
+    def bookmarks(
+        self, offset: int = 0, limit: int = -1, collection: Optional[str] = None
+    ) -> List[Entry]:
+        """
+        Bookmarked entries in the order they were added, `limit` from `offset`,
+        of one collection or of all if None.
+        """
+        where, args = "", ()
+        if collection is not None:
+            where, args = "WHERE bookmarks.collection = ?", (collection,)
+        rows = self._db.execute(
+            f"""
+            SELECT entries.data FROM bookmarks
+            JOIN entries USING (arxiv_id)
+            {where}
+            ORDER BY bookmarks.position
+            LIMIT ? OFFSET ?
+            """,
+            args + (limit, offset),
+        )
+        return [Entry.from_dict(json.loads(data)) for data, in rows]
+
+    def bookmark_collections(self) -> Dict[str, str]:
+        """arXiv id -> collection, of the bookmarks outside the default one."""
+        rows = self._db.execute(
+            "SELECT arxiv_id, collection FROM bookmarks WHERE collection != ?",
+            (DEFAULT_COLLECTION,),
+        )
+        return dict(rows)
+
+    # -----------------------------
+    # Collections
+    # -----------------------------
+    def collections(self) -> List[str]:
+        """Names of the collections in the order they were created."""
+        rows = self._db.execute("SELECT name FROM collections ORDER BY position")
+        return [name for name, in rows]
+
+    def create_collection(self, name: str):
+        with self._db:
+            self._insert_collection(name)
+
+    def _insert_collection(self, name: str):
+        self._db.execute(
+            """
+            INSERT OR IGNORE INTO collections (name, position)
+            VALUES (?, (SELECT COALESCE(MAX(position), 0) + 1 FROM collections))
+            """,
+            (name,),
+        )
+
+    def delete_collection(self, name: str):
+        """Delete a collection, its bookmarks go to the default collection."""
+        with self._db:
+            self._db.execute(
+                "UPDATE bookmarks SET collection = ? WHERE collection = ?",
+                (DEFAULT_COLLECTION, name),
+            )
+            self._db.execute("DELETE FROM collections WHERE name = ?", (name,))
+
+    def migrate_bookmarks(self, json_path: Path) -> int:
+        """
+        Copy the bookmarks of a bookmarks.json file, once. The file is left in
+        place. Returns the number of bookmarks added.
+        """
+        key = f"migrated:{Path(json_path).resolve()}"
+        if self._meta(key) is not None or not Path(json_path).exists():
+            return 0
+
+        try:
+            raw = json.loads(Path(json_path).read_text())
+            # Older files are a list of the bookmarked entries
+            names = raw["collections"] if isinstance(raw, dict) else []
+            raw = raw["bookmarks"] if isinstance(raw, dict) else raw
+            bookmarks = [
+                (Entry.from_dict(item), item.get("collection", DEFAULT_COLLECTION))
+                for item in raw
+            ]
+        except (OSError, ValueError, TypeError, AttributeError, KeyError):
+            return 0  # tried again next time, the file stays as it is
+
+        added = 0
+        with self._db:
+            for name in names:
+                self._insert_collection(name)
+            for entry, collection in bookmarks:
+                if entry is None:
+                    continue
+                self._insert_collection(collection)
+                self._put_entries((entry,))
+                added += self._insert_bookmark(entry, collection)
+            self._set_meta(key, str(time.time()))
+        return added
+
+    # -----------------------------
+    # Seen and read papers
+    # -----------------------------
+    def mark_seen(self, arxiv_ids: Iterable[str]):
+        with self._db:
+            self._mark_seen(arxiv_ids, time.time())
+
+    def _mark_seen(self, arxiv_ids: Iterable[str], now: float):
+        self._db.executemany(
+            "INSERT OR IGNORE INTO seen (arxiv_id, seen_at) VALUES (?, ?)",
+            ((arxiv_id, now) for arxiv_id in arxiv_ids),
+        )
+
+    def mark_read(self, arxiv_id: str):
+        now = time.time()
+        with self._db:
+            self._db.execute(
+                """
+                INSERT INTO seen (arxiv_id, seen_at, read_at) VALUES (?, ?, ?)
+                ON CONFLICT (arxiv_id) DO UPDATE SET read_at = excluded.read_at
+                """,
+                (arxiv_id, now, now),
+            )
+
+    def is_seen(self, arxiv_id: str) -> bool:
+        return (
+            self._db.execute(
+                "SELECT 1 FROM seen WHERE arxiv_id = ?", (arxiv_id,)
+            ).fetchone()
+            is not None
+        )
+
+    def is_read(self, arxiv_id: str) -> bool:
+        return (
+            self._db.execute(
+                "SELECT 1 FROM seen WHERE arxiv_id = ? AND read_at IS NOT NULL",
+                (arxiv_id,),
+            ).fetchone()
+            is not None
+        )
+
+    # -----------------------------
+    # Fetch history
+    # -----------------------------
+    def record_history(self, query: str, arxiv_ids: Iterable[str]):
+        """Record papers a query returned, and mark them seen."""
+        now = time.time()
+        arxiv_ids = list(arxiv_ids)
+        with self._db:
+            self._db.executemany(
+                """
+                INSERT INTO history (query, arxiv_id, fetched_at) VALUES (?, ?, ?)
+                ON CONFLICT (query, arxiv_id) DO UPDATE SET
+                    fetched_at = excluded.fetched_at
+                """,
+                ((query, arxiv_id, now) for arxiv_id in arxiv_ids),
+            )
+            self._mark_seen(arxiv_ids, now)
+
+    def history(self, query: str, offset: int = 0, limit: int = -1) -> List[str]:
+        """arXiv ids a query returned, most recently fetched first."""
+        rows = self._db.execute(
+            """
+            SELECT arxiv_id FROM history WHERE query = ?
+            ORDER BY fetched_at DESC, arxiv_id
+            LIMIT ? OFFSET ?
+            """,
+            (query, limit, offset),
+        )
+        return [arxiv_id for arxiv_id, in rows]
+
+    # -----------------------------
+    # Meta data
+    # -----------------------------
+    def _meta(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else row[0]
+
+    def _set_meta(self, key: str, value: str):
+        self._db.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value)
+        )
@@ -0,0 +1,349 @@
+# The virtualized paper list: a list model over the displayed entries and a view
+# that paints their cards with a CardDelegate. Filling the list only resets the
+# model, and the view lays out rows in batches and paints only those on screen,
+# so tens of thousands of papers show up at once and scroll smoothly.
+# CardListWidget is the same list built from EntryCard widgets.
+
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from PyQt6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPoint,
+    Qt,
+    QTimer,
+    pyqtSignal,
+)
+from PyQt6.QtGui import QPalette
+from PyQt6.QtWidgets import QAbstractItemView, QFrame, QListView
+from CardDelegate import (
+    BOOKMARKED_ROLE,
+    ENTRY_ROLE,
+    NEW_ROLE,
+    TITLE,
+    CardDelegate,
+)
+from Config import CardConfig
+from Entry import Entry
+
+
+class PaperListModel(QAbstractListModel):
+    def __init__(self, is_bookmarked: Callable[[Entry], bool], parent=None):
+        super().__init__(parent)
+        self.is_bookmarked = is_bookmarked
+        self._entries: List[Entry] = []  # all entries, in display order
+        self._rows: List[Entry] = []  # the entries passing the filter
+        self._visible: Optional[Set[int]] = None  # id() of those, None for all
+        self._new: Set[int] = set()  # id() of the entries marked as new
+        # arXiv id -> row, built on demand and dropped when the rows change
+        self._row_index: Optional[Dict[str, int]] = None
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+
+        entry = self._rows[index.row()]
+        if role == ENTRY_ROLE:
+            return entry
+        if role == BOOKMARKED_ROLE:
+            return self.is_bookmarked(entry)
+        if role == NEW_ROLE:
+            return id(entry) in self._new
+        if role == Qt.ItemDataRole.DisplayRole:
+            return entry.title
+        return None
+
+    def entry(self, row: int) -> Entry:
+        return self._rows[row]
+
+    def set_entries(self, entries: List[Entry]):
+        """Show `entries`, in this order, without filter."""
+        self.beginResetModel()
+        self._entries = list(entries)
+        self._visible = None
+        self._new = set()
+        self._rows = self._entries
+        self._row_index = None
+        self.endResetModel()
+
+    def row_of(self, entry: Entry) -> Optional[int]:
+        row = self.row_of_id(entry.arxiv_id)
+        return row if row is not None and self._rows[row] is entry else None
+
+    def row_of_id(self, arxiv_id: str) -> Optional[int]:
+        if self._row_index is None:
+            self._row_index = {e.arxiv_id: row for row, e in enumerate(self._rows)}
+        return self._row_index.get(arxiv_id)
+
+    def insert_entries(
+        self,
+        entries: List[Entry],
+        new_entries: List[Entry],
+        new: bool = False,
+        visible: Optional[Set[int]] = None,
+    ):
+        """
+        Add `new_entries`. `entries` is the display order with them added,
+        the other entries keep their order. If a filter is set, `visible` is
+        the filter with the new entries that pass it. Rows are inserted in
+        runs, so the view keeps its scroll position.
+        """
+        shown = self._rows
+        self._entries = list(entries)
+        self._row_index = None
+        if new:
+            self._new.update(id(entry) for entry in new_entries)
+        if visible is not None and self._visible is not None:
+            self._visible = visible
+
+        # While a filter is set, new entries stay hidden until it is set again
+        if self._visible is None:
+            rows = self._entries
+        else:
+            rows = [e for e in self._entries if id(e) in self._visible]
+
+        if not shown:
+            if rows:
+                self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+                self._rows = rows
+                self._row_index = None
+                self.endInsertRows()
+            return
+
+        # `shown` is `rows` without the new entries, insert those into it
+        new_ids = {id(entry) for entry in new_entries}
+        self._rows = shown
+        position = 0
+        while position < len(rows):
+            if id(rows[position]) not in new_ids:
+                position += 1
+                continue
+            end = position
+            while end < len(rows) and id(rows[end]) in new_ids:
+                end += 1
+            self.beginInsertRows(QModelIndex(), position, end - 1)
+            self._rows[position:position] = rows[position:end]
+            self._row_index = None
+            self.endInsertRows()
+            position = end
+
+    def remove_entries(self, removed: List[Entry]):
+        """Remove entries, in runs of rows."""
+        if not removed:
+            return
+
+        ids = {id(entry) for entry in removed}
+        self._entries = [e for e in self._entries if id(e) not in ids]
+        self._row_index = None
+        self._new -= ids
+        if self._visible is not None:
+            self._visible = self._visible - ids
+
+        rows = self._rows
+        self._rows = list(rows)
+        end = len(rows)
+        while end > 0:
+            if id(rows[end - 1]) not in ids:
+                end -= 1
+                continue
+            start = end - 1
+            while start > 0 and id(rows[start - 1]) in ids:
+                start -= 1
+            self.beginRemoveRows(QModelIndex(), start, end - 1)
+            del self._rows[start:end]
+            self._row_index = None
+            self.endRemoveRows()
+            end = start
+        if self._visible is None:
+            self._rows = self._entries
+            self._row_index = None
+
+    def update_entries(self, changed: List[Entry]):
+        """Redraw entries whose fields changed."""
+        for entry in changed:
+            row = self.row_of(entry)
+            if row is not None:
+                self.dataChanged.emit(self.index(row), self.index(row))
+
+    def reorder(self, entries: List[Entry]):
+        """Show the same entries in the order of `entries`."""
+        self.layoutAboutToBeChanged.emit()
+        self._entries = list(entries)
+        self._update_rows()
+        self.layoutChanged.emit()
+
+    def set_visible(self, visible: Optional[Set[int]]):
+        """Only show the entries whose id() is in `visible`, all if None."""
+        self.beginResetModel()
+        self._visible = visible
+        self._update_rows()
+        self.endResetModel()
+
+    def refresh_bookmarks(self, arxiv_ids: Optional[Iterable[str]] = None):
+        """Redraw the bookmark state of the papers `arxiv_ids`, of all if None."""
+        if arxiv_ids is None:
+            if self._rows:
+                self.dataChanged.emit(
+                    self.index(0), self.index(len(self._rows) - 1), [BOOKMARKED_ROLE]
+                )
+            return
+
+        for arxiv_id in arxiv_ids:
+            row = self.row_of_id(arxiv_id)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [BOOKMARKED_ROLE])
+
+    def _update_rows(self):
+        self._row_index = None
+        if self._visible is None:
+            self._rows = self._entries
+        else:
+            self._rows = [e for e in self._entries if id(e) in self._visible]
+
+
+class PaperListView(QListView):
+    entryClicked = pyqtSignal(object)
+    bookmarkEntryClicked = pyqtSignal(object)
+
+    # Rows laid out per pass of the event loop
+    BATCH_SIZE = 200
+
+    def __init__(
+        self,
+        config: CardConfig,
+        is_bookmarked: Callable[[Entry], bool],
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.paper_model = PaperListModel(is_bookmarked, self)
+        self.setModel(self.paper_model)
+        self.delegate = CardDelegate(config, self)
+        self.setItemDelegate(self.delegate)
+
+        self.delegate.entryClicked.connect(self.entryClicked)
+        self.delegate.bookmarkClicked.connect(self._on_bookmark_clicked)
+
+        # Rows differ in height, they are laid out in batches so that a large
+        # list shows its first rows right away
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(self.BATCH_SIZE)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setFrameShape(QFrame.Shape.NoFrame)
+        self.setMouseTracking(True)
+        # The cards are drawn in the base color on the window color
+        self.viewport().setBackgroundRole(QPalette.ColorRole.Window)
+
+        self._anchor = None  # (entry, its top in the viewport) to keep in place
+        self.verticalScrollBar().rangeChanged.connect(self._restore_anchor)
+        self.verticalScrollBar().actionTriggered.connect(self._on_scroll_action)
+
+    def set_entries(self, entries: List[Entry]):
+        self._anchor = None
+        self.paper_model.set_entries(entries)
+
+    def insert_entries(
+        self,
+        entries: List[Entry],
+        new_entries: List[Entry],
+        new: bool = False,
+        visible: Optional[Set[int]] = None,
+    ):
+        self.paper_model.insert_entries(entries, new_entries, new, visible)
+
+    def remove_entries(self, removed: List[Entry]):
+        self.paper_model.remove_entries(removed)
+
+    def update_entries(self, changed: List[Entry]):
+        self.paper_model.update_entries(changed)
+        # Heights are computed again for rows whose content changed
+        for entry in changed:
+            row = self.paper_model.row_of(entry)
+            if row is not None:
+                self.delegate.sizeHintChanged.emit(self.paper_model.index(row))
+
+    def reorder(self, entries: List[Entry]):
+        self.paper_model.reorder(entries)
+
+    def set_visible(self, visible: Optional[Set[int]]):
+        self._anchor = None
+        self.paper_model.set_visible(visible)
+
+    def refresh_bookmarks(self, arxiv_ids: Optional[Iterable[str]] = None):
+        self.paper_model.refresh_bookmarks(arxiv_ids)
+
+    def keep_scroll_anchor(self):
+        """
+        Keep the paper at the top of the view in its place on screen while the
+        list changes. Rows are laid out in batches after a change, so the
+        anchor is restored whenever the scroll range changes, until the user
+        scrolls or the list is filled or filtered anew.
+        """
+        if self.verticalScrollBar().value() == 0:
+            return  # at the top the view stays at the top, showing new papers
+        index = self.indexAt(QPoint(1, 1))
+        if index.isValid():
+            self._anchor = (index.data(ENTRY_ROLE), self.visualRect(index).top())
+            QTimer.singleShot(0, self._restore_anchor)
+
+    def _restore_anchor(self):
+        if self._anchor is None:
+            return
+
+        entry, offset = self._anchor
+        row = self.paper_model.row_of(entry)
+        if row is None:
+            self._anchor = None
+            return
+        rect = self.visualRect(self.paper_model.index(row))
+        if not rect.isValid():
+            return  # not laid out yet
+
+        bar = self.verticalScrollBar()
+        target = bar.value() + rect.top() - offset
+        bar.setValue(target)
+
+    def _on_scroll_action(self, action: int):
+        # The user scrolled, the anchor no longer matters
+        self._anchor = None
+
+    def _on_bookmark_clicked(self, entry: Entry):
+        # The bookmarks report the change, which redraws the row
+        self.bookmarkEntryClicked.emit(entry)
+
+    def mouseMoveEvent(self, event):
+        super().mouseMoveEvent(event)
+        pos = event.position().toPoint()
+        index = self.indexAt(pos)
+        hovered = None
+        if index.isValid():
+            part = self.delegate.hit_test(self.visualRect(index), index, pos)
+            if part is not None:
+                hovered = (index.row(), part)
+        self._set_hovered(hovered)
+
+    def leaveEvent(self, event):
+        super().leaveEvent(event)
+        self._set_hovered(None)
+
+    def _set_hovered(self, hovered):
+        if hovered == self.delegate.hovered:
+            return
+
+        for target in (self.delegate.hovered, hovered):
+            if target is not None:
+                self.viewport().update(self.visualRect(self.paper_model.index(target[0])))
+        self.delegate.hovered = hovered
+
+        if hovered is not None and hovered[1] == TITLE:
+            self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+        else:
+            self.viewport().unsetCursor()
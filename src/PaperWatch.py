@@ -1,37 +1,64 @@
 import feedparser
 
-from PyQt6.QtNetwork import QNetworkReply, QNetworkRequest
-from PyQt6.QtCore import QThread, QUrl, Qt, QStandardPaths, QCoreApplication
-from PyQt6.QtGui import QDesktopServices, QAction, QActionGroup
-from PyQt6.QtNetwork import QNetworkAccessManager
+from PyQt6.QtCore import (
+    QCoreApplication,
+    QEvent,
+    QStandardPaths,
+    QThread,
+    QTimer,
+    QUrl,
+    Qt,
+)
+from PyQt6.QtGui import QDesktopServices, QAction, QActionGroup, QKeySequence
+from FetchRegistry import FetchRegistry
 from EntryCard import EntryCard
+from CardListWidget import CardListWidget
+from PaperListView import PaperListView
 from EntryInfoWidget import EntryInfoWidget
 from Entry import Entry
-import enum
-from typing import List, overload, Union
+from EntryRegistry import registry
+import bisect
+import shutil
+import time
+from typing import Dict, List, Optional, Set, overload, Union
 from Config import AppConfig
 from SidePanel import SidePanel
-from DOI2Bib import DOI2Bib
-from BookmarkManager import BookmarkManager
+from DOI2Bib import DOI2Bib, BibtexBatchResult
+from BibtexCache import BibtexCache
+from BookmarkBrowser import BookmarkBrowser
+from BookmarkManager import (
+    BookmarkManager,
+    BookmarkStorage,
+    JsonBookmarkStorage,
+    SqliteBookmarkStorage,
+)
+from PaperDatabase import PaperDatabase
+from ResultCache import ResultCache
+from WatermarkStore import WatermarkStore
+from RequestScheduler import RequestScheduler
+from Subscription import Subscription, subscriptions_from_config
+from SortIndex import SortBy, SortIndex
+from EntryStore import EntryStore, SUBJECTS, DOI, TEXT
+from Poller import Poller
 from Config import load_config
 
 from PyQt6.QtWidgets import (
     QMessageBox,
+    QFileDialog,
     QMainWindow,
     QSizePolicy,
     QVBoxLayout,
-    QScrollArea,
     QWidget,
-    QFrame,
     QStackedWidget,
     QHBoxLayout,
-    QPushButton,
     QLineEdit,
+    QInputDialog,
 )
 
 from ConfigEditorWidget import ConfigEditorWidget
 
 from Statusbar import Statusbar
+from Theme import Theme
 from pathlib import Path
 
 APP_NAME = "PaperWatch"
@@ -41,11 +68,10 @@ QCoreApplication.setApplicationVersion(APP_VERSION)
 
 
 class PaperWatchApp(QMainWindow):
-    # Sort entries general function that sorts according to enum SortBy
-    class SortBy(enum.Enum):
-        DATE = 1
-        TITLE = 2
-        AUTHOR = 3
+    SortBy = SortBy
+
+    # Papers indexed for the search per pass of the event loop
+    INDEX_CHUNK = 2000
 
     def __init__(self):
         super().__init__()
@@ -67,58 +93,116 @@ class PaperWatchApp(QMainWindow):
             self.config.file_path = self.config_file
 
         if self.config:
-            self.sort_by: self.SortBy = self.config.arxiv.sort_by
             self.sort_order_ascending: bool = (
                 self.config.arxiv.sort_order == "ascending"
             )
         else:
             self.config = AppConfig()
-            self.sort_by = self.SortBy.DATE
             self.sort_order_ascending = False  # Default to descending
             self.config.arxiv.keywords = []
 
-        self.entries: feedparser.FeedParserDict = None  # paper entries
+        # arxiv.sort_by names the order of the API results, which is always by
+        # date, so the displayed papers start out sorted by date as well
+        self.sort_by: SortBy = SortBy.DATE
+        self.sort_index = SortIndex()
+        # All papers of the view, also those filtered out, for filtering
+        self.entry_store = EntryStore(search_abstracts=self.config.search.abstracts)
+        self.entry_store.set_doi_only(self.config.arxiv.doi_only)
+
+        self.entries: List[Entry] = None  # paper entries, in display order
+        # Displayed entries that took over a newer version, to redraw
+        self._updated_entries: Dict[int, Entry] = {}
+        registry.listeners.append(self._on_entry_updated)
         self.numPapers: int = 0
-        self.parameters: str = ""
 
         self.setWindowTitle("PaperWatch")
         self.setGeometry(100, 100, 800, 600)
         # Additional UI setup can be done here
 
-        self.bookmark_manager = BookmarkManager("bookmarks.json")
+        # Bookmarks, read papers and the fetch history live in the data dir
+        self.data_dir = Path(
+            QStandardPaths.writableLocation(
+                QStandardPaths.StandardLocation.AppDataLocation
+            )
+        )
+        self.database = PaperDatabase(self.data_dir / self.config.bookmark.file_path)
+        self.bookmark_manager = BookmarkManager(self._bookmark_storage())
 
-        self.initUI()
+        self.method_name = "search_query"
 
-        # Fetch papers based on keywords, it should be title=keyword+OR+title=keyword
+        # All subscriptions share one scheduler, which enforces the concurrency
+        # limit and the delay between requests arXiv asks for.
+        self.scheduler = RequestScheduler(
+            max_concurrent=self.config.arxiv.max_concurrent_requests,
+            delay=self.config.arxiv.request_delay,
+            timeout=self.config.arxiv.request_timeout,
+            parent=self,
+        )
 
-        # Start with keywords (default to title search)
-        self.parameters = ""
-        if self.config.arxiv.keywords:
-            self.parameters = "+AND+".join(
-                f"ti:{k}" for k in self.config.arxiv.keywords
-            )
+        # Fetches of the same query are shared, whoever asked for them
+        self.fetch_registry = FetchRegistry(self.scheduler, self)
+        self.fetch_registry.pageFetched.connect(self.on_page_response)
+        self.fetch_registry.progress.connect(self.on_fetch_progress)
+        self.fetch_registry.finished.connect(self.on_fetch_finished)
+        self.fetch_registry.failed.connect(self.on_fetch_failed)
+        self.fetch_registry.cancelled.connect(self.on_fetch_cancelled)
 
-        # Build subject filter
-        if self.config.arxiv.subjects:
-            # Join the selected subjects
-            subject_filter = "+OR+".join(self.config.arxiv.subjects)
-            if self.parameters:
-                self.parameters += f"+AND+({subject_filter})"
-            else:
-                self.parameters = f"({subject_filter})"
-        # else: no subjects specified → do nothing, search across all subjects
+        self.poller = Poller(self.config.polling, self)
+        self.poller.pollDue.connect(self.fetch_subscription)
+        self.poller.statusChanged.connect(self._update_poll_status)
 
-        self.method_name = "search_query"
+        self.watermarks = WatermarkStore(self.config_dir / "watermarks.json")
 
-        self._arxiv_fetch_network_manager = QNetworkAccessManager()
-        self._arxiv_fetch_network_manager.finished.connect(self.on_page_response)
+        self.result_cache = ResultCache(
+            self.config_dir / "cache",
+            ttl=self.config.cache.ttl,
+            max_bytes=self.config.cache.max_size_mb * 1_000_000,
+        )
 
-        if self.parameters != "":
-            self.fetch_papers_async(
-                self.method_name,
-                self.parameters,
-                max_results=self.config.arxiv.max_results,
+        # One DOI resolver for the whole application, so lookups share the
+        # network manager, the per-host limits and the BibTeX cache
+        self.doi2bib = DOI2Bib(
+            BibtexCache(self.config_dir / "cache" / "bibtex.json"),
+            nam=self.scheduler.nam,
+            max_concurrent=self.config.bibtex.max_concurrent_requests,
+            delay=self.config.bibtex.request_delay,
+            timeout=self.config.bibtex.request_timeout,
+            parent=self,
+        )
+        self.doi2bib.progress.connect(self._on_bibtex_export_progress)
+        self.doi2bib.batchFinished.connect(self._on_bibtex_export_finished)
+        self.doi2bib.cacheError.connect(
+            lambda error: self.statusbar.set_message(
+                f"Error: could not save the BibTeX cache: {error}", 5000
             )
+        )
+        self._bibtex_export: tuple = None  # (batch, file path, entries)
+
+        self.subscriptions: Dict[str, Subscription] = {}
+        self.current_subscription: Subscription = None
+
+        for subscription in subscriptions_from_config(self.config):
+            self._add_subscription(subscription)
+
+        self.initUI()
+
+        # Show every subscription from the cache right away, and fetch the ones
+        # that are missing or stale, starting with the one on screen.
+        stale = [
+            subscription
+            for subscription in self.subscriptions.values()
+            if not self.load_cached_result(subscription)
+        ]
+
+        if self.subscriptions:
+            first = next(iter(self.subscriptions.values()))
+            self.side_panel.select_page(first.name)
+            self.select_subscription(first.name)
+
+        for subscription in stale:
+            self.fetch_subscription(subscription)
+
+        self.poller.start()
 
     def initUI(self):
         """Initialize the user interface."""
@@ -130,6 +214,8 @@ class PaperWatchApp(QMainWindow):
         self.help_menu = self.menubar.addMenu("Help")
 
         EntryCard.set_config(self.config)
+        self.theme = Theme(self.config.ui.card)
+        self.theme.apply()
 
         # self.edit_menu.addAction(
         #     "Settings",
@@ -140,18 +226,35 @@ class PaperWatchApp(QMainWindow):
         self.side_panel.setVisible(self.config.ui.side_panel.visible)
         self.side_panel.setContentsMargins(0, 0, 0, 0)
 
-        for bookmark_name in self.bookmark_manager.list_all():
-            self.side_panel.add_page(f"{bookmark_name}")
+        for name in self.subscriptions:
+            self.side_panel.add_page(name)
+        self.side_panel.pageSelected.connect(self.select_subscription)
+
+        # Collection counts are kept by the bookmarks, updated as they change
+        for name in self.bookmark_manager.collections():
+            self.side_panel.set_collection_count(
+                name, self.bookmark_manager.count(name)
+            )
+        self.bookmark_manager.collection_listeners.append(self._on_collection_changed)
 
         if self.config.ui.side_panel.width > 0:
             self.side_panel.setMinimumWidth(self.config.ui.side_panel.width)
 
+        self.file_menu.addAction("Refresh", self.refresh_subscriptions)
+        stop_action = self.file_menu.addAction("Stop Loading", self.cancel_fetches)
+        stop_action.setShortcut(QKeySequence(Qt.Key.Key_Escape))
         self.file_menu.addAction(
-            "Refresh",
-            lambda: self.fetch_papers_async(self.method_name, self.parameters),
+            "Export Bookmarks as BibTeX...", self.export_bookmarks_bibtex
         )
         self.file_menu.addAction("Exit", self.close)
 
+        self.edit_menu.addAction(
+            "New Bookmark Collection...", self._new_bookmark_collection
+        )
+        self.edit_menu.addAction(
+            "Delete Bookmark Collection...", self._delete_bookmark_collection
+        )
+
         # Add sorting options to view menu with exclusive selection with QActionGroup
 
         sort_group = QActionGroup(self)
@@ -177,7 +280,7 @@ class PaperWatchApp(QMainWindow):
         sort_by_date_action.setChecked(self.sort_by == self.SortBy.DATE)
         sort_by_title_action.setChecked(self.sort_by == self.SortBy.TITLE)
 
-        self.view_menu.addAction("Manage Bookmarks", self._show_bookmarks)
+        self.view_menu.addAction("Manage Bookmarks", lambda: self._show_bookmarks())
 
         self.sort_by_menu = self.view_menu.addMenu("Sort By")
 
@@ -205,9 +308,9 @@ class PaperWatchApp(QMainWindow):
         sort_order_group.addAction(ascending_action)
         sort_order_group.addAction(descending_action)
 
-        ascending_action.triggered.connect(lambda: self.sort_entries_by(self.sort_by))
+        ascending_action.triggered.connect(lambda: self.set_sort_order(True))
 
-        descending_action.triggered.connect(lambda: self.sort_entries_by(self.sort_by))
+        descending_action.triggered.connect(lambda: self.set_sort_order(False))
 
         # Main layout
         self.layout = QVBoxLayout()
@@ -218,31 +321,48 @@ class PaperWatchApp(QMainWindow):
 
         self.statusbar.setVisible(self.config.ui.statusbar.visible)
 
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setVerticalScrollBarPolicy(
-            Qt.ScrollBarPolicy.ScrollBarAsNeeded
-        )
-        self.scroll_area.setFrameStyle(QFrame.Shape.NoFrame)
-        self.scroll_area.setContentsMargins(0, 0, 0, 0)
-        self.layout.setContentsMargins(0, 0, 0, 0)
-        self.scroll_area.setWidgetResizable(True)
-
-        self.scroll_layout = QVBoxLayout()
-        self.scroll_area_widget = QWidget()
-        self.scroll_area_widget.setLayout(self.scroll_layout)
-        self.scroll_area.setWidget(self.scroll_area_widget)
+        if self.config.ui.card.virtualized:
+            self.paper_list = PaperListView(
+                self.config.ui.card, self.bookmark_manager.is_bookmarked
+            )
+        else:
+            self.paper_list = CardListWidget(
+                self.config.ui.card, self.bookmark_manager.is_bookmarked
+            )
+            self.paper_list.renderProgress.connect(self.statusbar.set_render_progress)
+        self.paper_list.entryClicked.connect(self.on_entry_clicked)
+        self.paper_list.bookmarkEntryClicked.connect(self.bookmark_entry)
+        self.bookmark_manager.listeners.append(self._on_bookmarks_changed)
 
-        self.entry_search_bar = QLineEdit(placeholderText="Search entries...")
-        self.scroll_layout.addWidget(self.entry_search_bar)
-        self.entry_search_bar.textChanged.connect(
-            lambda text: self._filter_entries(text)
+        self.entry_search_bar = QLineEdit(
+            placeholderText="Search entries... (au:, ti:, cat: for one field)"
+        )
+        # Search once typing pauses, not on every keystroke
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.config.search.debounce_ms)
+        self._search_timer.timeout.connect(
+            lambda: self._filter_entries(self.entry_search_bar.text())
         )
+        self.entry_search_bar.textChanged.connect(self._search_timer.start)
+        # Index new papers for the search while the application is idle
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(0)
+        self._index_timer.timeout.connect(self._index_entries)
+
+        # The search bar above the list of papers
+        self.feed_widget = QWidget()
+        feed_layout = QVBoxLayout(self.feed_widget)
+        feed_layout.setContentsMargins(0, 0, 0, 0)
+        feed_layout.addWidget(self.entry_search_bar)
+        feed_layout.addWidget(self.paper_list)
 
         self.stacked_widget = QStackedWidget()
-        self.entry_info_widget = EntryInfoWidget()
+        self.entry_info_widget = EntryInfoWidget(self.doi2bib)
 
-        self.entry_info_widget.backClicked.connect(self.back_to_main_view)
+        self.entry_info_widget.backClicked.connect(self._back_from_entry)
         self.entry_info_widget.bookmarkClicked.connect(self.bookmark_entry)
+        self.entry_info_widget.collectionChanged.connect(self.bookmark_manager.move)
 
         self.side_panel.setSizePolicy(
             QSizePolicy.Policy.Maximum,
@@ -253,24 +373,20 @@ class PaperWatchApp(QMainWindow):
         self.layout.addLayout(self.horiz_layout)
         self.horiz_layout.addWidget(self.side_panel)
         self.horiz_layout.addWidget(self.stacked_widget)
-        self.stacked_widget.addWidget(self.scroll_area)
+        self.stacked_widget.addWidget(self.feed_widget)
         self.stacked_widget.addWidget(self.entry_info_widget)
         self.layout.addWidget(self.statusbar)
         self.layout.setContentsMargins(0, 0, 0, 0)
 
-        self.bookmark_widget = QWidget()
-        self.bookmark_layout = QVBoxLayout()
-        self.bookmark_widget.setLayout(self.bookmark_layout)
-        self.stacked_widget.addWidget(self.bookmark_widget)
-
-        # Bookmark widget
-
-        search_bar = QLineEdit()
-        back_btn = QPushButton("Back")
-        back_btn.clicked.connect(self.back_to_main_view)
-        self.bookmark_layout.addWidget(search_bar)
-        self.bookmark_layout.addWidget(back_btn)
-        self.bookmark_layout.addStretch()
+        # Bookmark page
+        self.bookmark_browser = BookmarkBrowser(self.config, self.bookmark_manager)
+        self.bookmark_browser.backClicked.connect(self.back_to_main_view)
+        self.bookmark_browser.entryClicked.connect(self.on_entry_clicked)
+        self.bookmark_browser.bookmarkEntryClicked.connect(self.bookmark_entry)
+        self.stacked_widget.addWidget(self.bookmark_browser)
+        self.side_panel.collectionSelected.connect(self._show_bookmarks)
+        # The page the paper details go back to
+        self._entry_return_widget = self.feed_widget
 
     def showPapers(
         self,
@@ -278,136 +394,500 @@ class PaperWatchApp(QMainWindow):
         remove_existing_entries=False,
     ) -> None:
         """
-        Display fetched papers in the UI.
+        Display fetched papers in the UI, in the current sort order.
         """
-        if remove_existing_entries:
-            # Clear the children of scroll_layout, except the stretch at the end
+        if isinstance(papers, feedparser.FeedParserDict):
+            papers = papers.entries
 
-            self._clear_scroll_layout()
+        # if the entry is already an Entry object, use it directly
+        papers = registry.resolve_all(
+            feed if isinstance(feed, Entry) else Entry(feed) for feed in papers
+        )
 
-            self.numPapers = 0
+        if remove_existing_entries or self.entries is None:
+            self.entry_store.clear()
+            self._updated_entries.clear()
+        else:
+            # A paper is shown once, even if several pages return it
+            shown = {id(entry) for entry in self.sort_index.entries}
+            papers = [entry for entry in papers if id(entry) not in shown]
+            # Papers shown that took over a newer version are placed anew
+            self._apply_updated_entries()
+        new_entries = self._accepted_entries(papers)
+
+        if remove_existing_entries or self.entries is None:
+            self.sort_index.clear()
+            self.sort_index.add(new_entries)
+            self.entries = self._sorted_entries()
+            self.paper_list.set_entries(self.entries)
+        else:
+            self.sort_index.add(new_entries)
+            self._insert_entries(new_entries)
 
-        if isinstance(papers, list):
-            self.entries = papers
-        elif isinstance(papers, feedparser.FeedParserDict):
-            self.entries = papers.entries
+        self.numPapers = len(self.entries)
 
-        subjects = self.config.arxiv.subjects if self.config else []
+        if self.entry_search_bar.text():
+            self._filter_entries(self.entry_search_bar.text())
 
-        # if the entry is already an Entry object, use it directly
-        for feed in self.entries:
-            if isinstance(feed, Entry):
-                entry: Entry = feed
-            else:
-                entry: Entry = Entry(feed)
+    def mergePapers(self, papers: List[Entry], new: bool = False) -> None:
+        """
+        Show `papers` in place of the displayed ones, changing only what
+        differs: papers that are gone are removed, added ones are inserted at
+        their sorted place (highlighted if `new`) and updated ones are redrawn.
+        The scroll position and the search stay as they are.
+        """
+        if self.entries is None:
+            self.showPapers(papers, remove_existing_entries=True)
+            return
 
-            if self.config.arxiv.doi_only and entry.doi == "":
-                continue
+        papers = registry.resolve_all(papers)
+        keep = {id(entry) for entry in papers}
+        store = self.entry_store
+        gone = [entry for entry in store.live_entries() if id(entry) not in keep]
+        added = [entry for entry in papers if entry not in store]
+        # Updated entries move to new rows, their fields may filter and sort
+        # them differently
+        changed = [
+            entry for entry in self._take_updated_entries() if id(entry) in keep
+        ]
+        if not (gone or added or changed):
+            return
+        self._apply_changes(gone, added, changed, new)
 
-            if subjects != [] and entry.primary_category not in subjects:
-                continue  # Skip this entry
+    def _apply_changes(
+        self,
+        gone: List[Entry],
+        added: List[Entry],
+        changed: List[Entry],
+        new: bool = False,
+    ):
+        """
+        Remove the papers `gone`, add `added` and filter and sort `changed`
+        anew, changing only their rows of the list.
+        """
+        store = self.entry_store
+        shown = {id(entry) for entry in self.sort_index.entries}
+        store.remove(gone + changed)
+        self.sort_index.remove(gone + changed)
+        accepted = self._accepted_entries(changed + added)
+        self.sort_index.add(accepted)
+        self.entries = self._sorted_entries()
+
+        accepted_ids = {id(entry) for entry in accepted}
+        removed = [
+            entry
+            for entry in gone + changed
+            if id(entry) in shown and id(entry) not in accepted_ids
+        ]
+        updated = [
+            entry
+            for entry in changed
+            if id(entry) in shown and id(entry) in accepted_ids
+        ]
+        inserted = [entry for entry in accepted if id(entry) not in shown]
+
+        visible = None
+        if self.entry_search_bar.text():
+            visible = {id(store.entries[row]) for row in store.rows((TEXT,))}
+
+        self.paper_list.keep_scroll_anchor()
+        self.paper_list.remove_entries(removed)
+        if updated:
+            self.paper_list.update_entries(updated)
+            # Their sort keys may have changed as well
+            inserted_ids = {id(entry) for entry in inserted}
+            self.paper_list.reorder(
+                [entry for entry in self.entries if id(entry) not in inserted_ids]
+            )
+        self.paper_list.insert_entries(self.entries, inserted, new, visible)
+        self.numPapers = len(self.entries)
+
+    def _on_entry_updated(self, entry: Entry):
+        if entry in self.entry_store:
+            if not self._updated_entries:
+                # Updates by fetches of other subscriptions are applied once
+                # control is back in the event loop, a page of this one
+                # applies them right away
+                QTimer.singleShot(0, self._apply_updated_entries)
+            self._updated_entries[id(entry)] = entry
+
+    def _take_updated_entries(self) -> List[Entry]:
+        """Displayed entries that took over a newer version since last taken."""
+        store = self.entry_store
+        changed = [entry for entry in self._updated_entries.values() if entry in store]
+        self._updated_entries.clear()
+        return changed
+
+    def _apply_updated_entries(self):
+        """Filter, sort and index anew the entries updated to a newer version."""
+        changed = self._take_updated_entries()
+        if changed and self.entries is not None:
+            self._apply_changes([], [], changed)
+
+    def _bookmark_storage(self) -> BookmarkStorage:
+        # Bookmarks used to be kept in bookmarks.json in the working directory
+        legacy = Path("bookmarks.json")
+        json_path = self.data_dir / "bookmarks.json"
+        if self.config.bookmark.backend == "json":
+            if not json_path.exists() and legacy.exists():
+                shutil.copyfile(legacy, json_path)
+            return JsonBookmarkStorage(json_path)
+
+        for path in (legacy, json_path):
+            self.database.migrate_bookmarks(path)
+        return SqliteBookmarkStorage(self.database)
+
+    def _sorted_entries(self) -> List[Entry]:
+        return self.sort_index.sorted(self.sort_by, self.sort_order_ascending)
+
+    def _insert_entries(self, new_entries: List[Entry], new: bool = False):
+        """Show entries just added to the sort index at their sorted place."""
+        self.entries = self._sorted_entries()
+        self.paper_list.insert_entries(self.entries, new_entries, new)
+
+    def _accepted_entries(self, papers: List[Entry]) -> List[Entry]:
+        """
+        Add papers to the entry store and return those passing the DOI and
+        subject filters of the config and the current subscription.
+        """
+        new_rows = self.entry_store.append(papers)
+        if new_rows:
+            self._index_timer.start()
+        rows = self.entry_store.rows((SUBJECTS, DOI))
+        first = bisect.bisect_left(rows, new_rows.start)
+        return [self.entry_store.entries[row] for row in rows[first:]]
+
+    def _add_subscription(self, subscription: Subscription):
+        self.subscriptions[subscription.name] = subscription
+        self.poller.add(subscription, subscription.poll_interval)
+
+    def select_subscription(self, name: str):
+        """Display the papers of a subscription, without any request."""
+        subscription = self.subscriptions.get(name)
+        if subscription is None or subscription is self.current_subscription:
+            return
 
-            card = EntryCard(entry)
-            card.entryClicked.connect(self.on_entry_clicked)
-            card.bookmarkEntryClicked.connect(self.bookmark_entry)
-            card.setBookmarked(self.bookmark_manager.is_bookmarked(entry))
-            self.scroll_layout.addWidget(card)
-            self.numPapers += 1
+        self.current_subscription = subscription
+        self.entry_store.set_subjects(subscription.subjects)
 
-        self.scroll_layout.addStretch()
-        self.scroll_layout.setSpacing(self.config.ui.card.spacing)
+        if subscription.result is not None:
+            self.showPapers(subscription.result, remove_existing_entries=True)
+        else:
+            # Pages of a running first fetch are appended as they arrive
+            self.showPapers(subscription.fetched, remove_existing_entries=True)
+            subscription.first_page_pending = False
 
-    def fetch_papers_async(
-        self, method_name: str, parameters: str, max_results: int = 10
-    ):
+        self.statusbar.set_keywords(subscription.keywords)
+        self.statusbar.set_subjects(subscription.subjects)
+        self.statusbar.set_papers_count(self.numPapers)
+
+        if self.fetch_registry.is_fetching(subscription):
+            self.statusbar.start_progress(subscription.progress[1])
+            self.statusbar.update_progress(subscription.progress[0])
+        else:
+            self.statusbar.stop_progress()
+
+    def refresh_subscriptions(self):
+        """Fetch every subscription again, the one on screen first."""
+        subscriptions = list(self.subscriptions.values())
+        if self.current_subscription is not None:
+            subscriptions.remove(self.current_subscription)
+            subscriptions.insert(0, self.current_subscription)
+
+        for subscription in subscriptions:
+            self.fetch_subscription(subscription)
+
+    def fetch_subscription(self, subscription: Subscription):
         """
-        Fetch papers asynchronously from arXiv API.
+        Fetch papers of a subscription asynchronously from arXiv API, one page
+        at a time. Cards are added to the view as each page arrives.
         """
-        self.statusbar.set_message("Loading papers...", 0)
-        url_template = "http://export.arxiv.org/api/query?{method_name}={parameters}&start=0&max_results={max_results}&sortBy=submittedDate&sortOrder=descending"
+        # Refresh clicks and polls while the subscription is being fetched
+        # wait for that fetch instead of starting over
+        if self.fetch_registry.is_fetching(subscription):
+            return
 
-        url = f"{url_template.format(method_name=method_name, parameters=parameters, max_results=max_results)}"
+        # A known result stays on screen until the new one is complete. Results
+        # are sorted by submission date, so once the fetch reaches the newest
+        # paper seen last time the remaining pages are already known.
+        subscription.start_fetch(self.watermarks.get(subscription.query))
 
-        request = QNetworkRequest(QUrl(url))
-        request.setAttribute(QNetworkRequest.Attribute.RedirectPolicyAttribute, True)
-        self._arxiv_fetch_network_manager.get(request)
+        stop_when, stop_key = None, None
+        if subscription.watermark is not None:
+            mark = subscription.watermark
+            stop_when = lambda entries: any(mark.is_reached(e) for e in entries)
+            stop_key = mark.published
 
-    def on_page_response(self, reply: QNetworkReply):
-        if reply.error() != QNetworkReply.NetworkError.NoError:
-            raise ValueError("Error:", reply.errorString())
-            return
+        if subscription is self.current_subscription:
+            if subscription.revalidating:
+                self.statusbar.set_message("Checking for new papers...", 0)
+            else:
+                self.statusbar.set_message("Loading papers...", 0)
+
+        # Another subscription with the same query may already fetch it
+        self.fetch_registry.fetch(
+            subscription,
+            self.method_name,
+            subscription.query,
+            max_results=subscription.max_results,
+            page_size=self.config.arxiv.page_size,
+            stop_when=stop_when,
+            stop_key=stop_key,
+        )
 
-        data = reply.readAll().data()
-        feed = feedparser.parse(data)
-        if len(feed.entries) == 0:
-            self.statusbar.clear_message()
-            QMessageBox.warning(
-                self,
-                "No Papers Found",
-                "No papers were found with the given keywords/subjects.",
-            )
+    def cancel_fetches(self):
+        """Stop all running fetches, keeping the papers loaded so far."""
+        for subscription in self.subscriptions.values():
+            self.fetch_registry.cancel(subscription)
+
+    def load_cached_result(self, subscription: Subscription) -> bool:
+        """
+        Load the cached result of a subscription. Returns True if the cached
+        result is fresh, i.e. there is no need to fetch it again.
+        """
+        if not self.config.cache.enabled:
+            return False
+
+        cached = self.result_cache.get(subscription.query, subscription.max_results)
+        if cached is None:
+            return False
+
+        subscription.result = cached.entries
+        return cached.fresh
+
+    def on_page_response(self, subscription: Subscription, feed_entries: list):
+        subscription.fetched.extend(feed_entries)
+        if subscription.revalidating or subscription is not self.current_subscription:
             return
-        self.showPapers(feed, remove_existing_entries=True)
+
+        # The first page of a new fetch replaces whatever is displayed
+        self.showPapers(
+            feed_entries, remove_existing_entries=subscription.first_page_pending
+        )
+        subscription.first_page_pending = False
         self.statusbar.set_papers_count(self.numPapers)
-        self.statusbar.set_message("Papers loaded successfully.", 3000)
 
-    def on_entry_clicked(self, entry: Entry):
-        self.side_panel.setVisible(False)
-        self.stacked_widget.setCurrentWidget(self.entry_info_widget)
-        self.entry_info_widget.setEntryInfo(
-            entry, self.bookmark_manager.is_bookmarked(entry)
+    def on_fetch_progress(self, subscription: Subscription, fetched: int, total: int):
+        subscription.progress = (fetched, total)
+        if subscription is self.current_subscription:
+            self.statusbar.start_progress(total)
+            self.statusbar.update_progress(fetched)
+
+    def on_fetch_finished(self, subscription: Subscription, count: int):
+        current = subscription is self.current_subscription
+        if current:
+            self.statusbar.stop_progress()
+
+        self.poller.report_success(
+            subscription, time.monotonic() - subscription.fetch_started
         )
 
-    # Make this work with ascending/descending order
-    def sort_entries_by(self, sort_by: SortBy):
-        if self.entries is None:
+        if subscription.watermark is not None:
+            self._merge_new_entries(subscription)
             return
 
-        self.sort_by = sort_by
+        fetched = subscription.fetched
+        if count > 0 and self.config.cache.enabled:
+            self.result_cache.put(subscription.query, subscription.max_results, fetched)
+        self.watermarks.update(subscription.query, fetched)
+        self.database.record_history(
+            subscription.query, [entry.arxiv_id for entry in fetched]
+        )
 
-        if self.sort_by == sort_by:
-            self.sort_order_ascending = not self.sort_order_ascending
-        else:
-            self.sort_order_ascending = False  # Default to descending on new sort
+        if subscription.revalidating:
+            if count > 0:
+                self._apply_revalidated_entries(subscription)
+                return
+            # An empty reply does not replace the cached papers on screen
+            subscription.revalidating = False
+            if current:
+                self.statusbar.set_message(
+                    "No papers returned, showing the cached ones.", 3000
+                )
+            return
 
-        reverse = not self.sort_order_ascending
+        if count == 0:
+            if current:
+                self.statusbar.clear_message()
+                QMessageBox.warning(
+                    self,
+                    "No Papers Found",
+                    "No papers were found with the given keywords/subjects.",
+                )
+            return
 
-        if sort_by == self.SortBy.DATE:
-            sorted_entries = sorted(
-                self.entries, key=lambda e: e.published_parsed, reverse=reverse
-            )
+        subscription.result = fetched
+        if current:
+            self.statusbar.set_message("Papers loaded successfully.", 3000)
+
+    def _merge_new_entries(self, subscription: Subscription):
+        """Add the papers published since the watermark to the known ones."""
+        mark = subscription.watermark
+        subscription.watermark = None
+        subscription.revalidating = False
+        current = subscription is self.current_subscription
+
+        known_ids = {entry.arxiv_id for entry in subscription.result}
+        new_entries = [
+            entry
+            for entry in subscription.fetched
+            if mark.is_new(entry) and entry.arxiv_id not in known_ids
+        ]
+        if not new_entries:
+            if current:
+                self.statusbar.set_message("No new papers.", 3000)
+            return
 
-        elif sort_by == self.SortBy.TITLE:
-            sorted_entries = sorted(
-                self.entries, key=lambda e: e.title.lower(), reverse=reverse
+        subscription.result = (new_entries + subscription.result)[
+            : subscription.max_results
+        ]
+        if self.config.cache.enabled:
+            self.result_cache.put(
+                subscription.query, subscription.max_results, subscription.result
             )
+        self.watermarks.update(subscription.query, new_entries)
+        self.database.record_history(
+            subscription.query, [entry.arxiv_id for entry in new_entries]
+        )
 
-        elif sort_by == self.SortBy.AUTHOR:
-            sorted_entries = sorted(
-                self.entries,
-                key=lambda e: e.authors[0]["name"].lower(),
-                reverse=reverse,
-            )
-        else:
+        if current:
+            self.mergePapers(subscription.result, new=True)
+            self.statusbar.set_papers_count(self.numPapers)
+            self.statusbar.set_message(f"{len(new_entries)} new papers.", 3000)
+
+    def _apply_revalidated_entries(self, subscription: Subscription):
+        """Redraw the displayed papers only if the revalidated result differs."""
+        subscription.revalidating = False
+        entries = subscription.fetched
+        current = subscription is self.current_subscription
+
+        # Entries are canonical, a paper updated to a newer version is the
+        # same object and is reported by the registry
+        old = [id(entry) for entry in subscription.result]
+        if old == [id(entry) for entry in entries] and not (
+            current and self._updated_entries
+        ):
+            if current:
+                self.statusbar.set_message("Papers are up to date.", 3000)
             return
 
+        subscription.result = entries
+        if current:
+            self.mergePapers(entries)
+            self.statusbar.set_papers_count(self.numPapers)
+            self.statusbar.set_message("Papers updated.", 3000)
+
+    def on_fetch_failed(
+        self, subscription: Subscription, error: str, retry_after: float
+    ):
+        # Failures only affect this subscription, it is retried with backoff
+        self.poller.report_failure(subscription, retry_after)
+
+        if subscription is self.current_subscription:
+            self.statusbar.stop_progress()
+            self.statusbar.set_message(f"Error: {error}", 5000)
+
+    def _update_poll_status(self):
+        self.statusbar.set_poll_status(
+            self.poller.last_latency,
+            self.poller.error_count(),
+            self.poller.open_circuits(),
+        )
+
+    def on_fetch_cancelled(self, subscription: Subscription):
+        if subscription is self.current_subscription:
+            self.statusbar.stop_progress()
+            self.statusbar.set_message(
+                f"Loading stopped at {self.numPapers} papers.", 3000
+            )
+
+    def on_entry_clicked(self, entry: Entry):
+        self.database.mark_read(entry.arxiv_id)
+        self._entry_return_widget = self.stacked_widget.currentWidget()
+        self.side_panel.setVisible(False)
+        self.stacked_widget.setCurrentWidget(self.entry_info_widget)
+        self.entry_info_widget.setEntryInfo(
+            entry, self.bookmark_manager.is_bookmarked(entry)
+        )
+        self._show_entry_collection()
+
+    def sort_entries_by(self, sort_by: SortBy):
+        """Sort the displayed papers by another field, keeping the order."""
+        self.sort_by = sort_by
+        self._apply_sort()
+
+    def set_sort_order(self, ascending: bool):
+        self.sort_order_ascending = ascending
+        self._apply_sort()
+
+    def _apply_sort(self):
         self.statusbar.set_sort_indicator(
-            sort_by.name, "Ascending" if self.sort_order_ascending else "Descending"
+            self.sort_by.name,
+            "Ascending" if self.sort_order_ascending else "Descending",
         )
+        if self.entries is None:
+            return
 
-        self.showPapers(sorted_entries, True)
+        self.entries = self._sorted_entries()
+        self.paper_list.reorder(self.entries)
 
     def back_to_main_view(self):
-        self.stacked_widget.setCurrentWidget(self.scroll_area)
+        # Bookmark changes made meanwhile are already shown, as they happened
+        self.stacked_widget.setCurrentWidget(self.feed_widget)
+        self.side_panel.setVisible(self.config.ui.side_panel.visible)
+
+    def _back_from_entry(self):
+        # Back to the feed or to the bookmarks, whichever listed the paper
+        self.stacked_widget.setCurrentWidget(self._entry_return_widget)
         self.side_panel.setVisible(self.config.ui.side_panel.visible)
-        self.refresh_bookmark_status_in_entries()
 
     def refresh_bookmark_status_in_entries(self):
         """Refresh the bookmark status of the entry cards"""
-        for i in range(2, self.scroll_layout.count()):
-            widget = self.scroll_layout.itemAt(i).widget()
-            if isinstance(widget, EntryCard):
-                widget.setBookmarked(self.bookmark_manager.is_bookmarked(widget.entry))
+        self.paper_list.refresh_bookmarks()
+
+    def _on_bookmarks_changed(self, added: Set[str], removed: Set[str]):
+        # Only the cards of the papers concerned are updated
+        self.paper_list.refresh_bookmarks(added | removed)
+        entry = self.entry_info_widget.entry
+        if entry is not None and entry.arxiv_id in added | removed:
+            self._show_entry_collection()
+
+    def _on_collection_changed(self, name: str):
+        if name in self.bookmark_manager.collections():
+            self.side_panel.set_collection_count(
+                name, self.bookmark_manager.count(name)
+            )
+        else:
+            self.side_panel.remove_collection(name)
+        if self.entry_info_widget.entry is not None:
+            self._show_entry_collection()
+
+    def _show_entry_collection(self):
+        self.entry_info_widget.setCollection(
+            self.bookmark_manager.collections(),
+            self.bookmark_manager.collection_of(self.entry_info_widget.entry),
+        )
+
+    def _new_bookmark_collection(self):
+        name, ok = QInputDialog.getText(self, "New Collection", "Name:")
+        name = name.strip()
+        if ok and name:
+            self.bookmark_manager.create_collection(name)
+
+    def _delete_bookmark_collection(self):
+        names = self.bookmark_manager.collections()[1:]  # not the default one
+        if not names:
+            self.statusbar.set_message("No collections to delete.", 3000)
+            return
+        name, ok = QInputDialog.getItem(
+            self,
+            "Delete Collection",
+            "Its bookmarks go back to the default collection.",
+            names,
+            editable=False,
+        )
+        if ok:
+            self.bookmark_manager.delete_collection(name)
 
     def bookmark_entry(self, entry: Entry):
         if not self.bookmark_manager.is_bookmarked(entry):
@@ -415,39 +895,88 @@ class PaperWatchApp(QMainWindow):
         else:
             self.bookmark_manager.remove(entry.id)
 
-    def _clear_scroll_layout(self):
-        """ """
-        for i in reversed(range(1, self.scroll_layout.count())):
-            widget_to_remove = self.scroll_layout.takeAt(i).widget()
-            if widget_to_remove is not None:
-                widget_to_remove.deleteLater()
-                self.scroll_layout.removeWidget(widget_to_remove)
+    def export_bookmarks_bibtex(self):
+        """Write the BibTeX records of all bookmarks to a file."""
+        if self._bibtex_export is not None:
+            self.statusbar.set_message("A BibTeX export is already running.", 3000)
+            return
 
-    def _show_bookmarks(self):
-        """
-        Display bookmarks in the UI.
-        """
+        entries = self.bookmark_manager.list_all()
+        if not entries:
+            self.statusbar.set_message("No bookmarks to export.", 3000)
+            return
 
-        self.stacked_widget.setCurrentWidget(self.bookmark_widget)
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Bookmarks", "bookmarks.bib", "BibTeX (*.bib)"
+        )
+        if not path:
+            return
 
-        bookmarks = self.bookmark_manager.list_all()
+        batch = self.doi2bib.resolve(entry.doi for entry in entries)
+        self._bibtex_export = (batch, path, entries)
+        self.statusbar.start_progress(len(entries))
+        self.statusbar.set_message("Fetching BibTeX records...", 0)
 
-        # TODO: Bookmark show
+    def _on_bibtex_export_progress(self, batch: int, done: int, total: int):
+        if self._bibtex_export is None or self._bibtex_export[0] != batch:
+            return
+        self.statusbar.start_progress(total)
+        self.statusbar.update_progress(done)
+
+    def _on_bibtex_export_finished(self, batch: int, result: BibtexBatchResult):
+        if self._bibtex_export is None or self._bibtex_export[0] != batch:
+            return
+
+        _, path, entries = self._bibtex_export
+        self._bibtex_export = None
+        self.statusbar.stop_progress()
+
+        # Papers doi.org has no record for are exported from their arXiv data
+        records = [
+            result.records.get(entry.doi) or entry.to_bibtex() for entry in entries
+        ]
+        try:
+            Path(path).write_text("\n".join(records), encoding="utf-8")
+        except OSError as e:
+            self.statusbar.set_message(f"Error: could not write {path}: {e}", 5000)
+            return
+
+        message = f"Exported {len(entries)} bookmarks."
+        if result.errors:
+            message += f" {len(result.errors)} were built from arXiv data."
+        self.statusbar.set_message(message, 5000)
+
+    def _show_bookmarks(self, collection: Optional[str] = None):
+        """Show the bookmarks of a collection, of all if None."""
+        self.stacked_widget.setCurrentWidget(self.bookmark_browser)
+        self.bookmark_browser.show_collection(collection)
 
     def show_config_editor(self):
         self.editor = ConfigEditorWidget(self.config)
+        self.editor.configChanged.connect(self.theme.apply)
+        # Cards are laid out from the CardConfig, which the editor changes
+        if isinstance(self.paper_list, PaperListView):
+            self.editor.configChanged.connect(self.paper_list.delegate.config_changed)
+        self.editor.configChanged.connect(
+            self.bookmark_browser.list_view.delegate.config_changed
+        )
         self.editor.show()
 
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # The theme follows the palette, e.g. a switch to dark mode
+        if event.type() == QEvent.Type.PaletteChange:
+            self.theme.apply()
+
+    def _index_entries(self):
+        if not self.entry_store.index_pending(self.INDEX_CHUNK):
+            self._index_timer.stop()
+
     def _filter_entries(self, text: str):
-        """Filter entries based on search text."""
-        for i in range(1, self.scroll_layout.count() - 1):
-            widget = self.scroll_layout.itemAt(i).widget()
-            if isinstance(widget, EntryCard):
-                entry: Entry = widget.entry
-                if (
-                    text.lower() in entry.title.lower()
-                    or text.lower() in entry.authors.lower()
-                ):
-                    widget.setVisible(True)
-                else:
-                    widget.setVisible(False)
+        """Show only the entries matching the search query `text`."""
+        self.entry_store.set_text(text)
+        store = self.entry_store
+        visible = None
+        if text:
+            visible = {id(store.entries[row]) for row in store.rows((TEXT,))}
+        self.paper_list.set_visible(visible)
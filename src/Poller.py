@@ -0,0 +1,133 @@
+# Background polling of subscriptions. Every subscription is fetched again after
+# its poll interval. Failed fetches are retried with jittered exponential backoff
+# and a subscription that keeps failing has its circuit opened, i.e. it is left
+# alone for a cooldown period so it cannot keep the request queue busy.
+
+import random
+import time
+from typing import Dict
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from Config import PollingConfig
+from Subscription import Subscription
+
+
+class PollState:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_due = time.monotonic() + interval
+        self.failures = 0  # consecutive failures
+        self.errors = 0  # failures since startup
+        self.open_until: float = None  # circuit is open until then
+        self.last_latency: float = None
+
+    @property
+    def circuit_open(self) -> bool:
+        return self.open_until is not None
+
+
+class Poller(QObject):
+    pollDue = pyqtSignal(object)  # Subscription that should be fetched now
+    statusChanged = pyqtSignal()  # latency or error counts changed
+
+    # Upper bound for a single timer wait, so a suspended machine catches up
+    MAX_WAIT = 60.0
+
+    def __init__(self, config: PollingConfig, parent=None):
+        super().__init__(parent)
+        self.config = config
+        self._states: Dict[Subscription, PollState] = {}
+        self.last_latency: float = None
+        self._started = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._tick)
+
+    def add(self, subscription: Subscription, interval: float = None):
+        self._states[subscription] = PollState(interval or self.config.interval)
+
+    def start(self):
+        self._started = True
+        self._schedule()
+
+    def stop(self):
+        self._started = False
+        self._timer.stop()
+
+    def state(self, subscription: Subscription) -> PollState:
+        return self._states.get(subscription)
+
+    def error_count(self) -> int:
+        return sum(state.errors for state in self._states.values())
+
+    def open_circuits(self) -> int:
+        return sum(state.circuit_open for state in self._states.values())
+
+    def report_success(self, subscription: Subscription, latency: float):
+        """A fetch of the subscription, polled or not, succeeded."""
+        state = self._states.get(subscription)
+        if state is None:
+            return
+
+        state.failures = 0
+        state.open_until = None
+        state.last_latency = latency
+        state.next_due = time.monotonic() + self._jittered(state.interval, 0.1)
+        self.last_latency = latency
+
+        self._schedule()
+        self.statusChanged.emit()
+
+    def report_failure(self, subscription: Subscription, retry_after: float = 0):
+        """
+        A fetch of the subscription failed. It is retried after an exponential
+        backoff, or after `retry_after` seconds if the server asked for longer.
+        """
+        state = self._states.get(subscription)
+        if state is None:
+            return
+
+        now = time.monotonic()
+        state.failures += 1
+        state.errors += 1
+
+        if state.failures >= self.config.failure_threshold:
+            # Open the circuit. After the cooldown one trial fetch is let
+            # through; if that fails too the circuit opens again.
+            state.open_until = now + self.config.breaker_cooldown
+            state.next_due = state.open_until
+        else:
+            backoff = min(
+                self.config.backoff_max,
+                self.config.backoff_base * 2 ** (state.failures - 1),
+            )
+            state.next_due = now + max(retry_after, self._jittered(backoff, 0.5))
+
+        self._schedule()
+        self.statusChanged.emit()
+
+    def _jittered(self, seconds: float, spread: float) -> float:
+        """Randomize a delay by ±spread, so polls of many queries do not align."""
+        return seconds * random.uniform(1 - spread, 1 + spread)
+
+    def _tick(self):
+        now = time.monotonic()
+        for subscription, state in self._states.items():
+            if state.next_due > now:
+                continue
+
+            # Until the fetch reports back, do not poll this one again. A poll
+            # while a fetch is running joins that fetch, which reports back.
+            state.next_due = now + state.interval
+            self.pollDue.emit(subscription)
+
+        self._schedule()
+
+    def _schedule(self):
+        if not self.config.enabled or not self._states or not self._started:
+            return
+
+        next_due = min(state.next_due for state in self._states.values())
+        wait = min(max(0.0, next_due - time.monotonic()), self.MAX_WAIT)
+        self._timer.start(int(wait * 1000))
@@ -0,0 +1,107 @@
+# Central scheduler for HTTP requests to the arXiv API. Every fetch goes through
+# one QNetworkAccessManager, at most `max_concurrent` requests are in flight and
+# consecutive requests are started at least `delay` seconds apart, as arXiv asks
+# of API clients, however many queries are being fetched.
+
+import time
+from collections import deque
+from itertools import count
+from typing import Callable, Dict, Optional
+
+from PyQt6.QtCore import QObject, QTimer, QUrl
+from PyQt6.QtNetwork import QNetworkAccessManager, QNetworkReply, QNetworkRequest
+
+
+class RequestScheduler(QObject):
+    def __init__(
+        self,
+        max_concurrent: int = 2,
+        delay: float = 3.0,
+        timeout: float = 60.0,
+        nam: QNetworkAccessManager = None,
+        parent=None,
+    ):
+        super().__init__(parent)
+        # Schedulers for different hosts can share one QNetworkAccessManager
+        self.nam = nam or QNetworkAccessManager(self)
+        self.max_concurrent = max(1, max_concurrent)
+        self.delay = delay
+        # A stalled request must not hold on to one of the few request slots
+        self.timeout = timeout
+
+        self._tickets = count(1)
+        self._pending = deque()  # (ticket, url, callback, headers, follow_redirects)
+        self._running: Dict[QNetworkReply, tuple] = {}  # reply -> (ticket, callback)
+        self._last_start = float("-inf")
+
+        self._dispatch_timer = QTimer(self)
+        self._dispatch_timer.setSingleShot(True)
+        self._dispatch_timer.timeout.connect(self._dispatch)
+
+    def get(
+        self,
+        url: str,
+        callback: Callable[[QNetworkReply], None],
+        headers: Optional[Dict[bytes, bytes]] = None,
+        follow_redirects: bool = True,
+    ) -> int:
+        """
+        Queue a GET request. `callback` is called with the finished reply, which
+        is deleted afterwards. Returns a ticket that can be passed to cancel().
+        Without `follow_redirects` a redirect is handed to `callback` as is.
+        """
+        ticket = next(self._tickets)
+        self._pending.append((ticket, url, callback, headers, follow_redirects))
+        self._dispatch()
+        return ticket
+
+    def cancel(self, ticket: int):
+        """Drop a queued request or abort a running one. Its callback is not called."""
+        for item in self._pending:
+            if item[0] == ticket:
+                self._pending.remove(item)
+                return
+
+        for reply, (running_ticket, _) in list(self._running.items()):
+            if running_ticket == ticket:
+                del self._running[reply]
+                reply.abort()
+                self._dispatch()
+                return
+
+    def pending_count(self) -> int:
+        return len(self._pending) + len(self._running)
+
+    def _dispatch(self):
+        while self._pending and len(self._running) < self.max_concurrent:
+            wait = self._last_start + self.delay - time.monotonic()
+            if wait > 0:
+                if not self._dispatch_timer.isActive():
+                    self._dispatch_timer.start(int(wait * 1000) + 1)
+                return
+
+            ticket, url, callback, headers, follow_redirects = self._pending.popleft()
+            request = QNetworkRequest(QUrl(url))
+            for name, value in (headers or {}).items():
+                request.setRawHeader(name, value)
+            policy = (
+                QNetworkRequest.RedirectPolicy.NoLessSafeRedirectPolicy
+                if follow_redirects
+                else QNetworkRequest.RedirectPolicy.ManualRedirectPolicy
+            )
+            request.setAttribute(
+                QNetworkRequest.Attribute.RedirectPolicyAttribute, policy
+            )
+            request.setTransferTimeout(int(self.timeout * 1000))
+            reply = self.nam.get(request)
+            reply.finished.connect(lambda reply=reply: self._on_finished(reply))
+            self._running[reply] = (ticket, callback)
+            self._last_start = time.monotonic()
+
+    def _on_finished(self, reply: QNetworkReply):
+        reply.deleteLater()
+        item = self._running.pop(reply, None)
+        if item is not None:
+            _, callback = item
+            callback(reply)
+        self._dispatch()
@@ -0,0 +1,123 @@
+# On-disk cache of parsed arXiv results. Each query is stored as one zlib
+# compressed JSON file holding the Entry dicts, so a start with a warm cache can
+# show papers without touching the network. Stale results are still served, the
+# caller is expected to revalidate them in the background.
+
+import hashlib
+import json
+import os
+import re
+import time
+import urllib.parse
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from Entry import Entry
+from EntryRegistry import registry
+
+# 2: boolean operators are no longer lowercased in the query of a result
+CACHE_FORMAT_VERSION = 2
+
+# arXiv only takes the boolean operators of a query in upper case
+_OPERATORS = re.compile(r"\b(ANDNOT|AND|OR)\b")
+
+
+@dataclass
+class CachedResult:
+    entries: List[Entry]
+    fetched_at: float
+    fresh: bool
+
+
+class ResultCache:
+    SUFFIX = ".pwcache"
+
+    def __init__(self, cache_dir: Path, ttl: float = 3600, max_bytes: int = 50_000_000):
+        self._dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize a query so that equivalent spellings share a cache entry."""
+        query = " ".join(urllib.parse.unquote_plus(query).split())
+        # Search terms are matched regardless of case, operators are not
+        parts = _OPERATORS.split(query)
+        parts[::2] = [part.lower() for part in parts[::2]]
+        return "".join(parts)
+
+    def _path(self, query: str, max_results: int) -> Path:
+        key = f"{self.normalize_query(query)}\n{max_results}"
+        return self._dir / (hashlib.sha1(key.encode()).hexdigest() + self.SUFFIX)
+
+    def get(self, query: str, max_results: int) -> Optional[CachedResult]:
+        """Return the cached result of a query, or None if there is none."""
+        path = self._path(query, max_results)
+        try:
+            raw = json.loads(zlib.decompress(path.read_bytes()))
+            if raw.get("version") != CACHE_FORMAT_VERSION:
+                return None
+            entries = registry.resolve_all(
+                Entry.from_dict(item) for item in raw["entries"]
+            )
+        except FileNotFoundError:
+            return None
+        except Exception:
+            # Unreadable cache files are dropped, the query is simply refetched
+            path.unlink(missing_ok=True)
+            return None
+
+        # Reading counts as a use for the least-recently-used eviction
+        os.utime(path)
+
+        fetched_at = raw.get("fetched_at", 0)
+        return CachedResult(
+            entries=entries,
+            fetched_at=fetched_at,
+            fresh=time.time() - fetched_at < self.ttl,
+        )
+
+    def put(self, query: str, max_results: int, entries: List[Entry]):
+        """Store the result of a query, replacing any previous one."""
+        self._dir.mkdir(parents=True, exist_ok=True)
+
+        raw = {
+            "version": CACHE_FORMAT_VERSION,
+            "query": self.normalize_query(query),
+            "max_results": max_results,
+            "fetched_at": time.time(),
+            "entries": [entry.to_dict() for entry in entries],
+        }
+        self._write(self._path(query, max_results), raw)
+        self._evict()
+
+    def clear(self):
+        for path in self._dir.glob("*" + self.SUFFIX):
+            path.unlink(missing_ok=True)
+
+    def _write(self, path: Path, raw: dict):
+        data = zlib.compress(json.dumps(raw, separators=(",", ":")).encode(), 6)
+
+        # Write to a temporary file first so a crash never leaves half a file
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+    def _evict(self):
+        """Remove least recently used results until the cache fits `max_bytes`."""
+        files = []
+        for path in self._dir.glob("*" + self.SUFFIX):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
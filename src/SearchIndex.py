@@ -0,0 +1,101 @@
+# Inverted index for the search bar. Titles, author names, categories and, if
+# enabled, abstracts are split into casefolded word tokens, and every token maps
+# to the rows that contain it. A query is a list of terms that must all match.
+# A term matches every token it is a prefix of, so results show up while a word
+# is being typed. Qualifiers restrict a term to one field: `ti:` titles, `au:`
+# authors, `cat:` categories (a whole category like cs.CV, or a prefix of it)
+# and `abs:` abstracts.
+
+import bisect
+import re
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple
+
+from Entry import Entry
+
+TITLE = "ti"
+AUTHORS = "au"
+CATEGORIES = "cat"
+ABSTRACT = "abs"
+FIELDS = (TITLE, AUTHORS, CATEGORIES, ABSTRACT)
+
+TOKEN = re.compile(r"\w+")
+
+# A parsed query: per term, the fields it may match and its tokens
+Query = List[Tuple[Tuple[str, ...], List[str]]]
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN.findall(text.casefold())
+
+
+class SearchIndex:
+    def __init__(self, abstracts: bool = False):
+        self.abstracts = abstracts
+        self.size = 0  # rows indexed, the first `size` rows of the store
+        # Field -> token -> rows containing it, ascending
+        self._postings: Dict[str, Dict[str, array]] = {f: {} for f in FIELDS}
+        # Field -> its tokens, sorted, for prefix lookups. None when outdated.
+        self._vocabulary: Dict[str, List[str]] = {f: None for f in FIELDS}
+
+    def add(self, entries: Iterable[Entry]):
+        """Index entries as the next rows."""
+        row = self.size
+        for row, entry in enumerate(entries, self.size):
+            self._add(TITLE, row, tokenize(entry.title))
+            self._add(AUTHORS, row, tokenize(entry.authors))
+            self._add(CATEGORIES, row, [tag.casefold() for tag in entry.tags])
+            if self.abstracts:
+                self._add(ABSTRACT, row, tokenize(entry.abstract))
+            self.size = row + 1
+
+    def _add(self, field: str, row: int, tokens: List[str]):
+        postings = self._postings[field]
+        for token in set(tokens):
+            rows = postings.get(token)
+            if rows is None:
+                postings[token] = array("i", (row,))
+                self._vocabulary[field] = None
+            else:
+                rows.append(row)
+
+    def parse(self, text: str) -> Query:
+        """Split a query into terms, see the module comment for the syntax."""
+        unqualified = (TITLE, AUTHORS, ABSTRACT) if self.abstracts else (TITLE, AUTHORS)
+        query = []
+        for term in text.split():
+            field, colon, rest = term.partition(":")
+            field = field.casefold()
+            if colon and field in FIELDS and rest:
+                if field == CATEGORIES:
+                    query.append(((CATEGORIES,), [rest.casefold()]))
+                else:
+                    query.append(((field,), tokenize(rest)))
+            else:
+                query.append((unqualified, tokenize(term)))
+        # Terms without any word character match everything
+        return [(fields, tokens) for fields, tokens in query if tokens]
+
+    def search(self, text: str) -> Set[int]:
+        """Rows matching all terms of the query `text`."""
+        result = None
+        for fields, tokens in self.parse(text):
+            for token in tokens:
+                rows = set()
+                for field in fields:
+                    postings = self._postings[field]
+                    for match in self._expand(field, token):
+                        rows.update(postings[match])
+                result = rows if result is None else result & rows
+                if not result:
+                    return set()
+        return set(range(self.size)) if result is None else result
+
+    def _expand(self, field: str, prefix: str) -> List[str]:
+        """Tokens of `field` starting with `prefix`."""
+        vocabulary = self._vocabulary[field]
+        if vocabulary is None:
+            vocabulary = self._vocabulary[field] = sorted(self._postings[field])
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + "\U0010ffff", start)
+        return vocabulary[start:end]
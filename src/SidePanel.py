@@ -1,4 +1,5 @@
-# PyQt6 Code for side panel that lists the pages user has subscribed
+# PyQt6 Code for side panel that lists the pages user has subscribed and the
+# bookmark collections with the number of bookmarks in each
 
 from PyQt6.QtWidgets import (
     QWidget,
@@ -8,10 +9,15 @@ from PyQt6.QtWidgets import (
     QLabel,
     QFrame,
 )
-from PyQt6.QtCore import Qt
+from typing import Dict
+
+from PyQt6.QtCore import Qt, pyqtSignal
 
 
 class SidePanel(QWidget):
+    pageSelected = pyqtSignal(str)  # Signal emitted with the name of the selected page
+    collectionSelected = pyqtSignal(str)  # Emitted with the name of a collection
+
     def __init__(self, parent=None):
         super(SidePanel, self).__init__(parent)
 
@@ -22,6 +28,14 @@ class SidePanel(QWidget):
         # List widget to display subscribed pages
         self.page_list = QListWidget()
         self.layout.addWidget(self.page_list)
+        self.page_list.currentItemChanged.connect(self._on_current_item_changed)
+
+        # Bookmark collections, an item per collection updated in place
+        self.layout.addWidget(QLabel("Bookmarks"))
+        self.collection_list = QListWidget()
+        self.layout.addWidget(self.collection_list)
+        self.collection_list.itemClicked.connect(self._on_collection_clicked)
+        self._collection_items: Dict[str, QListWidgetItem] = {}
 
         self.setContentsMargins(0, 0, 0, 0)
 
@@ -40,3 +54,33 @@ class SidePanel(QWidget):
     def clear_pages(self):
         """Clear all subscribed pages."""
         self.page_list.clear()
+
+    def select_page(self, page_name):
+        """Make a page the current one without emitting pageSelected."""
+        items = self.page_list.findItems(page_name, Qt.MatchFlag.MatchExactly)
+        if items:
+            self.page_list.blockSignals(True)
+            self.page_list.setCurrentItem(items[0])
+            self.page_list.blockSignals(False)
+
+    def _on_current_item_changed(self, current, previous):
+        if current is not None:
+            self.pageSelected.emit(current.text())
+
+    def set_collection_count(self, name: str, count: int):
+        """Show a collection with its number of bookmarks, adding it if new."""
+        item = self._collection_items.get(name)
+        if item is None:
+            item = QListWidgetItem()
+            item.setData(Qt.ItemDataRole.UserRole, name)
+            self.collection_list.addItem(item)
+            self._collection_items[name] = item
+        item.setText(f"{name} ({count})")
+
+    def remove_collection(self, name: str):
+        item = self._collection_items.pop(name, None)
+        if item is not None:
+            self.collection_list.takeItem(self.collection_list.row(item))
+
+    def _on_collection_clicked(self, item):
+        self.collectionSelected.emit(item.data(Qt.ItemDataRole.UserRole))
@@ -0,0 +1,90 @@
+# Sorted views of the displayed entries. For every SortBy field the index keeps
+# the permutation of the entries in ascending order. A page of arriving entries
+# is inserted into each permutation by binary search, so the permutations stay
+# current without re-sorting, and switching field or order only reads one of
+# them in O(n) (descending is the ascending permutation read backwards).
+
+import bisect
+import enum
+from typing import Callable, Dict, Iterable, List
+
+from Entry import Entry
+
+
+class SortBy(enum.Enum):
+    DATE = 1
+    TITLE = 2
+    AUTHOR = 3
+
+
+# Normalized keys are precomputed by Entry. Ties are broken by arrival order.
+SORT_KEYS: Dict[SortBy, Callable[[Entry], object]] = {
+    SortBy.DATE: lambda entry: entry.published_timestamp,
+    SortBy.TITLE: lambda entry: entry.title_key,
+    SortBy.AUTHOR: lambda entry: entry.author_key,
+}
+
+
+class SortIndex:
+    def __init__(self):
+        self.entries: List[Entry] = []  # in arrival order
+        self._orders: Dict[SortBy, List[int]] = {sort_by: [] for sort_by in SortBy}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self):
+        self.entries = []
+        self._orders = {sort_by: [] for sort_by in SortBy}
+
+    def add(self, entries: Iterable[Entry]):
+        """Add entries, inserting them into the order of every field."""
+        start = len(self.entries)
+        self.entries.extend(entries)
+        new = range(start, len(self.entries))
+        if not new:
+            return
+
+        for sort_by, order in self._orders.items():
+            key = self._index_key(sort_by)
+            if len(new) * 8 > len(order):
+                # Many new entries, sorting everything is cheaper
+                self._orders[sort_by] = sorted(range(len(self.entries)), key=key)
+            else:
+                for i in new:
+                    bisect.insort(order, i, key=key)
+
+    def insert_front(self, entries: Iterable[Entry]):
+        """
+        Add entries that come before the known ones in arrival order, like
+        papers published since the last fetch. Rebuilds the index.
+        """
+        entries = list(entries) + self.entries
+        self.clear()
+        self.add(entries)
+
+    def remove(self, entries: Iterable[Entry]):
+        """Remove entries, keeping the order of the others without sorting."""
+        removed = {id(entry) for entry in entries}
+        keep = [i for i, entry in enumerate(self.entries) if id(entry) not in removed]
+        if len(keep) == len(self.entries):
+            return
+
+        new_index = [-1] * len(self.entries)
+        for new, old in enumerate(keep):
+            new_index[old] = new
+        self.entries = [self.entries[i] for i in keep]
+        for sort_by, order in self._orders.items():
+            self._orders[sort_by] = [new_index[i] for i in order if new_index[i] >= 0]
+
+    def sorted(self, sort_by: SortBy, ascending: bool) -> List[Entry]:
+        order = self._orders[sort_by]
+        if not ascending:
+            order = reversed(order)
+        entries = self.entries
+        return [entries[i] for i in order]
+
+    def _index_key(self, sort_by: SortBy) -> Callable[[int], tuple]:
+        entry_key = SORT_KEYS[sort_by]
+        entries = self.entries
+        return lambda i: (entry_key(entries[i]), i)
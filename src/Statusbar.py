@@ -19,6 +19,10 @@ class Statusbar(QStatusBar):
         self.progress_bar.setVisible(False)
         self.addPermanentWidget(self.progress_bar)
 
+        self.render_label = QLabel("")
+        self.render_label.setVisible(False)
+        self.addPermanentWidget(self.render_label)
+
         self.keywords_label = QLabel("")
         self.addPermanentWidget(self.keywords_label)
 
@@ -31,6 +35,9 @@ class Statusbar(QStatusBar):
         self.sort_label = QLabel("")
         self.addPermanentWidget(self.sort_label)
 
+        self.poll_label = QLabel("")
+        self.addPermanentWidget(self.poll_label)
+
     def set_message(self, message: str, timeout: int = 5000):
         """Set a message in the status bar with an optional timeout."""
         self.showMessage(message, timeout)
@@ -53,6 +60,11 @@ class Statusbar(QStatusBar):
         """Stop and hide the progress bar."""
         self.progress_bar.setVisible(False)
 
+    def set_render_progress(self, built: int, total: int):
+        """Display how many of the paper cards are built, hidden once all are."""
+        self.render_label.setText(f"Showing papers: {built}/{total}")
+        self.render_label.setVisible(built < total)
+
     def set_keywords(self, keywords: List[str]):
         """Display the current keywords being monitored."""
         self.keywords_label.setText("Keywords: " + ", ".join(keywords))
@@ -69,3 +81,11 @@ class Statusbar(QStatusBar):
     def set_sort_indicator(self, sort_by: str, sort_order: str):
         """Display the current sorting method and order."""
         self.sort_label.setText(f"Sorted by: {sort_by} ({sort_order})")
+
+    def set_poll_status(self, latency: float, errors: int, paused: int = 0):
+        """Display the latency of the last poll and the number of failed polls."""
+        text = "Last poll: -" if latency is None else f"Last poll: {latency * 1000:.0f} ms"
+        text += f", errors: {errors}"
+        if paused:
+            text += f", paused: {paused}"
+        self.poll_label.setText(text)
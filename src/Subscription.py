@@ -0,0 +1,105 @@
+# A subscription is a named arXiv query the user monitors, listed in the side
+# panel. It keeps the latest result of its query in memory so switching between
+# subscriptions does not need another request, plus the state of a running fetch.
+
+import time
+from typing import List, Optional
+
+from Entry import Entry
+from WatermarkStore import Watermark
+
+
+def build_query(keywords: Optional[List[str]], subjects: Optional[List[str]]) -> str:
+    """
+    Build the arXiv search_query for title keywords and subjects, e.g.
+    ti:CNN+AND+ti:vision+AND+(cs.CV+OR+cs.LG).
+    """
+    # Start with keywords (default to title search)
+    query = ""
+    if keywords:
+        query = "+AND+".join(f"ti:{k}" for k in keywords)
+
+    # Build subject filter
+    if subjects:
+        # Join the selected subjects
+        subject_filter = "+OR+".join(subjects)
+        if query:
+            query += f"+AND+({subject_filter})"
+        else:
+            query = f"({subject_filter})"
+    # else: no subjects specified → do nothing, search across all subjects
+
+    return query
+
+
+def subscriptions_from_config(config) -> List["Subscription"]:
+    """
+    Subscriptions of an AppConfig. Without any, the arxiv keywords and
+    subjects form a single default subscription.
+    """
+    arxiv = config.arxiv
+    if config.subscriptions:
+        return [
+            Subscription(
+                sub.name,
+                sub.keywords,
+                sub.subjects,
+                sub.max_results or arxiv.max_results,
+                sub.poll_interval,
+            )
+            for sub in config.subscriptions
+        ]
+
+    subscription = Subscription(
+        "Default", arxiv.keywords, arxiv.subjects, arxiv.max_results
+    )
+    return [subscription] if subscription.query else []
+
+
+class Subscription:
+    def __init__(
+        self,
+        name: str,
+        keywords: Optional[List[str]],
+        subjects: Optional[List[str]],
+        max_results: int,
+        poll_interval: int = None,
+    ):
+        self.name = name
+        self.keywords: List[str] = keywords or []
+        self.subjects: List[str] = subjects or []
+        self.max_results = max_results
+        self.poll_interval = poll_interval
+        self.query = build_query(self.keywords, self.subjects)
+
+        # Latest complete, unfiltered result of the query. None until the query
+        # was fetched once or found in the result cache.
+        self.result: List[Entry] = None
+
+        # State of the running fetch
+        self.fetched: List[Entry] = []
+        self.revalidating = False  # fetching while `result` is available
+        self.watermark: Watermark = None  # set when only new papers are fetched
+        self.first_page_pending = False
+        self.progress = (0, 0)  # (fetched, expected total)
+        self.fetch_started: float = None  # time.monotonic() of the fetch start
+
+    def __repr__(self) -> str:
+        return f"Subscription(name={self.name}, query={self.query})"
+
+    def accepts(self, entry: Entry, doi_only: bool = False) -> bool:
+        """
+        Whether an entry belongs to one of the subjects of the subscription,
+        and has a DOI if `doi_only` is set.
+        """
+        if doi_only and entry.doi == "":
+            return False
+        return not self.subjects or entry.primary_category in self.subjects
+
+    def start_fetch(self, watermark: Watermark = None):
+        """Reset the fetch state before a new fetch of the query."""
+        self.fetched = []
+        self.fetch_started = time.monotonic()
+        self.revalidating = self.result is not None
+        self.watermark = watermark if self.revalidating else None
+        self.first_page_pending = True
@@ -0,0 +1,110 @@
+# The look of the paper cards and the paper details, as one stylesheet for the
+# whole application instead of a stylesheet per widget. Widgets take part by
+# their object name. States like a bookmarked paper are dynamic properties the
+# stylesheet selects on, so changing one restyles a single widget without
+# parsing a stylesheet. The stylesheet is built from the palette and the
+# CardConfig, and built again only when one of them changed.
+
+from typing import Optional, Tuple
+
+from PyQt6.QtGui import QPalette
+from PyQt6.QtWidgets import QApplication, QWidget
+from Config import CardConfig
+
+# Object names
+CARD = "card"
+NEW_BADGE = "newBadge"
+CARD_TITLE = "cardTitle"
+CARD_AUTHORS = "cardAuthors"
+CARD_META = "cardMeta"
+TAG = "tag"
+BOOKMARK_BUTTON = "bookmarkButton"
+ABSTRACT = "abstract"
+
+# Dynamic properties
+BOOKMARKED = "bookmarked"
+
+
+def set_state(widget: QWidget, name: str, value: bool):
+    """Set a dynamic property the stylesheet selects on, restyling `widget`."""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
+
+class Theme:
+    def __init__(self, config: CardConfig):
+        self.config = config
+        self._key: Optional[Tuple] = None
+        self._stylesheet = ""
+
+    def stylesheet(self) -> str:
+        palette = QApplication.palette()
+        key = (
+            palette.cacheKey(),
+            self.config.border_radius,
+            self.config.font_title,
+            self.config.font_authors,
+            self.config.font_meta,
+        )
+        if key != self._key:
+            self._key = key
+            self._stylesheet = self._build(palette)
+        return self._stylesheet
+
+    def apply(self):
+        """Style the application, unless the palette and config are unchanged."""
+        app = QApplication.instance()
+        stylesheet = self.stylesheet()
+        if app.styleSheet() != stylesheet:
+            app.setStyleSheet(stylesheet)
+
+    def _build(self, palette: QPalette) -> str:
+        c = self.config
+        role = QPalette.ColorRole
+        standard = QApplication.style().standardPalette()
+        return f"""
+            QFrame#{CARD} {{
+                border-radius: {c.border_radius}px;
+                background: {palette.color(role.Base).name()};
+            }}
+            QLabel#{NEW_BADGE} {{
+                background-color: {palette.color(role.Highlight).name()};
+                color: {palette.color(role.HighlightedText).name()};
+                border-radius: 5px;
+                padding: 2px 5px;
+                font-size: {c.font_meta}px;
+                font-weight: bold;
+            }}
+            QLabel#{CARD_TITLE} {{
+                font-size: {c.font_title}px;
+                font-weight: bold;
+            }}
+            QLabel#{CARD_AUTHORS} {{
+                font-size: {c.font_authors}px;
+                font-style: oblique;
+            }}
+            QLabel#{CARD_META} {{
+                font-size: {c.font_meta}px;
+            }}
+            QLabel#{TAG} {{
+                background-color: {palette.color(role.Mid).name()};
+                border-radius: 5px;
+                padding: 2px 5px;
+                font-size: {c.font_meta}px;
+            }}
+            QPushButton#{BOOKMARK_BUTTON} {{
+                background-color: {standard.color(role.Base).name()};
+                color: {standard.color(role.Text).name()};
+            }}
+            QPushButton#{BOOKMARK_BUTTON}[{BOOKMARKED}="true"] {{
+                background-color: {palette.color(role.Highlight).name()};
+                color: {palette.color(role.HighlightedText).name()};
+            }}
+            QTextEdit#{ABSTRACT} {{
+                border-radius: 6px;
+            }}
+        """
@@ -0,0 +1,81 @@
+# High-water marks of the queries PaperWatch monitors. For each query the newest
+# published timestamp seen so far is stored together with the ids published at
+# exactly that timestamp, so a later fetch can stop as soon as it reaches papers
+# that were already seen.
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from Entry import Entry
+from ResultCache import ResultCache
+
+
+class Watermark:
+    def __init__(self, published: str, ids: Iterable[str]):
+        self.published: str = published  # as in Entry.published
+        self.ids: Set[str] = set(ids)
+
+    def is_new(self, entry: Entry) -> bool:
+        """Whether an entry was published after this mark."""
+        if entry.published != self.published:
+            return entry.published > self.published
+        return entry.id not in self.ids
+
+    def is_reached(self, entry: Entry) -> bool:
+        """Whether a fetch sorted by date has reached already seen papers."""
+        return entry.published <= self.published
+
+    def advanced(self, entries: Iterable[Entry]) -> "Watermark":
+        """Return the mark moved forward to include `entries`."""
+        published, ids = self.published, set(self.ids)
+        for entry in entries:
+            if entry.published > published:
+                published, ids = entry.published, {entry.id}
+            elif entry.published == published:
+                ids.add(entry.id)
+        return Watermark(published, ids)
+
+
+class WatermarkStore:
+    def __init__(self, json_path: Path):
+        self._path = Path(json_path)
+        self._marks: Dict[str, Watermark] = {}
+        self._load()
+
+    def _load(self):
+        if not self._path.exists():
+            return
+
+        try:
+            raw = json.loads(self._path.read_text())
+            self._marks = {
+                query: Watermark(mark["published"], mark["ids"])
+                for query, mark in raw.items()
+            }
+        except Exception:
+            # Without marks every query is simply fetched in full once more
+            self._marks = {}
+
+    def _save(self):
+        raw = {
+            query: {"published": mark.published, "ids": sorted(mark.ids)}
+            for query, mark in self._marks.items()
+        }
+        tmp_path = self._path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(raw))
+        os.replace(tmp_path, self._path)
+
+    def get(self, query: str) -> Optional[Watermark]:
+        return self._marks.get(ResultCache.normalize_query(query))
+
+    def update(self, query: str, entries: Iterable[Entry]):
+        """Advance the mark of a query past the given entries."""
+        key = ResultCache.normalize_query(query)
+        mark = self._marks.get(key, Watermark("", ()))
+        advanced = mark.advanced(entries)
+        if advanced.published == mark.published and advanced.ids == mark.ids:
+            return
+        self._marks[key] = advanced
+        self._save()
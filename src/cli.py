@@ -0,0 +1,244 @@
+# Headless `fetch` command, for cron jobs and scripts. It runs the same query
+# pipeline as the GUI (query building, paged fetching, parsing, subject and DOI
+# filtering) without importing PyQt, and writes the papers as JSON lines or
+# BibTeX. Subscriptions are fetched concurrently, the requests of all of them
+# share one rate limiter.
+#
+#   python main.py fetch                       # subscriptions from config.toml
+#   python main.py fetch -k diffusion --subject cs.CV -f bibtex -o new.bib
+#   python main.py fetch --new-only            # only papers not reported before
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+
+from ArxivClient import ArxivClient, FetchError, RateLimiter
+from Entry import Entry
+from Subscription import Subscription, subscriptions_from_config
+from WatermarkStore import WatermarkStore
+
+APP_NAME = "PaperWatch"
+
+# Used for queries given on the command line, which do not read config.toml.
+# Same as the defaults of ArxivConfig.
+DEFAULT_MAX_RESULTS = 50
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_DELAY = 3.0
+DEFAULT_JOBS = 2
+DEFAULT_TIMEOUT = 60
+
+
+def app_config_dir() -> Path:
+    """
+    The directory the GUI keeps config.toml in, i.e. what QStandardPaths
+    returns for AppConfigLocation, found without loading Qt.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Preferences"
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or Path.home() / ".config"
+    return Path(base) / APP_NAME
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="paperwatch fetch",
+        description="Fetch the papers of the configured subscriptions, or of a "
+        "query given on the command line, without starting the GUI.",
+    )
+    parser.add_argument(
+        "-c", "--config", type=Path,
+        help="config file to read subscriptions from "
+        "(default: config.toml in the PaperWatch config directory)",
+    )
+    parser.add_argument(
+        "-s", "--subscription", action="append", default=[], metavar="NAME",
+        help="only fetch this subscription (can be repeated)",
+    )
+    parser.add_argument(
+        "-k", "--keyword", action="append", default=[],
+        help="fetch papers with this keyword in the title instead of the "
+        "subscriptions (can be repeated)",
+    )
+    parser.add_argument(
+        "--subject", action="append", default=[],
+        help="restrict the command line query to an arXiv subject, e.g. cs.CV "
+        "(can be repeated)",
+    )
+    parser.add_argument(
+        "-n", "--max-results", type=int, help="maximum number of papers per query"
+    )
+    parser.add_argument("--page-size", type=int, help="papers requested per page")
+    parser.add_argument(
+        "-f", "--format", choices=("jsonl", "bibtex"), default="jsonl",
+        help="output format (default: jsonl)",
+    )
+    parser.add_argument(
+        "-o", "--output", type=Path, help="write to this file instead of stdout"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="number of queries fetched concurrently"
+    )
+    parser.add_argument(
+        "--delay", type=float, help="seconds between two requests to arXiv"
+    )
+    parser.add_argument(
+        "--doi-only", action="store_true",
+        help="only output papers that have a DOI",
+    )
+    parser.add_argument(
+        "--new-only", action="store_true",
+        help="only output papers not output by an earlier --new-only run",
+    )
+    parser.add_argument(
+        "--state", type=Path,
+        help="file remembering what --new-only runs have seen "
+        "(default: fetch-watermarks.json in the PaperWatch config directory)",
+    )
+    return parser
+
+
+def load_config(path: Optional[Path]):
+    """Load the AppConfig, falling back to the defaults if there is no file."""
+    # pydantic is only imported when the config is actually needed
+    from Config import AppConfig, load_config as load_config_file
+
+    path = path or app_config_dir() / "config.toml"
+    if path.exists():
+        return load_config_file(path)
+    return AppConfig()
+
+
+def fetch_subscription(
+    client: ArxivClient,
+    subscription: Subscription,
+    page_size: int,
+    watermark=None,
+) -> List[Entry]:
+    stop_when = None
+    if watermark is not None:
+        stop_when = lambda entries: any(watermark.is_reached(e) for e in entries)
+
+    entries = client.fetch(
+        "search_query",
+        subscription.query,
+        subscription.max_results,
+        page_size,
+        stop_when=stop_when,
+    )
+    if watermark is not None:
+        entries = [entry for entry in entries if watermark.is_new(entry)]
+    return entries
+
+
+def write_jsonl(out, subscription: Subscription, entries: List[Entry]):
+    for entry in entries:
+        record = entry.to_dict()
+        record["subscription"] = subscription.name
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def main(argv: List[str]) -> int:
+    args = build_parser().parse_args(argv)
+
+    if args.keyword or args.subject:
+        config = None
+        subscriptions = [
+            Subscription(
+                "command line",
+                args.keyword,
+                args.subject,
+                args.max_results or DEFAULT_MAX_RESULTS,
+            )
+        ]
+    else:
+        config = load_config(args.config)
+        subscriptions = subscriptions_from_config(config)
+        if args.subscription:
+            unknown = set(args.subscription) - {s.name for s in subscriptions}
+            if unknown:
+                print(
+                    f"Unknown subscription: {', '.join(sorted(unknown))}",
+                    file=sys.stderr,
+                )
+                return 2
+            subscriptions = [s for s in subscriptions if s.name in args.subscription]
+        if args.max_results:
+            for subscription in subscriptions:
+                subscription.max_results = args.max_results
+
+    if not subscriptions:
+        print("Nothing to fetch: no subscriptions and no keywords.", file=sys.stderr)
+        return 2
+
+    if config is not None:
+        arxiv = config.arxiv
+        page_size = args.page_size or arxiv.page_size
+        delay = arxiv.request_delay if args.delay is None else args.delay
+        jobs = args.jobs or arxiv.max_concurrent_requests
+        timeout = arxiv.request_timeout
+        doi_only = args.doi_only or arxiv.doi_only
+    else:
+        page_size = args.page_size or DEFAULT_PAGE_SIZE
+        delay = DEFAULT_DELAY if args.delay is None else args.delay
+        jobs = args.jobs or DEFAULT_JOBS
+        timeout = DEFAULT_TIMEOUT
+        doi_only = args.doi_only
+
+    watermarks = None
+    if args.new_only:
+        # Kept apart from the GUI's marks, which track what its cache holds
+        state = args.state or app_config_dir() / "fetch-watermarks.json"
+        state.parent.mkdir(parents=True, exist_ok=True)
+        watermarks = WatermarkStore(state)
+
+    client = ArxivClient(RateLimiter(delay), timeout=timeout)
+    out = args.output.open("w", encoding="utf-8") if args.output else sys.stdout
+    failed = 0
+    written = set()  # ids already written as BibTeX
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        futures = [
+            pool.submit(
+                fetch_subscription,
+                client,
+                subscription,
+                page_size,
+                watermarks.get(subscription.query) if watermarks else None,
+            )
+            for subscription in subscriptions
+        ]
+
+        # Results are written in subscription order, each as soon as it and
+        # the ones before it are done
+        for subscription, future in zip(subscriptions, futures):
+            try:
+                fetched = future.result()
+            except FetchError as e:
+                failed += 1
+                print(f"{subscription.name}: {e}", file=sys.stderr)
+                continue
+
+            entries = [e for e in fetched if subscription.accepts(e, doi_only)]
+            if args.format == "bibtex":
+                for entry in entries:
+                    if entry.id not in written:
+                        written.add(entry.id)
+                        out.write(entry.to_bibtex() + "\n")
+            else:
+                write_jsonl(out, subscription, entries)
+            out.flush()
+
+            if watermarks is not None:
+                watermarks.update(subscription.query, fetched)
+            print(f"{subscription.name}: {len(entries)} papers", file=sys.stderr)
+
+    if out is not sys.stdout:
+        out.close()
+    return 1 if failed else 0
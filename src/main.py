@@ -1,8 +1,15 @@
 import sys
-from PyQt6.QtWidgets import QApplication
-from PaperWatch import PaperWatchApp
 
 if __name__ == "__main__":
+    # The headless fetch command must not pay for loading Qt
+    if sys.argv[1:2] == ["fetch"]:
+        from cli import main
+
+        sys.exit(main(sys.argv[2:]))
+
+    from PyQt6.QtWidgets import QApplication
+    from PaperWatch import PaperWatchApp
+
     app = QApplication(sys.argv)
     window = PaperWatchApp()
     window.show()
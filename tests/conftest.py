@@ -0,0 +1,35 @@
+# The modules live flat in src/ and import each other by name, as when the
+# application runs from there.
+
+import sys
+from pathlib import Path
+from typing import Optional, Sequence
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from Entry import Entry  # noqa: E402
+
+
+def make_entry(
+    number: int,
+    title: Optional[str] = None,
+    version: int = 1,
+    published: str = "2024-01-01T00:00:00Z",
+    authors: Sequence[str] = ("Ada Lovelace",),
+    tags: Sequence[str] = ("cs.CV",),
+    abstract: str = "An abstract.",
+    doi: Optional[str] = None,
+) -> Entry:
+    """An entry of the paper 2401.<number>, as the arXiv API would return it."""
+    id = f"http://arxiv.org/abs/2401.{number:05d}v{version}"
+    return Entry.from_fields(
+        id=id,
+        title=f"Paper {number:05d}" if title is None else title,
+        authors=list(authors),
+        published=published,
+        abstract=abstract,
+        link=id,
+        tags=list(tags),
+        primary_category=tags[0] if tags else "",
+        doi=doi,
+    )
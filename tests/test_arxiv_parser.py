@@ -0,0 +1,92 @@
+import pytest
+
+from ArxivParser import UnexpectedFeedError, iter_entries, parse_feed
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"
+      xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/"
+      xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title type="html">ArXiv Query: search_query=ti:vision</title>
+  <opensearch:totalResults>1234</opensearch:totalResults>
+  <opensearch:startIndex>0</opensearch:startIndex>
+  <entry>
+    <id>http://arxiv.org/abs/2401.00001v2</id>
+    <published>2024-01-02T03:04:05Z</published>
+    <title>Seeing  Things
+      Clearly</title>
+    <summary>  An abstract.  </summary>
+    <author><name>Ada Lovelace</name></author>
+    <author><name>Alan Turing</name></author>
+    <arxiv:doi>10.1000/xyz</arxiv:doi>
+    <link title="doi" href="http://dx.doi.org/10.1000/xyz" rel="related"/>
+    <link href="http://arxiv.org/abs/2401.00001v2" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2401.00001v2" rel="related"/>
+    <arxiv:primary_category term="cs.CV" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.CV" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.CV" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2401.00002v1</id>
+    <published>2024-01-01T00:00:00Z</published>
+    <title>Another Paper</title>
+    <summary>Short.</summary>
+    <author><name>Grace Hopper</name></author>
+    <link href="http://arxiv.org/abs/2401.00002v1" rel="alternate" type="text/html"/>
+    <arxiv:primary_category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>
+</feed>
+"""
+
+
+def test_parse_feed():
+    entries, total = parse_feed(FEED)
+    assert total == 1234
+    first, second = entries
+
+    assert first.id == "http://arxiv.org/abs/2401.00001v2"
+    assert (first.arxiv_id, first.version) == ("2401.00001", 2)
+    assert first.title == "Seeing  Things\n      Clearly"
+    assert first.abstract == "An abstract."
+    assert first.authors == "Ada Lovelace, Alan Turing"
+    assert first.published == "2024-01-02 03:04:05"
+    assert first.link == "http://arxiv.org/abs/2401.00001v2"
+    assert first.tags == ("cs.CV", "cs.LG")
+    assert first.primary_category == "cs.CV"
+    assert first.doi == "10.1000/xyz"
+
+    # Without a journal DOI, the DOI arXiv assigns
+    assert second.doi == "https://doi.org/10.48550/arXiv.2401.00002"
+
+
+def test_matches_feedparser():
+    feedparser = pytest.importorskip("feedparser")
+    from Entry import Entry
+
+    fast, _ = parse_feed(FEED)
+    slow = [Entry(item) for item in feedparser.parse(FEED).entries]
+    assert [entry.to_dict() for entry in fast] == [entry.to_dict() for entry in slow]
+
+
+def test_html_content_is_left_to_feedparser():
+    html = FEED.replace(
+        b"<title>Another Paper</title>",
+        b'<title type="html">A &lt;b&gt;Paper&lt;/b&gt;</title>',
+    )
+    with pytest.raises(UnexpectedFeedError):
+        list(iter_entries(html))
+
+    pytest.importorskip("feedparser")
+    entries, total = parse_feed(html)
+    assert len(entries) == 2 and total == 1234
+
+
+def test_not_an_atom_feed():
+    with pytest.raises(UnexpectedFeedError):
+        list(iter_entries(b"<rss><channel/></rss>"))
+
+
+def test_empty_feed():
+    empty = FEED[: FEED.index(b"<entry>")] + b"</feed>"
+    assert parse_feed(empty) == ([], 1234)
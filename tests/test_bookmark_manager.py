@@ -0,0 +1,73 @@
+import pytest
+
+from BookmarkManager import BookmarkManager, BookmarkStorage, SqliteBookmarkStorage
+from conftest import make_entry
+from PaperDatabase import DEFAULT_COLLECTION, PaperDatabase
+
+
+@pytest.fixture
+def database(tmp_path):
+    database = PaperDatabase(tmp_path / "bookmarks.sqlite")
+    yield database
+    database.close()
+
+
+def test_storage_missing_a_method_cannot_be_constructed():
+    class Partial(BookmarkStorage):
+        def load(self):
+            return []
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_add_remove_and_listeners(database):
+    manager = BookmarkManager(SqliteBookmarkStorage(database))
+    changes = []
+    manager.listeners.append(lambda added, removed: changes.append((added, removed)))
+    first, second = make_entry(1000), make_entry(1001)
+
+    manager.add(first)
+    manager.add(second)
+    manager.add(make_entry(1000, version=2))  # the same paper
+    assert manager.list_all() == [first, second]
+    assert manager.is_bookmarked(make_entry(1001, version=3))
+
+    manager.remove(second.id)
+    assert manager.list_all() == [first]
+    assert changes == [
+        ({first.arxiv_id}, set()),
+        ({second.arxiv_id}, set()),
+        (set(), {second.arxiv_id}),
+    ]
+
+    reloaded = BookmarkManager(SqliteBookmarkStorage(database))
+    assert [entry.arxiv_id for entry in reloaded.list_all()] == [first.arxiv_id]
+
+
+def test_collections(database):
+    manager = BookmarkManager(SqliteBookmarkStorage(database))
+    changed = []
+    manager.collection_listeners.append(changed.append)
+    first, second, third = (make_entry(n) for n in (1010, 1011, 1012))
+    manager.add(first)
+    manager.add(second, "Reading")
+    manager.add(third)
+    manager.move(third, "Later")
+
+    assert manager.collections() == [DEFAULT_COLLECTION, "Reading", "Later"]
+    assert manager.count() == 3
+    assert [manager.count(name) for name in manager.collections()] == [1, 1, 1]
+    assert manager.collection_of(third) == "Later"
+    assert "Later" in changed
+
+    manager.delete_collection("Reading")
+    assert manager.collection_of(second) == DEFAULT_COLLECTION
+    assert manager.list_collection(DEFAULT_COLLECTION) == [first, second]
+    with pytest.raises(ValueError):
+        manager.delete_collection(DEFAULT_COLLECTION)
+
+    reloaded = BookmarkManager(SqliteBookmarkStorage(database))
+    assert reloaded.collections() == [DEFAULT_COLLECTION, "Later"]
+    assert reloaded.count(DEFAULT_COLLECTION) == 2
+    assert reloaded.collection_of(third) == "Later"
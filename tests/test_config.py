@@ -0,0 +1,31 @@
+import pytest
+from pydantic import ValidationError
+
+from Config import AppConfig
+from Subscription import subscriptions_from_config
+
+
+def test_subscriptions_from_config():
+    config = AppConfig(
+        subscriptions=[
+            {"name": "Vision", "keywords": ["vision"], "max_results": 50},
+            {"name": "Graphs", "subjects": ["cs.LG"]},
+        ]
+    )
+    vision, graphs = subscriptions_from_config(config)
+    assert (vision.name, vision.query, vision.max_results) == (
+        "Vision",
+        "ti:vision",
+        50,
+    )
+    assert graphs.max_results == config.arxiv.max_results
+
+
+def test_duplicate_subscription_names_are_rejected():
+    with pytest.raises(ValidationError, match="Vision"):
+        AppConfig(
+            subscriptions=[
+                {"name": "Vision", "keywords": ["vision"]},
+                {"name": "Vision", "keywords": ["segmentation"]},
+            ]
+        )
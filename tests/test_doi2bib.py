@@ -0,0 +1,88 @@
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QEventLoop, QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from BibtexCache import BibtexCache  # noqa: E402
+from DOI2Bib import DOI2Bib  # noqa: E402
+
+BIBTEX = "@article{key, title={A Paper}}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    # The resolver is reached as 127.0.0.1 and redirects to localhost, another
+    # host for the schedulers
+    def do_GET(self):
+        port = self.server.server_address[1]
+        if self.path.startswith("/record/"):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-bibtex")
+            self.end_headers()
+            self.wfile.write(BIBTEX.encode())
+        elif self.path.startswith("/loop/"):
+            self.send_response(302)
+            self.send_header("Location", self.path)
+            self.end_headers()
+        else:
+            self.send_response(302)
+            self.send_header("Location", f"http://localhost:{port}/record{self.path}")
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingHTTPServer):
+    # Qt keeps connections open, closing the server must not wait for them
+    daemon_threads = True
+    block_on_close = False
+
+
+@pytest.fixture
+def resolver():
+    app = QApplication.instance() or QApplication([])  # noqa: F841
+    server = Server(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+    server.shutdown()
+    server.server_close()
+
+
+def resolve(doi2bib: DOI2Bib, dois):
+    results = []
+    loop = QEventLoop()
+    doi2bib.batchFinished.connect(lambda _, result: results.append(result))
+    doi2bib.batchFinished.connect(loop.quit)
+    doi2bib.resolve(dois)
+    QTimer.singleShot(10_000, loop.quit)
+    loop.exec()
+    return results[0]
+
+
+def test_redirect_is_scheduled_on_its_target_host(tmp_path, resolver):
+    doi2bib = DOI2Bib(BibtexCache(tmp_path / "bibtex.json"), delay=0)
+    doi2bib.RESOLVER = resolver
+
+    result = resolve(doi2bib, ["10.1000/a", "10.1000/b"])
+
+    assert result.errors == {}
+    assert result.records == {"10.1000/a": BIBTEX + "\n", "10.1000/b": BIBTEX + "\n"}
+    assert set(doi2bib._schedulers) == {"127.0.0.1", "localhost"}
+
+
+def test_redirect_loop_fails_the_doi(tmp_path, resolver):
+    doi2bib = DOI2Bib(BibtexCache(tmp_path / "bibtex.json"), delay=0)
+    doi2bib.RESOLVER = resolver + "loop/"
+
+    result = resolve(doi2bib, ["10.1000/c"])
+
+    assert result.records == {}
+    assert result.errors == {"10.1000/c": "Too many redirects"}
@@ -0,0 +1,92 @@
+import calendar
+
+import pytest
+
+import EntryStore as entry_store_module
+from conftest import make_entry
+from EntryStore import DATE, DOI, SUBJECTS, TEXT, EntryStore
+
+
+@pytest.fixture(params=["numpy", "bytearray"])
+def store(request, monkeypatch):
+    """A store evaluating masks with NumPy, and one without."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(entry_store_module, "np", None)
+    return EntryStore()
+
+
+def timestamp(day: int) -> int:
+    return calendar.timegm((2024, 1, day, 0, 0, 0))
+
+
+ENTRIES = [
+    make_entry(3000, "Vision transformers", published="2024-01-01T00:00:00Z"),
+    make_entry(
+        3001, "Graph networks", tags=("cs.LG",), published="2024-01-02T00:00:00Z", doi=""
+    ),
+    make_entry(
+        3002, "Vision for robots", tags=("cs.RO", "cs.CV"), published="2024-01-03T00:00:00Z"
+    ),
+    make_entry(
+        3003, "Language models", tags=("cs.CL",), published="2024-01-04T00:00:00Z", doi=""
+    ),
+]
+
+
+def test_filters(store):
+    store.append(ENTRIES)
+    assert store.rows() == [0, 1, 2, 3]
+
+    store.set_subjects(["cs.CV", "cs.LG"])
+    assert store.rows() == [0, 1]
+    store.set_doi_only(True)
+    assert store.rows() == [0]
+    store.set_subjects(None)
+    assert store.rows() == [0, 2]
+    store.set_doi_only(False)
+
+    store.set_date_range(timestamp(2), timestamp(4))
+    assert store.rows() == [1, 2]
+    store.set_date_range(start=timestamp(3))
+    assert store.rows() == [2, 3]
+    store.set_date_range()
+
+    store.set_text("vision")
+    assert store.rows() == [0, 2]
+    assert store.rows((SUBJECTS, DOI, DATE)) == [0, 1, 2, 3]
+    store.set_text("cat:cs.cv")
+    assert store.matching() == [ENTRIES[0], ENTRIES[2]]
+
+
+def test_masks_extend_to_new_rows(store):
+    store.append(ENTRIES[:2])
+    store.set_subjects(["cs.CV", "cs.RO"])
+    store.set_text("vision")
+    assert store.rows() == [0]
+
+    assert store.append(ENTRIES[2:]) == range(2, 4)
+    assert store.rows() == [0, 2]
+    assert store.rows((TEXT,)) == [0, 2]
+
+
+def test_removed_rows_drop_out(store):
+    store.append(ENTRIES)
+    store.set_text("vision")
+    assert store.rows() == [0, 2]
+
+    store.remove([ENTRIES[0]])
+    assert ENTRIES[0] not in store
+    assert store.rows() == [2]
+    assert store.rows(()) == [1, 2, 3]
+    assert store.live_entries() == ENTRIES[1:]
+
+
+def test_clear_keeps_filters(store):
+    store.append(ENTRIES)
+    store.set_subjects(["cs.CL"])
+    store.clear()
+    assert len(store) == 0 and store.rows() == []
+    store.append(ENTRIES)
+    assert store.rows() == [3]
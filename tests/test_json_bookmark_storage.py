@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from BookmarkManager import JsonBookmarkStorage
+from conftest import make_entry
+from PaperDatabase import DEFAULT_COLLECTION
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "bookmarks.json"
+
+
+def load(path):
+    storage = JsonBookmarkStorage(path)
+    entries = storage.load()
+    storage.wait()
+    return storage, [entry.arxiv_id for entry in entries]
+
+
+def journal(path):
+    return path.with_name(path.name + ".journal")
+
+
+def test_changes_survive_a_reload(path):
+    storage, _ = load(path)
+    first, second, third = (make_entry(n) for n in (2000, 2001, 2002))
+    storage.add(first)
+    storage.add(second, "Reading")
+    storage.add(third)
+    storage.remove(first.arxiv_id)
+    storage.move(third.arxiv_id, "Later")
+    storage.create_collection("Empty")
+
+    storage, ids = load(path)
+    assert ids == [second.arxiv_id, third.arxiv_id]
+    assert storage.load_collections() == (
+        [DEFAULT_COLLECTION, "Reading", "Later", "Empty"],
+        {second.arxiv_id: "Reading", third.arxiv_id: "Later"},
+    )
+
+    storage.delete_collection("Reading")
+    storage.clear()
+    storage.add(first)
+    storage, ids = load(path)
+    assert ids == [first.arxiv_id]
+    assert storage.load_collections() == (
+        [DEFAULT_COLLECTION, "Later", "Empty"],
+        {},
+    )
+
+
+def test_torn_last_line_is_dropped_and_truncated(path):
+    storage, _ = load(path)
+    storage.add(make_entry(2010))
+    storage.add(make_entry(2011))
+    intact = journal(path).read_bytes()
+    # A crash cut the last change short
+    with open(journal(path), "ab") as f:
+        f.write(b'{"op": "add", "entry": {"id": "http://arxiv.org/ab')
+
+    storage, ids = load(path)
+    assert ids == ["2401.02010", "2401.02011"]
+    assert journal(path).read_bytes() == intact
+
+    # The next change starts on a line of its own
+    storage.add(make_entry(2012))
+    _, ids = load(path)
+    assert ids == ["2401.02010", "2401.02011", "2401.02012"]
+
+
+def test_damaged_line_is_skipped(path):
+    storage, _ = load(path)
+    storage.add(make_entry(2020))
+    with open(journal(path), "ab") as f:
+        f.write(b"not json\n")
+    storage.add(make_entry(2021))
+
+    _, ids = load(path)
+    assert ids == ["2401.02020", "2401.02021"]
+
+
+def test_compaction_folds_the_journal_into_the_snapshot(path, monkeypatch):
+    monkeypatch.setattr(JsonBookmarkStorage, "COMPACT_AFTER", 5)
+    storage, _ = load(path)
+    storage.add(make_entry(2030), "Reading")
+    for n in range(2031, 2037):
+        storage.add(make_entry(n))
+    storage.wait()
+
+    snapshot = json.loads(path.read_text())
+    assert len(snapshot["bookmarks"]) == 5
+    assert snapshot["bookmarks"][0]["collection"] == "Reading"
+    assert "Reading" in snapshot["collections"]
+    assert not path.with_name(path.name + ".journal.compacting").exists()
+    assert len(journal(path).read_bytes().splitlines()) == 2
+
+    storage, ids = load(path)
+    assert ids == [f"2401.{n:05d}" for n in range(2030, 2037)]
+    assert storage.load_collections()[1] == {"2401.02030": "Reading"}
+
+
+def test_interrupted_compaction_is_finished_on_load(path):
+    storage, _ = load(path)
+    storage.add(make_entry(2040))
+    storage.add(make_entry(2041))
+    # The compaction of these two stopped before writing the snapshot, and a
+    # change went to a new journal after it
+    compacting = path.with_name(path.name + ".journal.compacting")
+    journal(path).rename(compacting)
+    JsonBookmarkStorage(path).add(make_entry(2042))
+
+    storage, ids = load(path)
+    assert ids == ["2401.02040", "2401.02041", "2401.02042"]
+    assert not compacting.exists()
+    assert not journal(path).exists()
+    assert len(json.loads(path.read_text())["bookmarks"]) == 3
+
+    _, ids = load(path)
+    assert ids == ["2401.02040", "2401.02041", "2401.02042"]
+
+
+def test_corrupt_snapshot_is_kept_aside(path):
+    path.write_text("{ not json")
+    storage, ids = load(path)
+    assert ids == []
+    assert path.with_name(path.name + ".corrupt").read_text() == "{ not json"
+
+    storage.add(make_entry(2050))
+    _, ids = load(path)
+    assert ids == ["2401.02050"]
+
+
+def test_list_snapshot_of_older_versions_loads(path):
+    entries = [make_entry(2060), make_entry(2061)]
+    path.write_text(json.dumps([entry.to_dict() for entry in entries]))
+
+    storage, ids = load(path)
+    assert ids == ["2401.02060", "2401.02061"]
+    assert storage.load_collections() == ([DEFAULT_COLLECTION], {})
@@ -0,0 +1,197 @@
+import json
+import sqlite3
+
+import pytest
+
+from conftest import make_entry
+from PaperDatabase import DEFAULT_COLLECTION, SCHEMA_VERSION, PaperDatabase
+
+
+@pytest.fixture
+def path(tmp_path):
+    return tmp_path / "papers.sqlite"
+
+
+@pytest.fixture
+def database(path):
+    database = PaperDatabase(path)
+    yield database
+    database.close()
+
+
+def ids(entries):
+    return [entry.arxiv_id for entry in entries]
+
+
+def test_newest_version_of_an_entry_is_kept(database):
+    database.put_entries([make_entry(5000, "Old", version=2)])
+    database.put_entries([make_entry(5000, "Older", version=1)])
+    assert database.get_entry("2401.05000").title == "Old"
+    database.put_entries([make_entry(5000, "New", version=3)])
+    assert database.get_entry("2401.05000").title == "New"
+    assert database.get_entry("2401.09999") is None
+
+
+def test_bookmarks(database):
+    entries = [make_entry(n) for n in range(5010, 5015)]
+    for entry in entries:
+        assert database.add_bookmark(entry)
+    assert not database.add_bookmark(entries[0])
+    assert database.remove_bookmark(entries[1].arxiv_id)
+    assert not database.remove_bookmark(entries[1].arxiv_id)
+
+    assert database.bookmark_count() == 4
+    assert ids(database.bookmarks()) == ids(entries[:1] + entries[2:])
+    assert ids(database.bookmarks(offset=1, limit=2)) == ids(entries[2:4])
+
+    database.clear_bookmarks()
+    assert database.bookmarks() == []
+
+
+def test_collections(database):
+    first, second, third = (make_entry(n) for n in (5020, 5021, 5022))
+    database.add_bookmark(first)
+    database.create_collection("Reading")
+    database.add_bookmark(second, "Reading")
+    database.add_bookmark(third, "Reading")
+    database.move_bookmark(third.arxiv_id, DEFAULT_COLLECTION)
+
+    assert database.collections() == [DEFAULT_COLLECTION, "Reading"]
+    assert database.bookmark_count("Reading") == 1
+    assert ids(database.bookmarks(collection=DEFAULT_COLLECTION)) == ids(
+        [first, third]
+    )
+    assert database.bookmark_collections() == {second.arxiv_id: "Reading"}
+
+    database.delete_collection("Reading")
+    assert database.collections() == [DEFAULT_COLLECTION]
+    assert database.bookmark_count(DEFAULT_COLLECTION) == 3
+
+
+def test_bookmarks_json_is_migrated_once(database, tmp_path):
+    json_path = tmp_path / "bookmarks.json"
+    entries = [make_entry(5030), make_entry(5031)]
+    json_path.write_text(json.dumps([entry.to_dict() for entry in entries]))
+
+    assert database.migrate_bookmarks(json_path) == 2
+    database.remove_bookmark(entries[0].arxiv_id)
+    assert database.migrate_bookmarks(json_path) == 0
+    assert ids(database.bookmarks()) == ids(entries[1:])
+    assert json_path.exists()
+
+
+def test_journaled_bookmarks_json_is_migrated(database, tmp_path):
+    json_path = tmp_path / "bookmarks.json"
+    entry = make_entry(5035).to_dict()
+    json_path.write_text(
+        json.dumps(
+            {
+                "collections": [DEFAULT_COLLECTION, "Later"],
+                "bookmarks": [dict(entry, collection="Reading")],
+            }
+        )
+    )
+
+    assert database.migrate_bookmarks(json_path) == 1
+    assert database.collections() == [DEFAULT_COLLECTION, "Later", "Reading"]
+    assert database.bookmark_collections() == {"2401.05035": "Reading"}
+
+
+def test_unreadable_bookmarks_json_is_tried_again(database, tmp_path):
+    json_path = tmp_path / "bookmarks.json"
+    json_path.write_text("[{")
+    assert database.migrate_bookmarks(json_path) == 0
+    json_path.write_text(json.dumps([make_entry(5040).to_dict()]))
+    assert database.migrate_bookmarks(json_path) == 1
+    assert database.migrate_bookmarks(tmp_path / "missing.json") == 0
+
+
+def test_seen_read_and_history(database):
+    database.record_history("ti:vision", ["2401.05050", "2401.05051"])
+    assert database.is_seen("2401.05050")
+    assert not database.is_read("2401.05050")
+    database.mark_read("2401.05050")
+    database.mark_read("2401.05052")
+    assert database.is_read("2401.05050") and database.is_seen("2401.05052")
+
+    database.record_history("ti:vision", ["2401.05052"])
+    assert database.history("ti:vision")[0] == "2401.05052"
+    assert sorted(database.history("ti:vision")) == [
+        "2401.05050",
+        "2401.05051",
+        "2401.05052",
+    ]
+    assert database.history("ti:other") == []
+
+
+# Version 1 of the schema, without collections
+SCHEMA_V1 = """
+CREATE TABLE entries (
+    arxiv_id TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    published TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE bookmarks (
+    arxiv_id TEXT PRIMARY KEY REFERENCES entries(arxiv_id),
+    position INTEGER NOT NULL,
+    added_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX bookmarks_position ON bookmarks(position);
+PRAGMA user_version=1;
+"""
+
+
+def create_v1_database(path, entries):
+    db = sqlite3.connect(path)
+    db.executescript(SCHEMA_V1)
+    with db:
+        for position, entry in enumerate(entries, 1):
+            db.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?)",
+                (
+                    entry.arxiv_id,
+                    entry.version,
+                    entry.published,
+                    json.dumps(entry.to_dict()),
+                ),
+            )
+            db.execute(
+                "INSERT INTO bookmarks VALUES (?, ?, 0)", (entry.arxiv_id, position)
+            )
+    return db
+
+
+def test_version_1_is_migrated(path):
+    entries = [make_entry(5060), make_entry(5061)]
+    create_v1_database(path, entries).close()
+
+    database = PaperDatabase(path)
+    assert database.collections() == [DEFAULT_COLLECTION]
+    assert ids(database.bookmarks(collection=DEFAULT_COLLECTION)) == ids(entries)
+    database.add_bookmark(make_entry(5062), "Reading")
+    assert database.bookmark_count("Reading") == 1
+    database.close()
+
+    db = sqlite3.connect(path)
+    assert db.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+    db.close()
+    # Opening a migrated database leaves it as it is
+    database = PaperDatabase(path)
+    assert database.bookmark_count() == 3
+    database.close()
+
+
+def test_interrupted_migration_is_finished(path):
+    db = create_v1_database(path, [make_entry(5070)])
+    # The column was added, the version not updated yet
+    with db:
+        db.execute(
+            "ALTER TABLE bookmarks ADD COLUMN "
+            "collection TEXT NOT NULL DEFAULT 'Unsorted'"
+        )
+    db.close()
+
+    database = PaperDatabase(path)
+    assert database.bookmark_count(DEFAULT_COLLECTION) == 1
+    database.close()
@@ -0,0 +1,113 @@
+import os
+
+import pytest
+
+pytest.importorskip("PyQt6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from CardDelegate import MARGIN  # noqa: E402
+from conftest import make_entry  # noqa: E402
+from EntryStore import TEXT  # noqa: E402
+from SortIndex import SortBy  # noqa: E402
+
+
+@pytest.fixture
+def window(tmp_path, monkeypatch):
+    # Config, cache and data go to a fresh home, without subscriptions nothing
+    # is fetched
+    for name in ("HOME", "XDG_CONFIG_HOME", "XDG_DATA_HOME", "XDG_CACHE_HOME"):
+        monkeypatch.setenv(name, str(tmp_path / name.lower()))
+    app = QApplication.instance() or QApplication([])
+    import PaperWatch
+
+    window = PaperWatch.PaperWatchApp()
+    yield window
+    window.poller.stop()
+    window.database.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def test_newer_version_is_sorted_and_indexed_anew(window):
+    entries = [make_entry(n) for n in range(100, 200)]
+    window.sort_entries_by(SortBy.TITLE)
+    window.set_sort_order(True)
+    window.showPapers(entries, remove_existing_entries=True)
+
+    # A later page carries a newer version of the first paper, retitled
+    window.showPapers([make_entry(100, title="z", version=2)])
+
+    titles = [entry.title for entry in window.entries]
+    assert titles == sorted(titles)
+    assert titles[-1] == "z"
+    model = window.paper_list.paper_model
+    assert [model.entry(row).title for row in range(model.rowCount())] == titles
+
+    window.entry_store.set_text("z")
+    store = window.entry_store
+    assert [store.entries[row].title for row in store.rows((TEXT,))] == ["z"]
+    window.entry_store.set_text("")
+
+
+def test_newer_version_from_another_fetch_is_applied_later(window):
+    entries = [make_entry(n) for n in range(200, 210)]
+    window.sort_entries_by(SortBy.TITLE)
+    window.set_sort_order(True)
+    window.showPapers(entries, remove_existing_entries=True)
+
+    # Another subscription's fetch resolves a newer version
+    from EntryRegistry import registry
+
+    registry.resolve(make_entry(200, title="z", version=2))
+    QApplication.processEvents()
+
+    assert [entry.title for entry in window.entries][-1] == "z"
+
+
+def test_empty_revalidation_keeps_cached_papers(window, monkeypatch):
+    from Subscription import Subscription
+    import PaperWatch
+
+    warnings = []
+    monkeypatch.setattr(
+        PaperWatch.QMessageBox, "warning", lambda *args: warnings.append(args)
+    )
+    subscription = Subscription("Cached", ["vision"], None, 10)
+    window._add_subscription(subscription)
+    window.current_subscription = subscription
+    cached = [make_entry(n) for n in range(300, 305)]
+    subscription.result = cached
+    window.showPapers(cached, remove_existing_entries=True)
+
+    subscription.start_fetch()
+    window.on_fetch_finished(subscription, 0)
+
+    assert not warnings
+    assert not subscription.revalidating
+    assert subscription.result == cached
+    assert window.entries and len(window.entries) == len(cached)
+
+
+def test_card_config_change_lays_out_rows_again(window):
+    window.showPapers([make_entry(n) for n in range(300, 305)], True)
+    view = window.paper_list
+    view.resize(600, 800)
+    view.doItemsLayout()
+    index = view.paper_model.index(0)
+    height = view.visualRect(index).height()
+
+    # The editor changes the CardConfig in place and signals it
+    window.show_config_editor()
+    window.editor.card_show_authors.setChecked(False)
+    window.editor.get_config()
+    window.editor.configChanged.emit()
+    window.editor.close()
+
+    assert view.visualRect(index).height() < height
+    width = view.viewport().width() - 2 * MARGIN
+    layout = view.delegate.card_layout(width, view.paper_model.entry(0), False)
+    assert layout.authors is None
+    spacing = window.config.ui.card.spacing
+    assert view.visualRect(index).height() == layout.height + spacing
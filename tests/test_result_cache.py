@@ -0,0 +1,25 @@
+from conftest import make_entry
+from ResultCache import ResultCache
+
+
+def test_spellings_of_a_query_share_an_entry():
+    normalize = ResultCache.normalize_query
+    assert normalize("ti:CNN  AND\tTi:Vision") == "ti:cnn AND ti:vision"
+    assert normalize("ti%3Acnn+AND+ti%3Avision") == "ti:cnn AND ti:vision"
+
+
+def test_operators_keep_their_case():
+    normalize = ResultCache.normalize_query
+    assert normalize("ti:cnn AND ti:vision") != normalize("ti:cnn and ti:vision")
+    assert normalize("cat:cs.CV ANDNOT au:Smith OR abs:Android") == (
+        "cat:cs.cv ANDNOT au:smith OR abs:android"
+    )
+
+
+def test_results_of_operator_spellings_are_kept_apart(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put("ti:cnn AND ti:vision", 10, [make_entry(1)])
+
+    assert cache.get("ti:cnn and ti:vision", 10) is None
+    result = cache.get("TI:CNN AND TI:VISION", 10)
+    assert [entry.arxiv_id for entry in result.entries] == [make_entry(1).arxiv_id]
@@ -0,0 +1,75 @@
+from conftest import make_entry
+from SearchIndex import ABSTRACT, AUTHORS, TITLE, SearchIndex, tokenize
+
+ENTRIES = [
+    make_entry(4000, "Deep Vision Transformers", authors=("Ada Lovelace",)),
+    make_entry(
+        4001,
+        "Graph networks, revisited",
+        authors=("Alan Turing", "Grace Hopper"),
+        tags=("cs.LG",),
+        abstract="We study message passing.",
+    ),
+    make_entry(4002, "Vision-language models", authors=("Grace Hopper",)),
+]
+
+
+def index(abstracts=False):
+    index = SearchIndex(abstracts)
+    index.add(ENTRIES)
+    return index
+
+
+def test_tokenize():
+    assert tokenize("Vision-Language Models, 2nd ed.") == [
+        "vision",
+        "language",
+        "models",
+        "2nd",
+        "ed",
+    ]
+
+
+def test_terms_are_prefixes_that_must_all_match():
+    assert index().search("vis") == {0, 2}
+    assert index().search("VISION lang") == {2}
+    assert index().search("vision graph") == set()
+
+
+def test_qualifiers():
+    assert index().search("au:hopper") == {1, 2}
+    assert index().search("ti:hopper") == set()
+    assert index().search("cat:cs.lg") == {1}
+    assert index().search("cat:cs") == {0, 1, 2}
+    assert index().search("ti:vision au:grace") == {2}
+
+
+def test_empty_query_matches_everything():
+    assert index().search("") == {0, 1, 2}
+    assert index().search("-- ,") == {0, 1, 2}
+
+
+def test_abstracts_only_when_enabled():
+    assert index().search("message") == set()
+    assert index().search("abs:message") == set()
+    assert index(abstracts=True).search("message") == {1}
+    assert index(abstracts=True).search("abs:passing") == {1}
+
+
+def test_parse():
+    parsed = index().parse("ti:deep au:ada vision")
+    assert parsed == [
+        ((TITLE,), ["deep"]),
+        ((AUTHORS,), ["ada"]),
+        ((TITLE, AUTHORS), ["vision"]),
+    ]
+    assert index(abstracts=True).parse("x")[0][0] == (TITLE, AUTHORS, ABSTRACT)
+
+
+def test_rows_added_later_are_found():
+    search_index = SearchIndex()
+    search_index.add(ENTRIES[:1])
+    assert search_index.search("vision") == {0}
+    search_index.add(ENTRIES[1:])
+    assert search_index.size == 3
+    assert search_index.search("vision") == {0, 2}